@@ -0,0 +1,307 @@
+"""
+Historical backfill.
+
+Walks date windows (BACKFILL_WINDOW_DAYS each) from --start to --end. For
+every active feed it fetches what the feed's source has for that window
+(Google News via the after:/before: query operators instead of the daily
+run's when:7d, the Federal Register via publication date conditions), all
+feeds at once within each source's concurrency limit. The articles then
+stream through one stage at a time:
+
+    fetch -> dedup -> filter -> insert -> classify
+
+Each stage runs on its own thread and passes items through a queue of at most
+BACKFILL_QUEUE_SIZE, so memory is bounded by the queue sizes and one window's
+URL set, however many days are backfilled. Classified signals are stamped
+with their article's publication time. That keeps them out of the dashboard's
+last-7-days views, and the sector_signal_daily rollup files them under the
+right day. The rollup is never cleared by pipeline runs, so it is where the
+history ends up.
+
+Progress is kept per window in backfill_windows. A rerun skips windows that
+are done and redoes running (interrupted) or partial (a feed failed to fetch)
+ones. It first classifies any articles an interruption left unclassified.
+
+Run from backend/:
+    python backfill.py --start 2025-01-01 --end 2025-03-31
+    python backfill.py --start 2025-01-01 --end 2025-03-31 --window-days 7 --redo
+"""
+
+import argparse
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date, datetime, timedelta, timezone
+
+import db
+import etl
+import sources
+from config import (
+    BACKFILL_ARTICLES_PER_FEED,
+    BACKFILL_DEDUP_CHUNK,
+    BACKFILL_QUEUE_SIZE,
+    BACKFILL_WINDOW_DAYS,
+    BATCH_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+_PUT_POLL_SECONDS = 0.5
+
+
+class _StageError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _bounded(stage: Callable[[Iterable], Iterator], upstream: Iterable, name: str) -> Iterator:
+    """Run stage(upstream) on its own thread, yielding its output through a bounded queue.
+
+    If the consumer stops early (an exception, or close()), the producer is told
+    to stop rather than blocking on a full queue forever.
+    """
+    q: queue.Queue = queue.Queue(maxsize=BACKFILL_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_PUT_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def run():
+        try:
+            for item in stage(upstream):
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_StageError(e))
+            return
+        put(_END)
+
+    threading.Thread(target=run, name=f"backfill-{name}", daemon=True).start()
+    try:
+        while True:
+            item = q.get()
+            if item is _END:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+
+def windows(start: date, end: date, days: int) -> Iterator[tuple[date, date]]:
+    """[window_start, window_end) ranges covering start..end inclusive."""
+    d = start
+    while d <= end:
+        yield d, min(d + timedelta(days=days), end + timedelta(days=1))
+        d += timedelta(days=days)
+
+
+def _utc(d: date) -> datetime:
+    return datetime.combine(d, datetime.min.time(), tzinfo=timezone.utc)
+
+
+class _Window:
+    """One window's trip through the stages. Stage methods are generators over the previous stage."""
+
+    def __init__(self, start: date, end: date, feeds: list[dict], sector_names: dict[str, str]):
+        self.start = start
+        self.end = end
+        self.feeds = feeds
+        self.sector_names = sector_names
+        self.stats = {
+            "window_start": start.isoformat(),
+            "window_end": end.isoformat(),
+            "feeds": len(feeds),
+            "fetch_errors": 0,
+            "fetched": 0,
+            "new": 0,
+            "filtered": 0,
+            "inserted": 0,
+            "classified": 0,
+            "signals": 0,
+        }
+
+    def fetch(self, feeds: Iterable[dict]) -> Iterator[dict]:
+        since, until = _utc(self.start), _utc(self.end)
+        for feed, articles, error in sources.fetch_all(feeds, since, until, BACKFILL_ARTICLES_PER_FEED):
+            if error is not None:
+                logger.warning(f"Failed to fetch feed {feed['id']} for {self.start}: {error}")
+                self.stats["fetch_errors"] += 1
+                continue
+            self.stats["fetched"] += len(articles)
+            yield from articles
+
+    def dedup(self, articles: Iterable[dict]) -> Iterator[dict]:
+        # Against the database in chunks, and within the window (queries overlap)
+        seen: set[str] = set()
+        chunk: list[dict] = []
+
+        def flush():
+            existing = db.get_existing_urls([a["url"] for a in chunk])
+            for a in chunk:
+                if a["url"] not in existing:
+                    self.stats["new"] += 1
+                    yield a
+            chunk.clear()
+
+        for article in articles:
+            if article["url"] in seen:
+                continue
+            seen.add(article["url"])
+            chunk.append(article)
+            if len(chunk) >= BACKFILL_DEDUP_CHUNK:
+                yield from flush()
+        if chunk:
+            yield from flush()
+
+    def filter(self, articles: Iterable[dict]) -> Iterator[dict]:
+        for article in articles:
+            if etl._is_single_company_news(article["title"]):
+                self.stats["filtered"] += 1
+                continue
+            yield article
+
+    def insert(self, articles: Iterable[dict]) -> Iterator[list[dict]]:
+        """Insert per sector in BATCH_SIZE groups, yielding each group (with ids) for classification."""
+        pending: dict[str, list[dict]] = {}
+
+        def flush(sector_id):
+            inserted = db.insert_articles(pending.pop(sector_id))
+            self.stats["inserted"] += len(inserted)
+            return inserted
+
+        for article in articles:
+            group = pending.setdefault(article["sector_id"], [])
+            group.append(article)
+            if len(group) >= BATCH_SIZE:
+                if inserted := flush(article["sector_id"]):
+                    yield inserted
+        for sector_id in list(pending):
+            if inserted := flush(sector_id):
+                yield inserted
+
+    def classify(self, batches: Iterable[list[dict]]) -> Iterator[int]:
+        for batch in batches:
+            self.stats["signals"] += classify_batch(batch, self.sector_names)
+            self.stats["classified"] += len(batch)
+            yield len(batch)
+
+    def run(self) -> dict:
+        started = time.perf_counter()
+        articles = _bounded(self.fetch, self.feeds, "fetch")
+        articles = _bounded(self.dedup, articles, "dedup")
+        articles = _bounded(self.filter, articles, "filter")
+        batches = _bounded(self.insert, articles, "insert")
+        for _ in self.classify(batches):
+            pass
+
+        elapsed = time.perf_counter() - started
+        self.stats["elapsed_seconds"] = round(elapsed, 1)
+        self.stats["articles_per_second"] = round(self.stats["classified"] / elapsed, 2) if elapsed else None
+        return self.stats
+
+
+def classify_batch(articles: list[dict], sector_names: dict[str, str]) -> int:
+    """Classify stored articles of one sector and insert their signals, dated at publication. Returns signal count."""
+    sector_id = articles[0]["sector_id"]
+    signals = etl.batch_classify(articles, sector_names.get(sector_id, ""))
+    published = {a["id"]: a.get("published_at") for a in articles}
+    for signal in signals:
+        if published.get(signal["article_id"]):
+            signal["created_at"] = published[signal["article_id"]]
+    if signals:
+        db.insert_signals(signals)
+    return len(signals)
+
+
+def _in_window(article: dict, spans: list[tuple[datetime, datetime]]) -> bool:
+    if not article.get("published_at"):
+        return False
+    published = datetime.fromisoformat(article["published_at"])
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return any(start <= published < end for start, end in spans)
+
+
+def _classify_leftovers(interrupted: list[tuple[str, str]], feeds: list[dict], sector_names: dict[str, str]) -> int:
+    """Classify articles the interrupted windows inserted but never classified.
+
+    Only articles of the backfilled feeds published inside one of those windows
+    count. Other unclassified articles, like the ones a daily run deferred for
+    its token budget, are left alone.
+    """
+    feed_ids = {f["id"] for f in feeds}
+    spans = [(_utc(date.fromisoformat(start)), _utc(date.fromisoformat(end))) for start, end in interrupted]
+    count = 0
+    for sector_id in sector_names:
+        leftovers = [
+            a for a in db.get_unclassified_articles(sector_id)
+            if a.get("feed_id") in feed_ids and _in_window(a, spans)
+        ]
+        for i in range(0, len(leftovers), BATCH_SIZE):
+            classify_batch(leftovers[i : i + BATCH_SIZE], sector_names)
+            count += len(leftovers[i : i + BATCH_SIZE])
+    return count
+
+
+def backfill(start: date, end: date, window_days: int = BACKFILL_WINDOW_DAYS, redo: bool = False) -> list[dict]:
+    """Backfill every window in [start, end]. Returns per-window stats for the windows processed."""
+    feeds = db.get_all_active_feeds()
+    sector_names = {s["id"]: s["name"] for s in db.get_sectors()}
+    progress = db.get_backfill_windows()
+
+    interrupted = [key for key, w in progress.items() if w["status"] == "running"]
+    if interrupted:
+        count = _classify_leftovers(interrupted, feeds, sector_names)
+        logger.info(f"Classified {count} articles left by an interrupted backfill")
+
+    results = []
+    for window_start, window_end in windows(start, end, window_days):
+        key = (window_start.isoformat(), window_end.isoformat())
+        if not redo and progress.get(key, {}).get("status") == "done":
+            continue
+
+        db.save_backfill_window(*key, "running")
+        stats = _Window(window_start, window_end, feeds, sector_names).run()
+        status = "partial" if stats["fetch_errors"] else "done"
+        db.save_backfill_window(*key, status, stats)
+        results.append({**stats, "status": status})
+        logger.info(
+            f"{key[0]}..{key[1]} {status}: {stats['fetched']} fetched, {stats['new']} new, "
+            f"{stats['filtered']} filtered, {stats['signals']} signals in {stats['elapsed_seconds']}s "
+            f"({stats['articles_per_second']} articles/s)"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today() - timedelta(days=1))
+    parser.add_argument("--window-days", type=int, default=BACKFILL_WINDOW_DAYS)
+    parser.add_argument("--redo", action="store_true", help="reprocess windows already marked done")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    results = backfill(args.start, args.end, args.window_days, args.redo)
+
+    print(f"\n{'window':<23} {'status':<8} {'fetched':>8} {'new':>6} {'signals':>8} {'seconds':>8} {'art/s':>7}")
+    for r in results:
+        print(
+            f"{r['window_start']}..{r['window_end']:<11} {r['status']:<8} {r['fetched']:>8} {r['new']:>6} "
+            f"{r['signals']:>8} {r['elapsed_seconds']:>8} {r['articles_per_second'] or 0:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Classification wall time with one busy sector; exits non-zero if the shared
+pool is far off total batches / concurrency.
+
+Queues --busy-batches batches for one sector and --batches for every other
+sector against a simulated model that answers each call after --latency-ms.
+They're classified twice. The first pass runs the old way: sectors in
+parallel on MAX_WORKERS threads, each sector's batches back to back. The
+second pass puts every batch on the shared etl.ClassifyPool. Reports both
+wall times next to the pool's lower bound,
+ceil(total batches / concurrency) x latency.
+
+Run from backend/:
+    python -m benchmarks.bench_classify [--busy-batches 30] [--batches 3] [--concurrency 8] [--latency-ms 200]
+"""
+
+import argparse
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+TOLERANCE = 1.25  # pool wall time may exceed its lower bound by this factor
+
+
+class _SimulatedMessages:
+    """Answers record_classifications calls after a fixed latency, one neutral result per headline."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        headlines = len(re.findall(r"^\[\d+\]", kwargs["messages"][0]["content"], re.MULTILINE))
+        results = [
+            {"headline_index": i, "summary": "", "signal_type": "neutral", "sentiment": "neutral", "ir_relevance": 0.0}
+            for i in range(headlines)
+        ]
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="tool_use", name=kwargs["tools"][0]["name"], input={"results": results})],
+            stop_reason="tool_use",
+            model="simulated",
+            usage=SimpleNamespace(input_tokens=0, output_tokens=0, cache_read_input_tokens=0, cache_creation_input_tokens=0),
+        )
+
+
+def _articles(sector: dict, batches: int, batch_size: int) -> list[dict]:
+    return [
+        {"id": f"{sector['id']}-{i}", "sector_id": sector["id"], "feed_id": None, "title": f"{sector['name']} sector outlook {i}"}
+        for i in range(batches * batch_size)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--busy-batches", type=int, default=30, help="batches of the busy sector")
+    parser.add_argument("--batches", type=int, default=3, help="batches of every other sector")
+    parser.add_argument("--concurrency", type=int, default=8, help="shared pool workers")
+    parser.add_argument("--latency-ms", type=float, default=200, help="simulated model call latency")
+    args = parser.parse_args()
+
+    # The usage ledger needs somewhere to write
+    os.environ["STORAGE_BACKEND"] = "sqlite"
+    os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-classify-"), "classify.db")
+    import db
+    import etl
+    from config import BATCH_SIZE, MAX_WORKERS
+
+    latency = args.latency_ms / 1000
+    etl._get_anthropic = lambda: SimpleNamespace(messages=_SimulatedMessages(latency))
+    sectors = db.get_sectors()
+    work = {
+        s["id"]: _articles(s, args.busy_batches if i == 0 else args.batches, BATCH_SIZE)
+        for i, s in enumerate(sectors)
+    }
+    names = {s["id"]: s["name"] for s in sectors}
+    total_batches = args.busy_batches + args.batches * (len(sectors) - 1)
+    print(
+        f"{len(sectors)} sectors, {total_batches} batches ({names[sectors[0]['id']]}: {args.busy_batches}, "
+        f"others: {args.batches}), {args.latency_ms:.0f}ms per call\n"
+    )
+
+    # Per sector: batches back to back, parallel across MAX_WORKERS sectors
+    def sector_sequential(sector_id: str) -> int:
+        articles, today = work[sector_id], time.strftime("%Y-%m-%d")
+        return sum(
+            len(etl._classify_articles(articles[i : i + BATCH_SIZE], names[sector_id], today, None))
+            for i in range(0, len(articles), BATCH_SIZE)
+        )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        sequential_signals = sum(executor.map(sector_sequential, work))
+    sequential = time.perf_counter() - start
+
+    # Every batch on the shared pool
+    pool = etl.ClassifyPool(args.concurrency)
+    start = time.perf_counter()
+    futures = [pool.submit(articles, names[sector_id]) for sector_id, articles in work.items()]
+    pooled_signals = sum(len(f.result()[0]) for f in futures)
+    pooled = time.perf_counter() - start
+
+    bound = math.ceil(total_batches / args.concurrency) * latency
+    largest = args.busy_batches * latency
+    print(f"per-sector batches ({MAX_WORKERS} sector threads): {sequential:6.2f}s  (largest sector alone: {largest:.2f}s)")
+    print(f"shared pool ({args.concurrency} workers):            {pooled:6.2f}s  (lower bound: {bound:.2f}s)")
+    print(f"speedup: {sequential / pooled:.1f}x, peak concurrency {pool.stats()['peak_in_flight']}")
+
+    failures = []
+    if pooled_signals != sequential_signals:
+        failures.append(f"pool produced {pooled_signals} signals, per-sector {sequential_signals}")
+    if pooled > bound * TOLERANCE:
+        failures.append(f"pool took {pooled:.2f}s, over {TOLERANCE}x its {bound:.2f}s bound")
+    if pool.stats()["peak_in_flight"] > args.concurrency:
+        failures.append(f"pool ran {pool.stats()['peak_in_flight']} batches at once (limit {args.concurrency})")
+    if failures:
+        print()
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
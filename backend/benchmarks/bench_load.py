@@ -0,0 +1,275 @@
+"""
+Load test of the dashboard's read endpoints against latency SLOs; exits
+non-zero when a route misses its SLO.
+
+Seeds a SQLite database with --signals synthetic signals (plus financials and
+narratives), serves the app from it with uvicorn in a subprocess, and drives
+it with --concurrency virtual users. Each user picks a route by the --mix
+weights and sends requests back to back for --duration seconds, after a
+--warmup that isn't measured. Reports requests/s and p50/p95/p99 latency per
+route against SLOS, on stdout and, with --json, as a machine-readable report.
+
+--db reuses a seeded file across runs: seeding 1M signals takes minutes.
+--url targets an already running server instead, and skips seeding.
+
+Run from backend/:
+    python -m benchmarks.bench_load [--signals 10000] [--concurrency 16] [--duration 20]
+    python -m benchmarks.bench_load --signals 1000000 --db /tmp/load-1m.db --json load.json
+    python -m benchmarks.bench_load --mix init=1,sector=1,signals=4 --slo-file slos.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.seed_data import seed_dashboard, seed_signals
+from config import SIGNAL_TYPES
+
+# Per-route latency SLOs (ms) and max error rate; --slo-file overrides per route
+SLOS = {
+    "init": {"p95_ms": 500, "p99_ms": 1000, "max_error_rate": 0.001},
+    "sector": {"p95_ms": 300, "p99_ms": 600, "max_error_rate": 0.001},
+    "signals": {"p95_ms": 200, "p99_ms": 400, "max_error_rate": 0.001},
+}
+DEFAULT_MIX = "init=2,sector=5,signals=3"
+
+_SIGNAL_TYPES = [t for t in SIGNAL_TYPES if t != "neutral"]
+
+
+def _request(route: str, sector_ids: list[str], rng: random.Random) -> tuple[str, dict]:
+    """(path, params) for one request to a route, with the filters a dashboard user would vary."""
+    if route == "init":
+        return "/api/init", {"days": 7}
+    if route == "sector":
+        params = {"days": 7}
+        if rng.random() < 0.3:
+            params["signal_type"] = rng.choice(_SIGNAL_TYPES)
+        return f"/api/sectors/{rng.choice(sector_ids)}", params
+    if route == "signals":
+        params = {"days": rng.choice([7, 30]), "min_relevance": 0.5, "limit": 50}
+        if rng.random() < 0.5:
+            params["sector_id"] = rng.choice(sector_ids)
+        if rng.random() < 0.3:
+            params["signal_type"] = rng.choice(_SIGNAL_TYPES)
+        return "/api/signals", params
+    raise ValueError(f"unknown route {route!r} (expected one of {sorted(SLOS)})")
+
+
+def _parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        route, _, weight = part.partition("=")
+        if route.strip() not in SLOS:
+            raise SystemExit(f"unknown route {route.strip()!r} in --mix (expected one of {sorted(SLOS)})")
+        mix[route.strip()] = float(weight or 1)
+    return mix
+
+
+def _percentile(ordered: list[float], pct: float) -> float | None:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1)
+
+
+def _ms(value: float | None) -> str:
+    return f"{value:.1f}ms" if value is not None else "-"
+
+
+# ---------------------------------------------------------------------------
+# Data + server
+# ---------------------------------------------------------------------------
+
+def _prepare_db(path: str, signals: int, days: int) -> int:
+    """Seed path unless it already holds signals. Returns the signal count."""
+    os.environ["STORAGE_BACKEND"] = "sqlite"
+    from storage.sqlite_backend import SQLiteBackend
+
+    backend = SQLiteBackend(path)
+    existing = backend._query("SELECT COUNT(*) AS n FROM sector_signals")[0]["n"]
+    if existing:
+        print(f"using {path}: {existing:,} signals already seeded")
+        return existing
+
+    t0 = time.perf_counter()
+    seeded = seed_signals(backend, signals, days=days)
+    seed_dashboard(backend)
+    print(f"seeded {seeded:,} signals over {days} days in {time.perf_counter() - t0:.1f}s ({path})")
+    return seeded
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(db_path: str) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {**os.environ, "STORAGE_BACKEND": "sqlite", "SQLITE_PATH": db_path, "SCHEDULER_ENABLED": "0"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/api/health", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        if proc.poll() is not None:
+            raise SystemExit("server exited during startup")
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("server didn't come up within 30s")
+
+
+# ---------------------------------------------------------------------------
+# Load
+# ---------------------------------------------------------------------------
+
+async def _drive(url: str, mix: dict[str, float], concurrency: int, duration: float, warmup: float, seed: int) -> tuple[dict, float]:
+    """Run the closed-loop load. Returns ({route: {"latencies": [...], "errors": n}}, measured seconds)."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as client:
+        sector_ids = [s["id"] for s in (await client.get("/api/sectors")).json()]
+        routes, weights = list(mix), list(mix.values())
+        results = {route: {"latencies": [], "errors": 0} for route in routes}
+
+        started = time.perf_counter()
+        measure_from = started + warmup
+        stop_at = measure_from + duration
+
+        async def user(i: int) -> None:
+            rng = random.Random(seed + i)
+            while True:
+                route = rng.choices(routes, weights)[0]
+                path, params = _request(route, sector_ids, rng)
+                t0 = time.perf_counter()
+                if t0 >= stop_at:
+                    return
+                try:
+                    resp = await client.get(path, params=params, headers={"Accept-Encoding": "br, gzip"})
+                    await resp.aread()
+                    ok = resp.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                t1 = time.perf_counter()
+                if t0 >= measure_from:
+                    if ok:
+                        results[route]["latencies"].append((t1 - t0) * 1000)
+                    else:
+                        results[route]["errors"] += 1
+
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return results, duration
+
+
+def _report(results: dict, seconds: float, slos: dict) -> dict:
+    routes = {}
+    for route, r in results.items():
+        ordered = sorted(r["latencies"])
+        total = len(ordered) + r["errors"]
+        stats = {
+            "requests": total,
+            "errors": r["errors"],
+            "error_rate": round(r["errors"] / total, 4) if total else None,
+            "rps": round(total / seconds, 1),
+            "p50_ms": _percentile(ordered, 0.50),
+            "p95_ms": _percentile(ordered, 0.95),
+            "p99_ms": _percentile(ordered, 0.99),
+            "max_ms": round(ordered[-1], 1) if ordered else None,
+        }
+        slo = slos.get(route, {})
+        failures = []
+        for key in ("p95_ms", "p99_ms"):
+            if key in slo and (stats[key] is None or stats[key] > slo[key]):
+                failures.append(f"{key} {stats[key]} > {slo[key]}")
+        if "max_error_rate" in slo and (stats["error_rate"] or 0) > slo["max_error_rate"]:
+            failures.append(f"error_rate {stats['error_rate']} > {slo['max_error_rate']}")
+        routes[route] = {**stats, "slo": slo, "pass": not failures, "failures": failures}
+
+    total = sum(r["requests"] for r in routes.values())
+    return {
+        "routes": routes,
+        "total": {"requests": total, "rps": round(total / seconds, 1)},
+        "pass": all(r["pass"] for r in routes.values()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--signals", type=int, default=10000, help="synthetic signals to seed (10k..1M)")
+    parser.add_argument("--days", type=int, default=90, help="window the seeded signals are spread over")
+    parser.add_argument("--db", help="SQLite file to seed or reuse (default: fresh temp file)")
+    parser.add_argument("--url", help="load an already running server instead (no seeding)")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="route weights, e.g. init=2,sector=5,signals=3")
+    parser.add_argument("--slo-file", help='JSON {route: {"p95_ms": .., "p99_ms": .., "max_error_rate": ..}}')
+    parser.add_argument("--json", help="write the report here ('-' for stdout)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    mix = _parse_mix(args.mix)
+    slos = {route: dict(slo) for route, slo in SLOS.items()}
+    if args.slo_file:
+        with open(args.slo_file) as f:
+            for route, slo in json.load(f).items():
+                slos.setdefault(route, {}).update(slo)
+
+    proc, signals = None, None
+    url = args.url
+    if url is None:
+        db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="bench-load-"), "load.db")
+        signals = _prepare_db(db_path, args.signals, args.days)
+        proc, url = _start_server(db_path)
+    try:
+        print(f"{url}: {args.concurrency} users, mix {args.mix}, {args.warmup:.0f}s warmup + {args.duration:.0f}s\n")
+        results, seconds = asyncio.run(_drive(url, mix, args.concurrency, args.duration, args.warmup, args.seed))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    report = _report(results, seconds, slos)
+    report["config"] = {
+        "url": args.url, "signals": signals, "days": args.days, "concurrency": args.concurrency,
+        "duration": args.duration, "warmup": args.warmup, "mix": mix,
+    }
+
+    print(f"{'route':<10} {'requests':>9} {'rps':>8} {'errors':>7} {'p50':>9} {'p95':>9} {'p99':>9}  {'SLO p95/p99':<14} result")
+    for route, r in report["routes"].items():
+        slo = f"{r['slo'].get('p95_ms', '-')}/{r['slo'].get('p99_ms', '-')}"
+        print(
+            f"{route:<10} {r['requests']:>9} {r['rps']:>8} {r['errors']:>7} {_ms(r['p50_ms']):>9} "
+            f"{_ms(r['p95_ms']):>9} {_ms(r['p99_ms']):>9}  {slo:<14} {'ok' if r['pass'] else 'FAIL: ' + '; '.join(r['failures'])}"
+        )
+    print(f"\ntotal: {report['total']['requests']} requests, {report['total']['rps']} req/s")
+
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"report written to {args.json}")
+
+    if not report["pass"]:
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Work-queue throughput vs. worker count.
+
+Queues synthetic tasks that sleep for a fixed time (standing in for the RSS
+and model calls that dominate a real sector task) on a temp SQLite queue, then
+drains them with 1, 2, 4, ... worker processes and reports tasks/s and
+speedup over one worker. Claim/complete overhead and process start-up
+(imports, ~1s) show up as the gap from linear, so short runs understate
+scaling.
+
+Run from backend/:
+    python -m benchmarks.bench_queue [--tasks 200] [--task-ms 100] [--workers 1,2,4,8]
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+# Workers are spawned processes that import config fresh: point them at the temp DB
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(prefix="bench_queue_"), "queue.db"))
+
+import db  # noqa: E402
+import workqueue  # noqa: E402
+
+
+@workqueue.handler("bench_sleep")
+def _sleep_task(task: dict) -> dict:
+    time.sleep(int(task["unit"].split(":")[1]) / 1000)
+    return {"ok": True}
+
+
+def _drain(run_id: str, workers: int) -> float:
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=workqueue.run_worker, kwargs={"run_id": run_id, "exit_when_idle": True})
+        for _ in range(workers)
+    ]
+    start = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--task-ms", type=int, default=100)
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+
+    print(f"{args.tasks} tasks x {args.task_ms}ms on {os.environ['SQLITE_PATH']}\n")
+    print(f"{'workers':>8} {'seconds':>9} {'tasks/s':>9} {'speedup':>8} {'efficiency':>11}")
+    baseline = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        run_id = db.create_pipeline_run()["id"]
+        db.enqueue_tasks(run_id, "bench_sleep", [f"{i}:{args.task_ms}" for i in range(args.tasks)], 1)
+        elapsed = _drain(run_id, workers)
+
+        done = sum(1 for t in db.get_tasks(run_id, "bench_sleep") if t["status"] == "done")
+        if done != args.tasks:
+            print(f"  warning: only {done}/{args.tasks} tasks completed")
+        throughput = args.tasks / elapsed
+        baseline = baseline or throughput
+        speedup = throughput / baseline
+        print(f"{workers:>8} {elapsed:>9.2f} {throughput:>9.1f} {speedup:>7.2f}x {speedup / workers:>10.0%}")
+        db.update_pipeline_run(run_id, "completed")
+
+
+if __name__ == "__main__":
+    main()
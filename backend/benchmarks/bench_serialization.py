@@ -0,0 +1,163 @@
+"""
+Serialization + compression benchmark through the app's real response path.
+
+Seeds a throwaway SQLite backend with a synthetic signal set (all in one
+sector) and requests the heavy JSON routes through a TestClient:
+/api/sectors/{id} (every signal of the window) and /api/signals at its
+maximum limit. Each route is timed twice with the same handler and data:
+
+    before: the handler mounted without a return type, i.e. FastAPI's
+            jsonable_encoder walk + stdlib json
+    after:  main.app as shipped, where the declared return type makes Pydantic
+            serialize straight to bytes
+
+"handler only" is the handler called directly (the database read both paths
+share). Bytes on the wire are the Content-Length main.app sends with and
+without Accept-Encoding.
+
+Run from backend/:
+    python -m benchmarks.bench_serialization [--signals 5000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+WINDOW_DAYS = 30
+SIGNALS_LIMIT = 200  # /api/signals caps limit at 200
+
+
+def make_signals(n: int, seed: int = 42) -> list[dict]:
+    """Signal rows shaped like get_all_signals output (signal + embedded article)."""
+    from config import SIGNAL_TYPES
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    types = list(SIGNAL_TYPES)
+    words = (
+        "regulators tariff outlook margins demand supply rates capex guidance "
+        "consolidation pricing inflation downgrade semiconductor pharma banks"
+    ).split()
+    rows = []
+    for i in range(n):
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * (WINDOW_DAYS - 1)))
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "article_id": str(uuid.uuid4()),
+            "sector_id": str(uuid.UUID(int=rng.randint(1, 11))),
+            "summary": " ".join(rng.choices(words, k=rng.randint(18, 40))).capitalize() + ".",
+            "signal_type": rng.choice(types),
+            "sentiment": rng.choice(["positive", "negative", "neutral"]),
+            "ir_relevance": round(rng.random(), 2),
+            "created_at": created.isoformat(),
+            "sector_articles": {
+                "title": " ".join(rng.choices(words, k=rng.randint(8, 14))).title() + " - Reuters",
+                "url": f"https://news.example.com/articles/{i}-{rng.getrandbits(48):x}",
+                "source": rng.choice(["Reuters", "Bloomberg", "WSJ", "CNBC", "FT"]),
+                "published_at": (created - timedelta(hours=rng.randint(0, 12))).isoformat(),
+            },
+        })
+    return rows
+
+
+def seed(db, sector_id: str, rows: list[dict]) -> None:
+    """Store the synthetic rows as articles + signals of one sector."""
+    for start in range(0, len(rows), 500):
+        chunk = rows[start : start + 500]
+        articles = db.insert_articles([{**r["sector_articles"], "sector_id": sector_id} for r in chunk])
+        ids = {a["url"]: a["id"] for a in articles}
+        db.insert_signals([
+            {
+                "article_id": ids[r["sector_articles"]["url"]],
+                "sector_id": sector_id,
+                "summary": r["summary"],
+                "signal_type": r["signal_type"],
+                "sentiment": r["sentiment"],
+                "ir_relevance": r["ir_relevance"],
+                "created_at": r["created_at"],
+            }
+            for r in chunk
+        ])
+
+
+def _time_ms(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--signals", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ["STORAGE_BACKEND"] = "sqlite"
+    os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-serialization-"), "serialization.db")
+    from fastapi import FastAPI
+    from fastapi.routing import APIRoute
+    from fastapi.testclient import TestClient
+
+    import db
+    import main as api
+    from responses import brotli
+
+    sector_id = db.get_sectors()[0]["id"]
+    seed(db, sector_id, make_signals(args.signals))
+
+    routes = {
+        "/api/sectors/{id}": (
+            f"/api/sectors/{sector_id}?days={WINDOW_DAYS}",
+            lambda: api.get_sector_detail(sector_id, days=WINDOW_DAYS, signal_type=None, sentiment=None),
+        ),
+        f"/api/signals?limit={SIGNALS_LIMIT}": (
+            f"/api/signals?days={WINDOW_DAYS}&min_relevance=0&limit={SIGNALS_LIMIT}",
+            lambda: api.get_signals(
+                sector_id=None, signal_type=None, sentiment=None, min_relevance=0.0,
+                days=WINDOW_DAYS, limit=SIGNALS_LIMIT, sort="recent", diversify=False,
+            ),
+        ),
+    }
+
+    # Same handlers without a declared response type: FastAPI's jsonable_encoder path
+    baseline = FastAPI()
+    for route in api.app.routes:
+        if isinstance(route, APIRoute) and route.path in ("/api/sectors/{sector_id}", "/api/signals"):
+            baseline.add_api_route(route.path, route.endpoint, methods=list(route.methods), response_model=None)
+    before, after = TestClient(baseline), TestClient(api.app)
+    identity = {"Accept-Encoding": "identity"}
+
+    print(f"Payload: {args.signals} signals in one sector, {args.repeat} repeats (median / best)\n")
+    print(f"{'route':<26} {'path':<32} {'median ms':>10} {'best ms':>10}")
+    for label, (url, handler) in routes.items():
+        if before.get(url, headers=identity).json() != after.get(url, headers=identity).json():
+            raise SystemExit(f"{label}: before and after bodies differ")
+        for name, fn in [
+            ("handler only", handler),
+            ("before: jsonable_encoder + json", lambda: before.get(url, headers=identity)),
+            ("after:  declared return type", lambda: after.get(url, headers=identity)),
+        ]:
+            median, best = _time_ms(fn, args.repeat)
+            print(f"{label:<26} {name:<32} {median:>10.2f} {best:>10.2f}")
+
+    print(f"\n{'route':<26} {'Accept-Encoding':<32} {'bytes':>10} {'ratio':>10}")
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    for label, (url, _) in routes.items():
+        raw = None
+        for encoding in encodings:
+            resp = after.get(url, headers={"Accept-Encoding": encoding})
+            size = int(resp.headers["content-length"])
+            raw = raw or size
+            print(f"{label:<26} {encoding:<32} {size:>10,} {size / raw:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Source adapter throughput against the offline stand-ins; exits non-zero if a
+source's concurrency limit is exceeded.
+
+Fetches --feeds synthetic feeds of every feed_type through the fixture
+transport (sources.offline) with a simulated per-request latency, first one
+at a time, then all at once through the fetch scheduler, and reports
+articles/s and the peak number of concurrent requests each source saw.
+
+Run from backend/:
+    python -m benchmarks.bench_sources [--feeds 20] [--latency-ms 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+QUERIES = {
+    "google_news": lambda i: f'"industry {i}" OR "sector {i}"',
+    "einnews": lambda i: f"industry{i}",
+    "federal_register": lambda i: ("agency=FDA,HHS,CMS", "agency=SEC,FDIC,OCC,CFPB", "agency=EPA,DOE,FERC")[i % 3],
+}
+
+
+def _feeds(n: int) -> list[dict]:
+    return [
+        {"id": f"{feed_type}-{i}", "sector_id": "bench", "feed_type": feed_type, "query": query(i)}
+        for feed_type, query in QUERIES.items()
+        for i in range(n)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--feeds", type=int, default=20, help="feeds per feed_type")
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--limit", type=int, default=10, help="articles per feed")
+    args = parser.parse_args()
+
+    # Config is read at import: switch the adapters to the fixture transport first
+    os.environ["SOURCES_OFFLINE"] = "1"
+    os.environ["SOURCES_OFFLINE_LATENCY_MS"] = str(args.latency_ms)
+    import sources
+
+    feeds = _feeds(args.feeds)
+    transport = sources.offline_transport()
+
+    print(f"{len(feeds)} feeds ({args.feeds} per source), {args.latency_ms:.0f}ms per request, {args.limit} articles/feed\n")
+
+    # Sequential: adapters called directly, one fetch at a time
+    sequential: dict[str, tuple[int, float]] = {}
+    for feed_type in QUERIES:
+        adapter = sources.get_adapter(feed_type)
+        start = time.perf_counter()
+        articles = sum(len(adapter.fetch(f, f["sector_id"], limit=args.limit)) for f in feeds if f["feed_type"] == feed_type)
+        sequential[feed_type] = (articles, time.perf_counter() - start)
+    transport.peak_in_flight.clear()
+
+    # Concurrent: every feed through the scheduler at once
+    start = time.perf_counter()
+    per_source: dict[str, list[float]] = {feed_type: [0, 0.0] for feed_type in QUERIES}
+    for feed, articles, error in sources.fetch_all(feeds, limit=args.limit):
+        if error is not None:
+            print(f"FAIL: {feed['id']}: {error}")
+            sys.exit(1)
+        per_source[feed["feed_type"]][0] += len(articles)
+        per_source[feed["feed_type"]][1] = time.perf_counter() - start
+    total = time.perf_counter() - start
+
+    hosts = {"google_news": "news.google.com", "federal_register": "www.federalregister.gov"}
+    failures = []
+    print(f"{'source':<18} {'limit':>5} {'peak':>5} {'articles':>9} {'seq art/s':>10} {'conc art/s':>11} {'speedup':>8}")
+    for feed_type, (articles, elapsed) in per_source.items():
+        limit = sources.get_adapter(feed_type).max_concurrency
+        if feed_type in hosts:
+            peak = transport.peak_in_flight[hosts[feed_type]]
+        else:
+            # One host per EINNews industry: the scheduler's own count is the per-source peak
+            peak = sources.stats()[feed_type]["peak_in_flight"]
+        seq_articles, seq_elapsed = sequential[feed_type]
+        seq_rate, conc_rate = seq_articles / seq_elapsed, articles / elapsed
+        print(
+            f"{feed_type:<18} {limit:>5} {peak:>5} {articles:>9} {seq_rate:>10.1f} {conc_rate:>11.1f} "
+            f"{conc_rate / seq_rate:>7.1f}x"
+        )
+        if peak > limit:
+            failures.append(f"{feed_type} reached {peak} concurrent requests (limit {limit})")
+
+    seq_total = sum(e for _, e in sequential.values())
+    print(f"\nall sources: {seq_total:.2f}s one at a time, {total:.2f}s through the scheduler ({seq_total / total:.1f}x)")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+API cold-start import benchmark; exits non-zero on a regression.
+
+Imports main in fresh interpreters under `python -X importtime` and reports
+the median cumulative import time of main plus its slowest direct imports.
+Then, in one more fresh interpreter on a throwaway SQLite backend, calls every
+read route once. Fails (exit 1) when the median exceeds the budget, or when
+any pipeline-only module (etl and the heavy libraries it pulls in) is imported
+at startup or by a read route.
+
+Run from backend/:
+    python -m benchmarks.bench_startup [--repeat 5] [--budget-ms 1000]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Only the pipeline routes may load these (lazily, on first call)
+FORBIDDEN = {"etl", "scheduler", "narrative_stream", "workqueue", "sources", "anthropic", "yfinance", "pandas", "feedparser"}
+STARTUP_BUDGET_MS = 1000
+
+# GET routes that must stay on the read path ({sector_id} is filled in with a real sector)
+READ_ROUTES = [
+    "/api/health",
+    "/api/health/db",
+    "/api/health/stream",
+    "/api/init",
+    "/api/sectors",
+    "/api/sectors/{sector_id}",
+    "/api/sectors/{sector_id}/trend",
+    "/api/trends",
+    "/api/signals",
+    "/api/signals?sort=ranked",
+    "/api/search?q=tariff",
+    "/api/export/signals",
+    "/api/pipeline/schedule",
+    "/api/pipeline/usage",
+    "/api/config/signal-types",
+]
+
+_CALL_READ_ROUTES = """
+import sys
+from fastapi.testclient import TestClient
+import db, main
+client = TestClient(main.app)
+sector_id = db.get_sectors()[0]["id"]
+for route in sys.argv[1:]:
+    resp = client.get(route.format(sector_id=sector_id))
+    if resp.status_code != 200:
+        sys.exit(f"{route}: HTTP {resp.status_code}")
+print(" ".join(sorted({name.split(".")[0] for name in sys.modules})))
+"""
+
+
+def _import_profile() -> tuple[float, dict[str, float], set[str]]:
+    """One cold `import main`: (main cumulative ms, {direct import: cumulative ms}, top-level packages loaded)."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    main_ms, direct, packages = 0.0, {}, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        ms = int(cumulative) / 1000
+        packages.add(name.split(".")[0])
+        if name == "main":
+            main_ms = ms
+        elif depth == 1:
+            # Direct imports of main (or of site, which -X importtime lists first)
+            direct[name] = ms
+    return main_ms, direct, packages
+
+
+def _read_route_packages() -> tuple[set[str], str | None]:
+    """(top-level packages loaded, error) after one call to each of READ_ROUTES in a fresh interpreter."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {
+        **os.environ,
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_PATH": os.path.join(tempfile.mkdtemp(prefix="bench-startup-"), "startup.db"),
+        "SCHEDULER_ENABLED": "0",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-c", _CALL_READ_ROUTES, *READ_ROUTES],
+        cwd=backend_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return set(), (proc.stderr.strip().splitlines() or ["no output"])[-1]
+    return set(proc.stdout.split()), None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    runs = [_import_profile() for _ in range(args.repeat)]
+    median_ms = statistics.median(r[0] for r in runs)
+    _, direct, packages = runs[-1]
+
+    print(f"import main: median {median_ms:.0f}ms over {args.repeat} cold starts (budget {args.budget_ms:.0f}ms)\n")
+    print("slowest direct imports (last run):")
+    for name, ms in sorted(direct.items(), key=lambda kv: kv[1], reverse=True)[:10]:
+        print(f"  {ms:>8.1f}ms  {name}")
+
+    failures = []
+    leaked = sorted(FORBIDDEN & packages)
+    if leaked:
+        failures.append(f"pipeline-only modules imported at startup: {', '.join(leaked)}")
+    read_packages, error = _read_route_packages()
+    print(f"\nread routes: called {len(READ_ROUTES)}")
+    if error:
+        failures.append(f"read routes failed: {error}")
+    leaked = sorted(FORBIDDEN & read_packages)
+    if leaked:
+        failures.append(f"pipeline-only modules imported by read routes: {', '.join(leaked)}")
+    if median_ms > args.budget_ms:
+        failures.append(f"startup {median_ms:.0f}ms exceeds budget {args.budget_ms:.0f}ms")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Read-path latency of the storage backends, side by side.
+
+The SQLite backend is benchmarked on a fresh temp file seeded with synthetic
+signals. The Supabase backend (only when SUPABASE_URL is set) is read-only
+against whatever data the project already has.
+
+Run from backend/:
+    python -m benchmarks.bench_storage [--signals 20000] [--repeat 30] [--backends sqlite,supabase]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from config import SUPABASE_URL
+from storage import create_backend
+from storage.sqlite_backend import SQLiteBackend
+from benchmarks.seed_data import seed_signals
+
+
+def _operations(backend) -> list[tuple[str, callable]]:
+    def since(days: int) -> str:
+        return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+    sectors = backend.get_sectors()
+    sector_id = sectors[0]["id"]
+    return [
+        ("get_sectors", lambda: backend.get_sectors()),
+        ("get_sector", lambda: backend.get_sector(sector_id)),
+        ("get_all_financials", lambda: backend.get_all_financials()),
+        ("get_sector_signals 7d", lambda: backend.get_sector_signals(sector_id, since(7), None, None, 0.0)),
+        ("get_all_signals limit=200", lambda: backend.get_all_signals(since(7), None, None, None, 0.5, 200)),
+        ("get_all_latest_narratives", lambda: backend.get_all_latest_narratives()),
+        ("search_signals 'tariff'", lambda: backend.search_signals("tariff", since(30), None, None, None, 0.0, 50)),
+        ("get_signal_rollup 365d", lambda: backend.get_signal_rollup(since(365)[:10], None)),
+        ("init (11x sector signals)", lambda: [backend.get_sector_signals(s["id"], since(7), None, None, 0.0) for s in sectors]),
+    ]
+
+
+def _bench(backend, repeat: int) -> list[tuple[str, float, float]]:
+    results = []
+    for label, fn in _operations(backend):
+        fn()  # warm caches / connection
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - t0) * 1000)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        results.append((label, statistics.median(samples), p95))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--signals", type=int, default=20000, help="synthetic signals seeded into SQLite")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--backends", default="sqlite,supabase")
+    args = parser.parse_args()
+
+    report: dict[str, list] = {}
+    for name in args.backends.split(","):
+        if name == "sqlite":
+            path = os.path.join(tempfile.mkdtemp(prefix="bench-storage-"), "bench.db")
+            backend = SQLiteBackend(path)
+            t0 = time.perf_counter()
+            seeded = seed_signals(backend, args.signals)
+            print(f"sqlite: seeded {seeded:,} signals in {time.perf_counter() - t0:.1f}s ({path})")
+        elif name == "supabase":
+            if not SUPABASE_URL:
+                print("supabase: skipped (SUPABASE_URL not set)")
+                continue
+            backend = create_backend("supabase")
+        else:
+            raise SystemExit(f"unknown backend {name!r}")
+        report[name] = _bench(backend, args.repeat)
+
+    names = list(report)
+    header = f"{'operation':<30}" + "".join(f"{n + ' p50':>16}{n + ' p95':>16}" for n in names)
+    print("\n" + header)
+    for i, (label, _, _) in enumerate(next(iter(report.values()), [])):
+        line = f"{label:<30}"
+        for n in names:
+            _, p50, p95 = report[n][i]
+            line += f"{p50:>14.2f}ms{p95:>14.2f}ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
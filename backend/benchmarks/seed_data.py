@@ -0,0 +1,85 @@
+"""
+Synthetic data for benchmarks: articles + classified signals spread over a
+time window, bulk-loaded through the backend's own insert paths.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from config import SIGNAL_TYPES
+
+_WORDS = (
+    "regulators tariff outlook margins demand supply rates capex guidance consolidation "
+    "pricing inflation downgrade semiconductor pharma banks drug export controls reit "
+    "utilities grid oil opec mining steel retail consumer spending streaming telecom"
+).split()
+
+
+def seed_signals(backend, n_signals: int, days: int = 90, batch_size: int = 5000, seed: int = 7) -> int:
+    """Insert n_signals (one article each) across all sectors. Returns rows inserted."""
+    rng = random.Random(seed)
+    sectors = backend.get_sectors()
+    feeds_by_sector = {s["id"]: backend.get_sector_feeds(s["id"]) for s in sectors}
+    types = list(SIGNAL_TYPES)
+    now = datetime.now(timezone.utc)
+    run_tag = f"{now:%Y%m%d%H%M%S}-{rng.getrandbits(32):x}"
+
+    inserted = 0
+    for start in range(0, n_signals, batch_size):
+        count = min(batch_size, n_signals - start)
+        articles, meta = [], []
+        for i in range(start, start + count):
+            sector = rng.choice(sectors)
+            feeds = feeds_by_sector[sector["id"]]
+            created = now - timedelta(seconds=rng.randint(0, days * 86400))
+            articles.append({
+                "sector_id": sector["id"],
+                "feed_id": rng.choice(feeds)["id"] if feeds else None,
+                "title": " ".join(rng.choices(_WORDS, k=rng.randint(8, 14))).title() + " - Reuters",
+                "url": f"https://bench.example.com/{run_tag}/{i}",
+                "source": rng.choice(["Reuters", "Bloomberg", "WSJ", "CNBC", "FT"]),
+                "published_at": (created - timedelta(hours=rng.randint(0, 12))).isoformat(),
+            })
+            meta.append(created)
+
+        rows = backend.insert_articles(articles)
+        created_by_url = {a["url"]: c for a, c in zip(articles, meta)}
+        signals = []
+        for row in rows:
+            signal_type = rng.choice(types)
+            signals.append({
+                "article_id": row["id"],
+                "sector_id": row["sector_id"],
+                "summary": " ".join(rng.choices(_WORDS, k=rng.randint(18, 40))).capitalize() + ".",
+                "signal_type": signal_type,
+                "sentiment": rng.choice(["positive", "negative", "neutral"]),
+                "ir_relevance": 0.0 if signal_type == "neutral" else round(rng.random(), 2),
+                "created_at": created_by_url[row["url"]].isoformat(timespec="microseconds"),
+            })
+        backend.insert_signals(signals)
+        inserted += len(signals)
+    return inserted
+
+
+def seed_dashboard(backend, seed: int = 7) -> None:
+    """Financials and a narrative for every sector, so dashboard routes return full payloads."""
+    rng = random.Random(seed)
+    for sector in backend.get_sectors():
+        backend.upsert_sector_financials(sector["id"], {
+            "etf_price": round(rng.uniform(40, 250), 2),
+            "price_change_7d": round(rng.uniform(-5, 5), 2),
+            "price_change_30d": round(rng.uniform(-10, 10), 2),
+            "price_change_ytd": round(rng.uniform(-20, 30), 2),
+            "vs_spy_7d": round(rng.uniform(-3, 3), 2),
+            "vs_spy_30d": round(rng.uniform(-6, 6), 2),
+            "volume_avg_30d": rng.randint(1_000_000, 20_000_000),
+        })
+        backend.insert_narrative({
+            "sector_id": sector["id"],
+            "summary_short": " ".join(rng.choices(_WORDS, k=20)).capitalize() + ".",
+            "summary_full": " ".join(rng.choices(_WORDS, k=160)).capitalize() + ".",
+            "key_themes": [" ".join(rng.choices(_WORDS, k=3)) for _ in range(4)],
+            "ir_talking_points": [" ".join(rng.choices(_WORDS, k=12)) for _ in range(3)],
+            "sentiment": rng.choice(["positive", "negative", "neutral", "mixed"]),
+            "signal_count": rng.randint(5, 40),
+        })
@@ -4,6 +4,10 @@ from dotenv import load_dotenv
 
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
+# --- Storage ---
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "supabase")  # "supabase" or "sqlite"
+SQLITE_PATH = os.environ.get("SQLITE_PATH", str(Path(__file__).resolve().parent.parent / "data" / "tracker.db"))
+
 # --- Supabase ---
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY", "")
@@ -15,8 +19,124 @@ HAIKU_MODEL = "claude-haiku-4-5-20251001"
 # --- Pipeline ---
 BATCH_SIZE = 8  # articles per Claude API call
 MAX_WORKERS = 5  # ThreadPoolExecutor for parallel sector processing
+# Classification batches from every sector share one pool of this many concurrent model calls
+CLASSIFY_MAX_CONCURRENCY = int(os.environ.get("CLASSIFY_MAX_CONCURRENCY", "8"))
 ARTICLES_PER_FEED = 10  # max articles to fetch per RSS feed (halved from 20)
 GOOGLE_NEWS_RSS_URL = "https://news.google.com/rss/search?q={query}+when:7d&hl=en-US&gl=US&ceid=US:en"
+# Same search restricted to a date range (backfill.py); before: is exclusive
+GOOGLE_NEWS_RSS_RANGE_URL = (
+    "https://news.google.com/rss/search?q={query}+after:{after}+before:{before}&hl=en-US&gl=US&ceid=US:en"
+)
+# A sector's latest narrative is reused (no Claude call) while its top signals, prompt and
+# model are unchanged and no ETF figure in the prompt has moved more than this many points
+NARRATIVE_FIN_DRIFT_PCT = float(os.environ.get("NARRATIVE_FIN_DRIFT_PCT", "1.0"))
+
+# --- Sources ---
+# sector_feeds.feed_type picks the adapter in sources/ (google_news, einnews, federal_register).
+# Per-source concurrency and request spacing are set on each adapter class.
+EINNEWS_RSS_URL = "https://{industry}.einnews.com/all_rss"
+FEDERAL_REGISTER_API_URL = "https://www.federalregister.gov/api/v1/documents.json"
+FEDERAL_REGISTER_PER_PAGE = 20
+FEDERAL_REGISTER_MAX_PAGES = 5  # per fetch; a feed's limit usually stops paging sooner
+SOURCE_HTTP_TIMEOUT = 15.0
+# Serve every source from sources/fixtures (offline development, benchmarks/bench_sources.py)
+SOURCES_OFFLINE = os.environ.get("SOURCES_OFFLINE", "0") == "1"
+SOURCES_OFFLINE_LATENCY_MS = float(os.environ.get("SOURCES_OFFLINE_LATENCY_MS", "0"))  # simulated per request
+
+# --- Work Queue ---
+# "threads": sectors/narratives run on MAX_WORKERS threads in the run_pipeline process.
+# "queue": they become pipeline_tasks rows leased by worker processes (python worker.py),
+# on this host or any other pointed at the same database.
+PIPELINE_MODE = os.environ.get("PIPELINE_MODE", "threads")
+QUEUE_LOCAL_WORKERS = int(os.environ.get("QUEUE_LOCAL_WORKERS", "0"))  # processes run_pipeline spawns itself
+QUEUE_LEASE_SECONDS = 300  # a task whose worker stops renewing goes back on the queue after this
+QUEUE_MAX_ATTEMPTS = 3
+QUEUE_POLL_SECONDS = 1.0
+QUEUE_RUN_TIMEOUT_SECONDS = 3600  # coordinator gives up waiting (run is marked failed, resumable)
+
+# --- Backfill ---
+# backfill.py walks date windows through a streaming fetch -> dedup -> filter -> insert -> classify
+# pipeline; each stage hands items to the next through a queue of at most BACKFILL_QUEUE_SIZE.
+BACKFILL_WINDOW_DAYS = 1
+BACKFILL_ARTICLES_PER_FEED = 20  # per feed per window (ARTICLES_PER_FEED is per daily run)
+BACKFILL_QUEUE_SIZE = 64
+BACKFILL_DEDUP_CHUNK = 100  # URLs per existing-URL lookup
+
+# --- Token Budget ---
+# Per-run cap on model tokens (input + output + prompt-cache reads/writes), 0 = unlimited.
+# Under a budget, articles from the highest-yield feeds (signals per article, from the
+# llm_usage ledger) are classified first and the rest are stored unclassified.
+PIPELINE_TOKEN_BUDGET = int(os.environ.get("PIPELINE_TOKEN_BUDGET", "0"))
+USAGE_HISTORY_DAYS = 30  # ledger window for feed yield and per-call cost estimates
+USAGE_DEFAULT_TOKENS_PER_ARTICLE = 150  # classification cost estimate before the ledger has history
+USAGE_DEFAULT_TOKENS_PER_NARRATIVE = 2000
+USAGE_BUDGET_SYNC_SECONDS = 5.0  # how often a process re-reads the run's spend (other workers)
+
+# --- Scheduler ---
+# Per-feed refresh loop (scheduler.py). Each feed's interval tracks its yield: an EWMA of
+# new (non-duplicate, non-filtered) articles per fetch, steered toward SCHEDULER_TARGET_YIELD.
+SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "0") == "1"  # run inside the API process
+SCHEDULER_TICK_SECONDS = 30
+SCHEDULER_MAX_CONCURRENCY = 4  # feeds refreshed at once, across all sectors
+SCHEDULER_DEFAULT_INTERVAL = 2 * 3600  # seconds; first interval for a feed with no history
+SCHEDULER_MIN_INTERVAL = 15 * 60
+SCHEDULER_MAX_INTERVAL = 24 * 3600
+SCHEDULER_TARGET_YIELD = 3.0  # new articles per fetch we aim for
+SCHEDULER_YIELD_ALPHA = 0.3  # EWMA weight of the latest fetch
+SCHEDULER_JITTER = 0.1  # +/- fraction applied to every interval
+SCHEDULER_FAILURE_BACKOFF_MAX = 6 * 3600  # cap on exponential backoff for failing feeds
+SCHEDULER_NARRATIVE_INTERVAL = 6 * 3600  # min seconds between scheduler-driven narrative refreshes
+
+# --- Reference-data cache ---
+# db serves sectors, active feeds and financials from memory; 0 disables a table's cache.
+# Writes through db and finished pipeline runs invalidate it immediately, other processes' writes
+# show up within the TTL.
+REFERENCE_CACHE_TTL_SECONDS = float(os.environ.get("REFERENCE_CACHE_TTL_SECONDS", "300"))
+FINANCIALS_CACHE_TTL_SECONDS = float(os.environ.get("FINANCIALS_CACHE_TTL_SECONDS", "60"))
+
+# --- Supabase HTTP transport ---
+# One pool shared by pipeline workers (sector + narrative executors) and the API threadpool
+SUPABASE_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_MAX_CONNECTIONS", MAX_WORKERS * 2 + 10))
+SUPABASE_KEEPALIVE_SECONDS = 120.0
+SUPABASE_HTTP2 = os.environ.get("SUPABASE_HTTP2", "1") == "1"  # multiplexes requests over few connections
+SUPABASE_READ_RETRIES = 3  # GET/HEAD only; writes are never retried by the transport
+SUPABASE_RETRY_BACKOFF_SECONDS = 0.2
+SUPABASE_CONNECT_TIMEOUT = 5.0
+SUPABASE_READ_TIMEOUT = 30.0
+SUPABASE_POOL_TIMEOUT = 10.0  # max wait for a free pooled connection
+
+# --- API ---
+COMPRESSION_MIN_SIZE = 1024  # bytes; smaller JSON bodies are sent uncompressed
+
+# --- Live Events ---
+# GET /api/stream pushes signal and narrative writes to dashboards (events.py)
+EVENTS_HISTORY_SIZE = 1000  # recent events kept for Last-Event-ID resume
+EVENTS_CLIENT_BUFFER = 256  # per subscriber; a client further behind gets a reset event
+EVENTS_KEEPALIVE_SECONDS = 25.0  # comment sent on idle streams so proxies keep them open
+
+# --- Search ---
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "postgres")  # "postgres" (tsvector + GIN) or "local"
+SEARCH_INDEX_DAYS = 180  # local index retention window
+SEARCH_INDEX_REFRESH_SECONDS = 300  # local index pulls newer signals at most this often
+
+# --- Ranking ---
+# /api/signals?sort=ranked and narrative inputs: ir_relevance x recency decay x source weight (ranking.py)
+RANKING_HALF_LIFE_HOURS = float(os.environ.get("RANKING_HALF_LIFE_HOURS", "48"))
+RANKING_DEFAULT_SOURCE_WEIGHT = 1.0
+RANKING_SOURCE_WEIGHTS = {  # lowercased article source -> weight
+    "reuters": 1.3,
+    "bloomberg": 1.3,
+    "the wall street journal": 1.25,
+    "financial times": 1.25,
+    "associated press": 1.2,
+    "cnbc": 1.1,
+    "federal register": 1.2,
+    "pr newswire": 0.7,
+    "business wire": 0.7,
+    "globenewswire": 0.7,
+}
+RANKING_DIVERSITY_POOL = 4  # diversify picks k results from the best k x this
+RANKING_DIVERSITY_PENALTY = 0.7  # per signal already picked from the same sector, and of the same type
 
 # --- ETF Tickers ---
 SECTOR_ETF_TICKERS = ["XLK", "XLV", "XLF", "XLE", "XLI", "XLY", "XLP", "XLB", "XLRE", "XLC", "XLU"]
@@ -95,18 +215,7 @@ Headlines:
 
 Remember: DEFAULT to neutral. Only classify as a non-neutral signal type when the headline clearly affects multiple companies across the sector.
 
-Respond with ONLY this JSON:
-{{
-  "results": [
-    {{
-      "headline_index": 0,
-      "summary": "1-2 sentence summary focused on sector-level implication",
-      "signal_type": "one of the types above",
-      "sentiment": "positive | negative | neutral",
-      "ir_relevance": 0.0
-    }}
-  ]
-}}"""
+Record one result per headline with the record_classifications tool."""
 
 NARRATIVE_PROMPT = """<role>
 You are a senior macro strategist writing a sector briefing for IR professionals.
@@ -146,11 +255,65 @@ ETF: {etf_ticker}
 vs S&P 500 (30D): {vs_spy_30d}
 </sector_context>
 
-Respond with ONLY this JSON:
-{{
-    "summary_short": "1 sentence naming the specific driver",
-    "summary_full": "2-3 paragraphs referencing specific signals and data points",
-    "key_themes": ["specific theme 1", "specific theme 2"],
-    "ir_talking_points": ["Complete statement for investor conversations", "Another specific talking point"],
-    "sentiment": "positive | negative | neutral | mixed"
-}}"""
+Record the briefing with the record_narrative tool."""
+
+# --- Output schemas ---
+# Both model calls answer through a forced, strict tool call instead of free-text JSON.
+# Strict tool schemas can't carry numeric bounds, so ir_relevance's range is stated in its
+# description and enforced when the reply is validated (etl._classification_record).
+SENTIMENTS = ("positive", "negative", "neutral")
+NARRATIVE_SENTIMENTS = ("positive", "negative", "neutral", "mixed")
+IR_RELEVANCE_RANGE = (0.0, 1.0)
+
+CLASSIFY_TOOL = {
+    "name": "record_classifications",
+    "description": "Record the classification of every headline in the batch.",
+    "strict": True,
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "headline_index": {"type": "integer", "description": "The [n] before the headline"},
+                        "summary": {"type": "string", "description": "1-2 sentence summary focused on sector-level implication"},
+                        "signal_type": {"type": "string", "enum": list(SIGNAL_TYPES)},
+                        "sentiment": {"type": "string", "enum": list(SENTIMENTS)},
+                        "ir_relevance": {
+                            "type": "number",
+                            "description": f"From {IR_RELEVANCE_RANGE[0]} to {IR_RELEVANCE_RANGE[1]}, per the scoring guide",
+                        },
+                    },
+                    "required": ["headline_index", "summary", "signal_type", "sentiment", "ir_relevance"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["results"],
+        "additionalProperties": False,
+    },
+}
+
+NARRATIVE_TOOL = {
+    "name": "record_narrative",
+    "description": "Record the sector briefing.",
+    "strict": True,
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "summary_short": {"type": "string", "description": "1 sentence naming the specific driver"},
+            "summary_full": {"type": "string", "description": "2-3 paragraphs referencing specific signals and data points"},
+            "key_themes": {"type": "array", "items": {"type": "string"}, "description": "2-4 short, specific theme labels"},
+            "ir_talking_points": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "2-3 complete statements for investor conversations",
+            },
+            "sentiment": {"type": "string", "enum": list(NARRATIVE_SENTIMENTS)},
+        },
+        "required": ["summary_short", "summary_full", "key_themes", "ir_talking_points", "sentiment"],
+        "additionalProperties": False,
+    },
+}
@@ -1,53 +1,183 @@
+"""
+Data access for the API and pipeline.
+
+The public functions here are the app's storage interface. They delegate to
+the backend selected by STORAGE_BACKEND (see storage/): the hosted Supabase
+backend, or an embedded SQLite file for running everything on one box.
+Signal and narrative writes are also published to live subscribers (events.py).
+
+Reference data (sectors, active feeds, financials) is served from a
+process-local cache. Each table is loaded whole, indexed in memory and
+reloaded after its TTL, or on the next read after a write through this module
+or the end of a pipeline run invalidates it. Writes from other processes show
+up within the TTL.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterator
 from datetime import datetime, timedelta, timezone
-from supabase import create_client, Client
-from config import SUPABASE_URL, SUPABASE_KEY
 
-# --- Singleton Supabase Client ---
-_supabase: Client | None = None
+import events
+from config import FINANCIALS_CACHE_TTL_SECONDS, REFERENCE_CACHE_TTL_SECONDS, STORAGE_BACKEND
+from storage import StorageBackend, create_backend
 
+# --- Singleton Backend ---
+_backend: StorageBackend | None = None
+_backend_lock = threading.Lock()
 
-def get_client() -> Client:
-    global _supabase
-    if _supabase is None:
-        _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    return _supabase
+
+def get_backend() -> StorageBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(STORAGE_BACKEND)
+    return _backend
+
+
+def set_backend(backend: StorageBackend) -> None:
+    """Swap the active backend (benchmarks, one-off scripts)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+    invalidate_reference_cache()
+
+
+def get_storage_stats() -> dict:
+    backend = get_backend()
+    return {
+        "backend": backend.name,
+        **backend.stats(),
+        "reference_cache": {name: table.stats() for name, table in _REFERENCE_TABLES.items()},
+    }
+
+
+def _since(days: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+# --- Reference-data cache ---
+
+class _CachedTable:
+    """
+    A small table held in memory, indexed by one column.
+
+    Readers share an immutable snapshot. Once the TTL has passed, one thread
+    reloads it while the others keep serving the previous snapshot. An
+    invalidated snapshot is never served again: the next reader reloads it
+    before returning. Rows are copied on the way out, so callers can't modify
+    the cache.
+    """
+
+    def __init__(self, load: Callable[[], list[dict]], key: str, ttl: float):
+        self._load = load
+        self._key = key
+        self._ttl = ttl
+        self._snapshot: tuple[list[dict], dict[str, list[dict]], float, int] | None = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._loads = 0
+
+    def _fresh(self, snapshot) -> bool:
+        return snapshot is not None and snapshot[3] == self._generation and time.monotonic() < snapshot[2]
+
+    def _get(self) -> tuple[list[dict], dict[str, list[dict]], float, int]:
+        snapshot = self._snapshot
+        if self._fresh(snapshot):
+            self._hits += 1
+            return snapshot
+        if snapshot is not None and snapshot[3] == self._generation:
+            # Expired, not invalidated: serve it while whoever holds the lock reloads
+            if not self._lock.acquire(blocking=False):
+                self._hits += 1
+                return snapshot
+        else:
+            self._lock.acquire()
+        try:
+            if self._fresh(self._snapshot):
+                self._hits += 1
+                return self._snapshot
+            generation = self._generation
+            rows = self._load()
+            index: dict[str, list[dict]] = {}
+            for row in rows:
+                index.setdefault(row.get(self._key), []).append(row)
+            self._snapshot = (rows, index, time.monotonic() + self._ttl, generation)
+            self._loads += 1
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def all(self) -> list[dict]:
+        if self._ttl <= 0:
+            return self._load()
+        return [dict(row) for row in self._get()[0]]
+
+    def lookup(self, key: str) -> list[dict]:
+        if self._ttl <= 0:
+            return [row for row in self._load() if row.get(self._key) == key]
+        return [dict(row) for row in self._get()[1].get(key, [])]
+
+    def invalidate(self) -> None:
+        # A load already in flight may predate the write: its snapshot is stale on arrival
+        self._generation += 1
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "rows": len(snapshot[0]) if snapshot else None,
+            "hits": self._hits,
+            "loads": self._loads,
+            "ttl_seconds": self._ttl,
+        }
+
+
+_REFERENCE_TABLES = {
+    "sectors": _CachedTable(lambda: get_backend().get_sectors(), "id", REFERENCE_CACHE_TTL_SECONDS),
+    "feeds": _CachedTable(lambda: get_backend().get_all_active_feeds(), "sector_id", REFERENCE_CACHE_TTL_SECONDS),
+    "financials": _CachedTable(lambda: get_backend().get_all_financials(), "sector_id", FINANCIALS_CACHE_TTL_SECONDS),
+}
+
+
+def invalidate_reference_cache(*tables: str) -> None:
+    """Reload the named cached tables (default: all) on their next read."""
+    for name in tables or _REFERENCE_TABLES:
+        _REFERENCE_TABLES[name].invalidate()
 
 
 # --- Sectors ---
 
 def get_sectors() -> list[dict]:
-    res = get_client().table("sectors").select("*").execute()
-    return res.data
+    return _REFERENCE_TABLES["sectors"].all()
 
 
 def get_sector(sector_id: str) -> dict | None:
-    res = get_client().table("sectors").select("*").eq("id", sector_id).execute()
-    return res.data[0] if res.data else None
+    rows = _REFERENCE_TABLES["sectors"].lookup(sector_id)
+    return rows[0] if rows else None
 
 
 # --- Sector Feeds ---
 
 def get_sector_feeds(sector_id: str) -> list[dict]:
-    res = (
-        get_client()
-        .table("sector_feeds")
-        .select("*")
-        .eq("sector_id", sector_id)
-        .eq("active", True)
-        .execute()
-    )
-    return res.data
+    """Active feeds of one sector."""
+    return _REFERENCE_TABLES["feeds"].lookup(sector_id)
 
 
 def get_all_active_feeds() -> list[dict]:
-    res = (
-        get_client()
-        .table("sector_feeds")
-        .select("*, sectors(name, etf_ticker)")
-        .eq("active", True)
-        .execute()
-    )
-    return res.data
+    return _REFERENCE_TABLES["feeds"].all()
+
+
+# --- Feed Schedule ---
+
+def get_feed_schedules() -> dict[str, dict]:
+    """Scheduler state for every feed that has been scheduled, keyed by feed_id."""
+    return {row["feed_id"]: row for row in get_backend().get_feed_schedules()}
+
+
+def upsert_feed_schedule(schedule: dict) -> None:
+    get_backend().upsert_feed_schedule(schedule)
 
 
 # --- Sector Articles ---
@@ -56,41 +186,23 @@ def get_existing_urls(urls: list[str]) -> set[str]:
     """Batch check which URLs already exist. Returns set of existing URLs."""
     if not urls:
         return set()
-    res = (
-        get_client()
-        .table("sector_articles")
-        .select("url")
-        .in_("url", urls)
-        .execute()
-    )
-    return {row["url"] for row in res.data}
+    return get_backend().get_existing_urls(urls)
 
 
 def insert_articles(articles: list[dict]) -> list[dict]:
     """Insert articles, skipping duplicates via ON CONFLICT."""
     if not articles:
         return []
-    res = (
-        get_client()
-        .table("sector_articles")
-        .upsert(articles, on_conflict="url", ignore_duplicates=True)
-        .execute()
-    )
-    return res.data
+    return get_backend().insert_articles(articles)
 
 
 def get_sector_articles(sector_id: str, days: int = 7) -> list[dict]:
-    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-    res = (
-        get_client()
-        .table("sector_articles")
-        .select("*")
-        .eq("sector_id", sector_id)
-        .gte("fetched_at", since)
-        .order("published_at", desc=True)
-        .execute()
-    )
-    return res.data
+    return get_backend().get_sector_articles(sector_id, _since(days))
+
+
+def get_unclassified_articles(sector_id: str) -> list[dict]:
+    """Articles for a sector with no signal yet, e.g. left behind by an interrupted run."""
+    return get_backend().get_unclassified_articles(sector_id)
 
 
 # --- Sector Signals ---
@@ -98,8 +210,9 @@ def get_sector_articles(sector_id: str, days: int = 7) -> list[dict]:
 def insert_signals(signals: list[dict]) -> list[dict]:
     if not signals:
         return []
-    res = get_client().table("sector_signals").insert(signals).execute()
-    return res.data
+    rows = get_backend().insert_signals(signals)
+    events.publish_signals(rows)
+    return rows
 
 
 def get_sector_signals(
@@ -109,21 +222,7 @@ def get_sector_signals(
     sentiment: str | None = None,
     min_relevance: float = 0.0,
 ) -> list[dict]:
-    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-    query = (
-        get_client()
-        .table("sector_signals")
-        .select("*, sector_articles(title, url, source, published_at)")
-        .eq("sector_id", sector_id)
-        .gte("created_at", since)
-        .gte("ir_relevance", min_relevance)
-        .order("created_at", desc=True)
-    )
-    if signal_type:
-        query = query.eq("signal_type", signal_type)
-    if sentiment:
-        query = query.eq("sentiment", sentiment)
-    return query.execute().data
+    return get_backend().get_sector_signals(sector_id, _since(days), signal_type, sentiment, min_relevance)
 
 
 def get_all_signals(
@@ -134,102 +233,178 @@ def get_all_signals(
     min_relevance: float = 0.5,
     limit: int = 50,
 ) -> list[dict]:
-    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-    query = (
-        get_client()
-        .table("sector_signals")
-        .select("*, sector_articles(title, url, source, published_at)")
-        .gte("created_at", since)
-        .gte("ir_relevance", min_relevance)
-        .order("created_at", desc=True)
-        .limit(limit)
+    return get_backend().get_all_signals(_since(days), sector_id, signal_type, sentiment, min_relevance, limit)
+
+
+def iter_signals(
+    days: int = 30,
+    sector_id: str | None = None,
+    signal_type: str | None = None,
+    sentiment: str | None = None,
+    min_relevance: float = 0.0,
+    chunk_size: int = 1000,
+) -> Iterator[list[dict]]:
+    """Yield signals (newest first, with article fields) in chunks of up to chunk_size rows.
+
+    Keyset-paginated on (created_at, id), so each page is an indexed range scan and
+    memory stays at one chunk regardless of how many rows match.
+    """
+    return get_backend().iter_signals(
+        _since(days), sector_id, signal_type, sentiment, min_relevance, chunk_size
     )
-    if sector_id:
-        query = query.eq("sector_id", sector_id)
-    if signal_type:
-        query = query.eq("signal_type", signal_type)
-    if sentiment:
-        query = query.eq("sentiment", sentiment)
-    return query.execute().data
+
+
+def search_signals(
+    query: str,
+    days: int = 30,
+    sector_id: str | None = None,
+    signal_type: str | None = None,
+    sentiment: str | None = None,
+    min_relevance: float = 0.0,
+    limit: int = 50,
+) -> list[dict]:
+    """Ranked full-text search over summaries + headlines (search_signals RPC in schema.sql)."""
+    return get_backend().search_signals(
+        query, _since(days), sector_id, signal_type, sentiment, min_relevance, limit
+    )
+
+
+def get_signals_since(since: str) -> list[dict]:
+    """All signals (with article fields) created at or after `since`, oldest first.
+
+    Used to build/refresh the local search index.
+    """
+    return get_backend().get_signals_since(since)
+
+
+# --- Signal Rollups ---
+
+def get_signal_rollup(days: int, sector_id: str | None = None) -> list[dict]:
+    """Daily rollup rows (sector x day x signal_type x sentiment) for the last `days` days."""
+    since_day = (datetime.now(timezone.utc) - timedelta(days=days - 1)).date().isoformat()
+    return get_backend().get_signal_rollup(since_day, sector_id)
 
 
 # --- Sector Financials ---
 
 def upsert_sector_financials(sector_id: str, financials: dict) -> dict:
-    data = {"sector_id": sector_id, "updated_at": datetime.now(timezone.utc).isoformat(), **financials}
-    res = (
-        get_client()
-        .table("sector_financials")
-        .upsert(data, on_conflict="sector_id")
-        .execute()
-    )
-    return res.data[0] if res.data else {}
+    try:
+        return get_backend().upsert_sector_financials(sector_id, financials)
+    finally:
+        invalidate_reference_cache("financials")
 
 
 def get_all_financials() -> list[dict]:
-    res = get_client().table("sector_financials").select("*").execute()
-    return res.data
+    return _REFERENCE_TABLES["financials"].all()
 
 
 def get_sector_financials(sector_id: str) -> dict | None:
-    res = (
-        get_client()
-        .table("sector_financials")
-        .select("*")
-        .eq("sector_id", sector_id)
-        .execute()
-    )
-    return res.data[0] if res.data else None
+    rows = _REFERENCE_TABLES["financials"].lookup(sector_id)
+    return rows[0] if rows else None
 
 
 # --- Sector Narratives ---
 
 def insert_narrative(narrative: dict) -> dict:
-    res = get_client().table("sector_narratives").insert(narrative).execute()
-    return res.data[0] if res.data else {}
+    row = get_backend().insert_narrative(narrative)
+    events.publish_narrative(row)
+    return row
 
 
 def get_latest_narrative(sector_id: str) -> dict | None:
-    res = (
-        get_client()
-        .table("sector_narratives")
-        .select("*")
-        .eq("sector_id", sector_id)
-        .order("created_at", desc=True)
-        .limit(1)
-        .execute()
-    )
-    return res.data[0] if res.data else None
+    return get_backend().get_latest_narrative(sector_id)
 
 
 def clear_pipeline_data() -> dict:
     """Delete all signals, articles, and narratives for a fresh pipeline run."""
-    client = get_client()
-    # Use gte with nil UUID to match all rows (PostgREST requires a filter for DELETE)
-    nil_uuid = "00000000-0000-0000-0000-000000000000"
-    sig = client.table("sector_signals").delete().gte("id", nil_uuid).execute()
-    art = client.table("sector_articles").delete().gte("id", nil_uuid).execute()
-    nar = client.table("sector_narratives").delete().gte("id", nil_uuid).execute()
-    return {
-        "signals_deleted": len(sig.data),
-        "articles_deleted": len(art.data),
-        "narratives_deleted": len(nar.data),
-    }
+    return get_backend().clear_pipeline_data()
 
 
 def get_all_latest_narratives() -> dict[str, dict]:
     """Get the latest narrative for each sector. Returns dict keyed by sector_id."""
-    res = (
-        get_client()
-        .table("sector_narratives")
-        .select("*")
-        .order("created_at", desc=True)
-        .execute()
-    )
-    # Python-side: keep only the latest per sector
-    latest: dict[str, dict] = {}
-    for row in res.data:
-        sid = row["sector_id"]
-        if sid not in latest:
-            latest[sid] = row
-    return latest
+    return get_backend().get_all_latest_narratives()
+
+
+# --- Pipeline Runs ---
+
+def create_pipeline_run() -> dict:
+    return get_backend().create_pipeline_run()
+
+
+def update_pipeline_run(
+    run_id: str, status: str, result: dict | None = None, error: str | None = None
+) -> dict:
+    """Set a run's status (running | completed | failed); finished_at is stamped unless running.
+
+    A finished run invalidates the reference-data cache, whichever process did its work.
+    """
+    row = get_backend().update_pipeline_run(run_id, status, result, error)
+    if status != "running":
+        invalidate_reference_cache()
+    return row
+
+
+def get_latest_pipeline_run() -> dict | None:
+    return get_backend().get_latest_pipeline_run()
+
+
+def save_checkpoint(run_id: str, unit: str, stage: str, stats: dict | None = None) -> None:
+    get_backend().save_checkpoint(run_id, unit, stage, stats or {})
+
+
+def get_checkpoints(run_id: str) -> dict[str, dict[str, dict]]:
+    """Checkpoints for a run as {unit: {stage: stats}}."""
+    done: dict[str, dict[str, dict]] = {}
+    for row in get_backend().get_checkpoints(run_id):
+        done.setdefault(row["unit"], {})[row["stage"]] = row.get("stats") or {}
+    return done
+
+
+# --- Work Queue ---
+
+def enqueue_tasks(run_id: str, kind: str, units: list[str], max_attempts: int) -> None:
+    if units:
+        get_backend().enqueue_tasks(run_id, kind, units, max_attempts)
+
+
+def claim_task(worker_id: str, lease_seconds: int, run_id: str | None = None) -> dict | None:
+    return get_backend().claim_task(worker_id, lease_seconds, run_id)
+
+
+def renew_task_lease(task_id: str, worker_id: str, lease_seconds: int) -> bool:
+    return get_backend().renew_task_lease(task_id, worker_id, lease_seconds)
+
+
+def complete_task(task_id: str, worker_id: str, result: dict) -> bool:
+    return get_backend().complete_task(task_id, worker_id, result)
+
+
+def fail_task(task_id: str, worker_id: str, error: str, retry: bool) -> None:
+    get_backend().fail_task(task_id, worker_id, error, retry)
+
+
+def get_tasks(run_id: str, kind: str) -> list[dict]:
+    return get_backend().get_tasks(run_id, kind)
+
+
+# --- Backfill ---
+
+def get_backfill_windows() -> dict[tuple[str, str], dict]:
+    """Backfill progress keyed by (window_start, window_end) ISO dates."""
+    return {(w["window_start"], w["window_end"]): w for w in get_backend().get_backfill_windows()}
+
+
+def save_backfill_window(window_start: str, window_end: str, status: str, stats: dict | None = None) -> None:
+    get_backend().save_backfill_window(window_start, window_end, status, stats)
+
+
+# --- Usage Ledger ---
+
+def insert_usage(rows: list[dict]) -> None:
+    if rows:
+        get_backend().insert_usage(rows)
+
+
+def get_usage(run_id: str | None = None, days: int | None = None) -> list[dict]:
+    """Token ledger rows for a run and/or the last `days` days, oldest first."""
+    return get_backend().get_usage(run_id, _since(days) if days else None)
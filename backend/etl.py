@@ -2,36 +2,50 @@
 ETL Pipeline for Industry Intelligence Tracker.
 
 Pipeline stages:
-1. Fetch RSS feeds per sector (Google News)
+1. Fetch each sector's feeds through their source adapters (sources/)
 2. Deduplicate URLs against existing articles
 3. Batch classify with Claude Haiku (8 articles per call)
 4. Fetch ETF financials via yfinance
 5. Generate sector narratives with Claude Haiku
 """
 
+import hashlib
 import json
 import logging
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timedelta, timezone
+from typing import TypedDict
 
 import anthropic
-import feedparser
-import httpx
 import yfinance as yf
 
 import db
+import ranking
+import search
+import sources
+import usage
+import workqueue
 from config import (
     ALL_TICKERS,
     ANTHROPIC_API_KEY,
-    ARTICLES_PER_FEED,
     BATCH_CLASSIFICATION_PROMPT,
     BATCH_SIZE,
     BENCHMARK_TICKER,
-    GOOGLE_NEWS_RSS_URL,
+    CLASSIFY_MAX_CONCURRENCY,
+    CLASSIFY_TOOL,
     HAIKU_MODEL,
+    IR_RELEVANCE_RANGE,
     MAX_WORKERS,
+    NARRATIVE_FIN_DRIFT_PCT,
     NARRATIVE_PROMPT,
+    NARRATIVE_SENTIMENTS,
+    NARRATIVE_TOOL,
+    PIPELINE_MODE,
+    QUEUE_LOCAL_WORKERS,
+    SENTIMENTS,
+    SIGNAL_TYPES,
 )
 
 logger = logging.getLogger(__name__)
@@ -48,66 +62,26 @@ def _get_anthropic() -> anthropic.Anthropic:
 
 
 # ---------------------------------------------------------------------------
-# 1. RSS Fetching
+# 1. Fetching
 # ---------------------------------------------------------------------------
 
 def fetch_feed_articles(feed: dict, sector_id: str) -> list[dict]:
-    """Fetch articles from a Google News RSS feed. Returns article dicts ready for DB."""
-    query = feed["query"]
-    url = GOOGLE_NEWS_RSS_URL.format(query=query)
-
+    """Fetch a feed's recent articles through its source adapter. Returns article dicts ready for DB."""
     try:
-        resp = httpx.get(url, timeout=15, follow_redirects=True)
-        resp.raise_for_status()
-    except httpx.HTTPError as e:
+        return _fetch_feed(feed, sector_id)
+    except sources.FETCH_ERRORS as e:
         logger.warning(f"Failed to fetch feed {feed['id']}: {e}")
         return []
 
-    parsed = feedparser.parse(resp.text)
-    articles = []
-    cutoff = datetime.now(timezone.utc) - timedelta(days=7)
-
-    for entry in parsed.entries[:ARTICLES_PER_FEED]:
-        # Google News RSS: title often ends with " - Source Name"
-        title = entry.get("title", "").strip()
-        link = entry.get("link", "").strip()
-        if not title or not link:
-            continue
-
-        # Extract source from title suffix
-        source = None
-        if " - " in title:
-            source = title.rsplit(" - ", 1)[-1].strip()
-
-        # Parse published date
-        published_at = None
-        if hasattr(entry, "published_parsed") and entry.published_parsed:
-            try:
-                published_at = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc).isoformat()
-            except (ValueError, TypeError):
-                pass
 
-        # Date filter: discard articles older than 7 days (safety net for when:7d)
-        if published_at:
-            try:
-                pub_dt = datetime.fromisoformat(published_at)
-                if pub_dt < cutoff:
-                    continue
-            except (ValueError, TypeError):
-                pass
-        else:
-            logger.debug(f"Article has no published_at, keeping: {title[:80]}")
+def _fetch_feed(feed: dict, sector_id: str) -> list[dict]:
+    """fetch_feed_articles without the error handling: raises one of sources.FETCH_ERRORS."""
+    return sources.fetch(feed, sector_id, since=_fetch_cutoff())
 
-        articles.append({
-            "sector_id": sector_id,
-            "feed_id": feed["id"],
-            "title": title,
-            "url": link,
-            "source": source,
-            "published_at": published_at,
-        })
 
-    return articles
+def _fetch_cutoff() -> datetime:
+    # Date filter: discard articles older than 7 days (safety net for Google News when:7d)
+    return datetime.now(timezone.utc) - timedelta(days=7)
 
 
 # ---------------------------------------------------------------------------
@@ -180,8 +154,81 @@ def _is_single_company_news(title: str) -> bool:
 # 3. Batch Classification
 # ---------------------------------------------------------------------------
 
-def _classify_batch(batch: list[dict], sector_name: str, today_date: str | None = None) -> list[dict]:
-    """Classify a batch of articles (up to BATCH_SIZE) with Claude Haiku."""
+class Classification(TypedDict):
+    """One headline's classification, validated from a record_classifications tool call."""
+
+    headline_index: int
+    summary: str
+    signal_type: str
+    sentiment: str
+    ir_relevance: float
+
+
+def _tool_input(response, tool: dict) -> dict:
+    """The input of the reply's call to `tool`. Raises ValueError if the model didn't make one."""
+    for block in response.content:
+        if block.type == "tool_use" and block.name == tool["name"]:
+            return block.input
+    raise ValueError(f"no {tool['name']} call in the reply (stop_reason={response.stop_reason})")
+
+
+def _classification_record(item: dict, batch_size: int) -> Classification | None:
+    """A validated record, or None if the item doesn't fit the contract."""
+    idx, relevance = item.get("headline_index"), item.get("ir_relevance")
+    if not isinstance(idx, int) or not 0 <= idx < batch_size:
+        return None
+    if item.get("signal_type") not in SIGNAL_TYPES or item.get("sentiment") not in SENTIMENTS:
+        return None
+    if not isinstance(relevance, (int, float)):
+        return None
+    low, high = IR_RELEVANCE_RANGE
+    return Classification(
+        headline_index=idx,
+        summary=str(item.get("summary") or ""),
+        signal_type=item["signal_type"],
+        sentiment=item["sentiment"],
+        ir_relevance=min(max(float(relevance), low), high),
+    )
+
+
+def parse_classifications(data: dict, batch_size: int) -> list[Classification]:
+    """Validated records from a record_classifications input, at most one per headline."""
+    records: dict[int, Classification] = {}
+    for item in data.get("results") or []:
+        record = _classification_record(item, batch_size) if isinstance(item, dict) else None
+        if record is None:
+            logger.debug(f"Dropping invalid classification: {item!r}")
+        elif record["headline_index"] not in records:
+            records[record["headline_index"]] = record
+    return list(records.values())
+
+
+def _feed_counts(
+    batch: list[dict], results: list[Classification], count_articles: bool = True
+) -> dict[str | None, tuple[int, int]]:
+    """(articles, non-neutral signals) per feed in a classified batch, for the usage ledger."""
+    counts: dict[str | None, list[int]] = {}
+    for article in batch:
+        counts.setdefault(article.get("feed_id"), [0, 0])[0] += 1 if count_articles else 0
+    for result in results:
+        if result["signal_type"] != "neutral":
+            counts[batch[result["headline_index"]].get("feed_id")][1] += 1
+    return {feed_id: (articles, signals) for feed_id, (articles, signals) in counts.items()}
+
+
+def _classify_batch(
+    batch: list[dict],
+    sector_name: str,
+    today_date: str | None = None,
+    run_id: str | None = None,
+    stage: str = usage.STAGE_CLASSIFY,
+) -> list[Classification]:
+    """Classify a batch of articles (up to BATCH_SIZE) with Claude Haiku.
+
+    The model answers through a forced, strict record_classifications call, so
+    replies are schema-valid JSON; anything that still doesn't validate is
+    dropped per item rather than per batch.
+    """
     headlines_block = "\n".join(
         f"[{i}] {a['title']}" for i, a in enumerate(batch)
     )
@@ -191,89 +238,181 @@ def _classify_batch(batch: list[dict], sector_name: str, today_date: str | None
         today_date=today_date or date.today().isoformat(),
     )
 
+    response, results = None, []
     try:
         response = _get_anthropic().messages.create(
             model=HAIKU_MODEL,
             max_tokens=2048,
+            tools=[CLASSIFY_TOOL],
+            tool_choice={"type": "tool", "name": CLASSIFY_TOOL["name"]},
             messages=[{"role": "user", "content": prompt}],
         )
-        text = response.content[0].text.strip()
-
-        # Strip markdown code fences if present
-        if text.startswith("```"):
-            text = re.sub(r"^```(?:json)?\s*", "", text)
-            text = re.sub(r"\s*```$", "", text)
-
-        data = json.loads(text)
-        return data.get("results", [])
-    except (json.JSONDecodeError, anthropic.APIError, KeyError, IndexError) as e:
+        results = parse_classifications(_tool_input(response, CLASSIFY_TOOL), len(batch))
+    except (ValueError, anthropic.APIError) as e:
         logger.warning(f"Batch classification failed for {sector_name}: {e}")
-        return []
+
+    # Recorded even if the call failed: the batch's articles go on the ledger here, never in the fallback
+    usage.record(
+        response, stage, run_id=run_id, sector_id=batch[0].get("sector_id"),
+        feeds=_feed_counts(batch, results, count_articles=stage == usage.STAGE_CLASSIFY),
+    )
+    return results
 
 
-def _classify_single(article: dict, sector_name: str, today_date: str | None = None) -> dict | None:
+def _classify_single(
+    article: dict, sector_name: str, today_date: str | None = None, run_id: str | None = None
+) -> Classification | None:
     """Fallback: classify a single article if batch fails."""
-    results = _classify_batch([article], sector_name, today_date=today_date)
+    results = _classify_batch(
+        [article], sector_name, today_date=today_date, run_id=run_id, stage=usage.STAGE_CLASSIFY_FALLBACK
+    )
     return results[0] if results else None
 
 
-def batch_classify(articles: list[dict], sector_name: str) -> list[dict]:
-    """Classify articles in batches of BATCH_SIZE. Returns signal dicts ready for DB."""
+def _signal_row(article: dict, result: Classification) -> dict:
+    signal_type, ir_relevance = result["signal_type"], result["ir_relevance"]
+    # Code-level override: force single-company news to neutral
+    if _is_single_company_news(article["title"]):
+        signal_type = "neutral"
+        ir_relevance = 0.0
+    return {
+        "article_id": article["id"],
+        "sector_id": article["sector_id"],
+        "summary": result["summary"],
+        "signal_type": signal_type,
+        "sentiment": result["sentiment"],
+        "ir_relevance": ir_relevance,
+    }
+
+
+def _classify_articles(batch: list[dict], sector_name: str, today_date: str, run_id: str | None) -> list[dict]:
+    """Classify one batch, falling back to one call per article if the batch call yields nothing."""
+    results = _classify_batch(batch, sector_name, today_date=today_date, run_id=run_id)
+    if results:
+        return [_signal_row(batch[r["headline_index"]], r) for r in results]
+
     signals = []
-    today_date = date.today().isoformat()
+    for article in batch:
+        result = _classify_single(article, sector_name, today_date=today_date, run_id=run_id)
+        if result:
+            signals.append(_signal_row(article, result))
+    return signals
 
-    for i in range(0, len(articles), BATCH_SIZE):
-        batch = articles[i : i + BATCH_SIZE]
-        results = _classify_batch(batch, sector_name, today_date=today_date)
-
-        if results:
-            # Map results back to articles by headline_index
-            for result in results:
-                idx = result.get("headline_index")
-                if idx is None or idx < 0 or idx >= len(batch):
-                    continue
-
-                article = batch[idx]
-
-                signal_type = result.get("signal_type", "neutral")
-                sentiment = result.get("sentiment", "neutral")
-                ir_relevance = float(result.get("ir_relevance", 0.0))
-
-                # Code-level override: force single-company news to neutral
-                if _is_single_company_news(article["title"]):
-                    signal_type = "neutral"
-                    ir_relevance = 0.0
-
-                signals.append({
-                    "article_id": article["id"],
-                    "sector_id": article["sector_id"],
-                    "summary": result.get("summary", ""),
-                    "signal_type": signal_type,
-                    "sentiment": sentiment,
-                    "ir_relevance": ir_relevance,
-                })
-        else:
-            # Fallback: classify individually
-            for article in batch:
-                result = _classify_single(article, sector_name, today_date=today_date)
-                if result:
-                    signal_type = result.get("signal_type", "neutral")
-                    sentiment = result.get("sentiment", "neutral")
-                    ir_relevance = float(result.get("ir_relevance", 0.0))
-
-                    if _is_single_company_news(article["title"]):
-                        signal_type = "neutral"
-                        ir_relevance = 0.0
-
-                    signals.append({
-                        "article_id": article["id"],
-                        "sector_id": article["sector_id"],
-                        "summary": result.get("summary", ""),
-                        "signal_type": signal_type,
-                        "sentiment": sentiment,
-                        "ir_relevance": ir_relevance,
-                    })
 
+class _Job:
+    """One ClassifyPool.submit: its batches' results in order, resolved by whichever batch finishes last."""
+
+    def __init__(self, batches: list[list[dict]], sector_name: str, run_id: str | None, deferred: list[dict]):
+        self.batches = batches
+        self.sector_name = sector_name
+        self.run_id = run_id
+        self.today_date = date.today().isoformat()
+        self.budget = usage.get_budget(run_id)
+        self.deferred = deferred
+        self.results: list = [None] * len(batches)
+        self.pending = len(batches)
+        self.future: Future = Future()
+        self.lock = threading.Lock()
+
+    def run(self, i: int) -> None:
+        batch = self.batches[i]
+        try:
+            estimate = len(batch) * self.budget.tokens_per_article if self.budget else 0
+            if self.budget and not self.budget.try_reserve(estimate):
+                result = ([], batch)
+            else:
+                try:
+                    result = (_classify_articles(batch, self.sector_name, self.today_date, self.run_id), [])
+                finally:
+                    if self.budget:
+                        self.budget.release(estimate)
+        except BaseException as e:
+            result = e
+        with self.lock:
+            self.results[i] = result
+            self.pending -= 1
+            last = self.pending == 0
+        if last:
+            self._resolve()
+
+    def _resolve(self) -> None:
+        errors = [r for r in self.results if isinstance(r, BaseException)]
+        if errors:
+            self.future.set_exception(errors[0])
+            return
+        signals = [signal for batch_signals, _ in self.results for signal in batch_signals]
+        deferred = self.deferred + [article for _, batch_deferred in self.results for article in batch_deferred]
+        self.future.set_result((signals, deferred))
+
+
+class ClassifyPool:
+    """
+    Classifies articles on one thread pool shared by every sector.
+
+    Each BATCH_SIZE batch is its own task, so a sector with many new articles
+    spreads over all CLASSIFY_MAX_CONCURRENCY workers instead of running its
+    batches back to back while other workers idle. Classification wall time
+    tracks the run's total batches / concurrency rather than its largest
+    sector. A submit's results come back reassembled in batch order.
+    """
+
+    def __init__(self, workers: int = CLASSIFY_MAX_CONCURRENCY) -> None:
+        self._workers = workers
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._stats = {"submitted": 0, "batches": 0, "queued": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="classify")
+        return self._executor
+
+    def submit(self, articles: list[dict], sector_name: str, run_id: str | None = None) -> Future:
+        """Queue a sector's articles; the future resolves to (signals, deferred articles).
+
+        Under the run's token budget, articles are queued highest-yield feed
+        first, and a batch whose estimated cost no longer fits is deferred
+        instead of classified.
+        """
+        deferred: list[dict] = []
+        budget = usage.get_budget(run_id)
+        if budget is not None:
+            articles, deferred = budget.prioritize(articles)
+        batches = [articles[i : i + BATCH_SIZE] for i in range(0, len(articles), BATCH_SIZE)]
+        job = _Job(batches, sector_name, run_id, deferred)
+        if not batches:
+            job.future.set_result(([], deferred))
+            return job.future
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._stats["queued"] += len(batches)
+            for i in range(len(batches)):
+                self._pool().submit(self._run, job, i)
+        return job.future
+
+    def _run(self, job: _Job, i: int) -> None:
+        with self._lock:
+            self._stats["queued"] -= 1
+            self._stats["in_flight"] += 1
+            self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._stats["in_flight"])
+        try:
+            job.run(i)
+        finally:
+            with self._lock:
+                self._stats["in_flight"] -= 1
+                self._stats["batches"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "workers": self._workers}
+
+
+_classify_pool = ClassifyPool()
+
+
+def batch_classify(articles: list[dict], sector_name: str, run_id: str | None = None) -> list[dict]:
+    """Classify articles in batches of BATCH_SIZE on the shared pool. Returns signal dicts ready for DB."""
+    signals, _ = _classify_pool.submit(articles, sector_name, run_id).result()
     return signals
 
 
@@ -366,11 +505,56 @@ def _calc_ticker_changes(data, ticker: str) -> dict | None:
 # 5. Narratives
 # ---------------------------------------------------------------------------
 
-def generate_narrative(sector: dict, signals: list[dict], financials: dict | None, today_date: str | None = None) -> dict | None:
-    """Generate a narrative for one sector from its top signals."""
-    if not signals:
-        return None
+# ETF figures quoted in the narrative prompt
+_NARRATIVE_FIN_FIELDS = ("price_change_7d", "price_change_30d", "vs_spy_30d")
+# Editing the prompt or switching models invalidates every stored fingerprint
+_NARRATIVE_VERSION = hashlib.sha256(
+    f"{HAIKU_MODEL}\n{NARRATIVE_PROMPT}\n{json.dumps(NARRATIVE_TOOL, sort_keys=True)}".encode()
+).hexdigest()[:12]
 
+
+def narrative_fingerprint(signals: list[dict]) -> str:
+    """Hash of the signals a narrative is written from, plus the prompt/model version.
+
+    Signals are keyed by article URL rather than signal id: a fresh pipeline run
+    re-classifies the same articles into new signal rows.
+    """
+    keys = sorted(
+        f"{(s.get('sector_articles') or {}).get('url') or s.get('summary')}"
+        f"|{s.get('signal_type')}|{s.get('sentiment')}"
+        for s in signals
+    )
+    return hashlib.sha256("\n".join([_NARRATIVE_VERSION, *keys]).encode()).hexdigest()
+
+
+def _narrative_financials(financials: dict | None) -> dict:
+    fin = financials or {}
+    return {f: round(fin[f], 2) if fin.get(f) is not None else None for f in _NARRATIVE_FIN_FIELDS}
+
+
+def _financials_drifted(previous: dict | None, current: dict) -> bool:
+    """True if any prompt figure appeared, vanished or moved more than NARRATIVE_FIN_DRIFT_PCT points."""
+    previous = previous or {}
+    for field in _NARRATIVE_FIN_FIELDS:
+        old, new = previous.get(field), current.get(field)
+        if old is None or new is None:
+            if old != new:
+                return True
+        elif abs(new - old) > NARRATIVE_FIN_DRIFT_PCT:
+            return True
+    return False
+
+
+def sector_top_signals(sector_id: str) -> list[dict]:
+    """The (up to 10) best-ranked non-neutral signals of the past week that a narrative is written from.
+
+    Ranked like /api/signals?sort=ranked, so a week-old headline only makes
+    the cut over this morning's news if it's much more relevant.
+    """
+    return ranking.top_signals(10, days=7, sector_id=sector_id, min_relevance=0.2)
+
+
+def narrative_prompt(sector: dict, signals: list[dict], financials: dict | None, today_date: str | None = None) -> str:
     # Build signals block for prompt
     signals_block = "\n".join(
         f"- [{s.get('signal_type', 'neutral')}] [{s.get('sentiment', 'neutral')}] "
@@ -379,7 +563,7 @@ def generate_narrative(sector: dict, signals: list[dict], financials: dict | Non
     )
 
     fin = financials or {}
-    prompt = NARRATIVE_PROMPT.format(
+    return NARRATIVE_PROMPT.format(
         sector_name=sector["name"],
         signals_block=signals_block,
         etf_ticker=sector["etf_ticker"],
@@ -389,61 +573,136 @@ def generate_narrative(sector: dict, signals: list[dict], financials: dict | Non
         today_date=today_date or date.today().isoformat(),
     )
 
+
+class Narrative(TypedDict):
+    """A sector briefing, validated from a record_narrative tool call."""
+
+    summary_short: str
+    summary_full: str
+    key_themes: list[str]
+    ir_talking_points: list[str]
+    sentiment: str
+
+
+def _narrative_record(data: dict) -> Narrative:
+    """Raises ValueError if the briefing is missing its summaries or has an unknown sentiment."""
+    if not data.get("summary_short") or not data.get("summary_full"):
+        raise ValueError("narrative without a summary")
+    if data.get("sentiment") not in NARRATIVE_SENTIMENTS:
+        raise ValueError(f"unknown narrative sentiment {data.get('sentiment')!r}")
+    return Narrative(
+        summary_short=str(data["summary_short"]),
+        summary_full=str(data["summary_full"]),
+        key_themes=[str(t) for t in data.get("key_themes") or []],
+        ir_talking_points=[str(p) for p in data.get("ir_talking_points") or []],
+        sentiment=data["sentiment"],
+    )
+
+
+def parse_narrative(response, sector: dict, signals: list[dict], financials: dict | None) -> dict:
+    """Narrative row from the model's record_narrative call. Raises ValueError if it's missing or invalid."""
+    return {
+        "sector_id": sector["id"],
+        **_narrative_record(_tool_input(response, NARRATIVE_TOOL)),
+        "signal_count": len(signals),
+        "input_fingerprint": narrative_fingerprint(signals),
+        "input_financials": _narrative_financials(financials),
+    }
+
+
+def narrative_request(prompt: str) -> dict:
+    """messages.create / messages.stream arguments for a narrative prompt."""
+    return {
+        "model": HAIKU_MODEL,
+        "max_tokens": 1024,
+        "tools": [NARRATIVE_TOOL],
+        "tool_choice": {"type": "tool", "name": NARRATIVE_TOOL["name"]},
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+
+def generate_narrative(
+    sector: dict,
+    signals: list[dict],
+    financials: dict | None,
+    today_date: str | None = None,
+    run_id: str | None = None,
+) -> dict | None:
+    """Generate a narrative for one sector from its top signals."""
+    if not signals:
+        return None
+
+    prompt = narrative_prompt(sector, signals, financials, today_date)
     try:
-        response = _get_anthropic().messages.create(
-            model=HAIKU_MODEL,
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}],
-        )
-        text = response.content[0].text.strip()
-
-        if text.startswith("```"):
-            text = re.sub(r"^```(?:json)?\s*", "", text)
-            text = re.sub(r"\s*```$", "", text)
-
-        data = json.loads(text)
-        narrative = {
-            "sector_id": sector["id"],
-            "summary_short": data.get("summary_short", ""),
-            "summary_full": data.get("summary_full", ""),
-            "key_themes": data.get("key_themes", []),
-            "ir_talking_points": data.get("ir_talking_points", []),
-            "sentiment": data.get("sentiment", "neutral"),
-            "signal_count": len(signals),
-        }
+        response = _get_anthropic().messages.create(**narrative_request(prompt))
+        usage.record(response, usage.STAGE_NARRATIVE, run_id=run_id, sector_id=sector["id"])
+        narrative = parse_narrative(response, sector, signals, financials)
         return db.insert_narrative(narrative)
-    except (json.JSONDecodeError, anthropic.APIError, KeyError) as e:
+    except (ValueError, anthropic.APIError) as e:
         logger.warning(f"Narrative generation failed for {sector['name']}: {e}")
         return None
 
 
-def _generate_narrative_for_sector(sector: dict, all_financials: dict, today_date: str) -> bool:
-    """Helper for parallel narrative generation. Returns True if narrative was generated."""
-    signals = db.get_sector_signals(sector["id"], days=7, min_relevance=0.2)
-    top_signals = sorted(
-        [s for s in signals if s.get("signal_type") != "neutral"],
-        key=lambda s: s.get("ir_relevance", 0),
-        reverse=True,
-    )[:10]
+def _generate_narrative_for_sector(
+    sector: dict, all_financials: dict, today_date: str, previous: dict | None = None, run_id: str | None = None
+) -> bool:
+    """Helper for parallel narrative generation. Returns True if the sector has a narrative.
 
+    The latest stored narrative (or `previous`, the one a fresh run's data clear
+    deleted) is reused instead of calling Claude when it was written from the
+    same top signals and the financials haven't drifted. A narrative the run's
+    token budget can't cover is skipped.
+    """
+    top_signals = sector_top_signals(sector["id"])
     if not top_signals:
         logger.info(f"No relevant signals for {sector['name']}, skipping narrative")
         return False
 
     financials = all_financials.get(sector["id"])
-    result = generate_narrative(sector, top_signals, financials, today_date=today_date)
+    latest = db.get_latest_narrative(sector["id"])
+    candidate = latest or previous
+    if (
+        candidate
+        and candidate.get("input_fingerprint") == narrative_fingerprint(top_signals)
+        and not _financials_drifted(candidate.get("input_financials"), _narrative_financials(financials))
+    ):
+        if latest is None:
+            # A new row for this run: fresh id and created_at, same content
+            db.insert_narrative({k: v for k, v in candidate.items() if k not in ("id", "created_at")})
+        usage.record_cached(usage.STAGE_NARRATIVE, run_id=run_id, sector_id=sector["id"])
+        logger.info(f"Signals unchanged for {sector['name']}, reusing narrative from {candidate.get('created_at')}")
+        return True
+
+    budget = usage.get_budget(run_id)
+    estimate = budget.tokens_per_narrative if budget else 0
+    if budget and not budget.try_reserve(estimate):
+        logger.warning(f"Token budget exhausted, deferring narrative for {sector['name']}")
+        return False
+    try:
+        result = generate_narrative(sector, top_signals, financials, today_date=today_date, run_id=run_id)
+    finally:
+        if budget:
+            budget.release(estimate)
     return result is not None
 
 
-def generate_all_narratives(sectors: list[dict]) -> int:
-    """Generate narratives for all sectors in parallel. Returns count generated."""
+def generate_all_narratives(
+    sectors: list[dict], run_id: str | None = None, previous: dict[str, dict] | None = None
+) -> int:
+    """Generate narratives for all sectors in parallel. Returns count generated (or reused).
+
+    `previous` maps sector_id -> narrative deleted by this run's data clear.
+    """
     all_financials = {f["sector_id"]: f for f in db.get_all_financials()}
     today_date = date.today().isoformat()
+    previous = previous or {}
     generated = 0
 
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         futures = {
-            executor.submit(_generate_narrative_for_sector, sector, all_financials, today_date): sector
+            executor.submit(
+                _generate_narrative_for_sector, sector, all_financials, today_date, previous.get(sector["id"]), run_id
+            ): sector
             for sector in sectors
         }
         for future in as_completed(futures):
@@ -451,6 +710,7 @@ def generate_all_narratives(sectors: list[dict]) -> int:
             try:
                 if future.result():
                     generated += 1
+                    _checkpoint(run_id, sector["id"], STAGE_NARRATED)
             except Exception as e:
                 logger.error(f"Narrative generation failed for {sector['name']}: {e}")
 
@@ -461,8 +721,64 @@ def generate_all_narratives(sectors: list[dict]) -> int:
 # 6. Orchestration
 # ---------------------------------------------------------------------------
 
-def process_sector(sector: dict) -> dict:
-    """Process one sector: fetch feeds -> dedup -> classify -> store. Returns stats."""
+# Checkpoint stages. A unit is a sector id (fetched -> inserted -> classified
+# -> narrated) or FINANCIALS_UNIT (fetched).
+STAGE_FETCHED = "fetched"
+STAGE_INSERTED = "inserted"
+STAGE_CLASSIFIED = "classified"
+STAGE_NARRATED = "narrated"
+FINANCIALS_UNIT = "financials"
+# Not a stage: a sector's latest narrative as it was before the run's data
+# clear, kept with the run so an unchanged sector can carry it over
+STAGE_PREVIOUS_NARRATIVE = "previous_narrative"
+
+
+def _checkpoint(run_id: str | None, unit: str, stage: str, stats: dict | None = None) -> None:
+    """Record a finished stage. Best-effort: a failed write only costs redoing the stage on resume."""
+    if run_id is None:
+        return
+    try:
+        db.save_checkpoint(run_id, unit, stage, stats)
+    except Exception as e:
+        logger.warning(f"Failed to save checkpoint {unit}/{stage}: {e}")
+
+
+def process_sector(sector: dict, run_id: str | None = None, completed: dict | None = None) -> dict:
+    """Process one sector: fetch feeds -> dedup -> classify -> store. Returns stats.
+
+    `completed` is this sector's checkpoints ({stage: stats}) from the run being
+    resumed, or None on a fresh run.
+    """
+    stats, articles = _prepare_sector(sector, run_id, completed)
+    if articles:
+        _classify_and_store(articles, sector["name"], stats, run_id)
+    return _finish_sector(sector, run_id, stats)
+
+
+def _prepare_sector(sector: dict, run_id: str | None, completed: dict | None) -> tuple[dict, list[dict]]:
+    """Everything up to classification. Returns (stats, stored articles still to classify)."""
+    if completed is None:
+        return _process_sector(sector, run_id)
+    if STAGE_CLASSIFIED in completed:
+        return {**completed[STAGE_CLASSIFIED], "skipped": True}, []
+    if STAGE_INSERTED in completed:
+        # Articles are already stored; only classification was cut short
+        return {**completed[STAGE_INSERTED]}, db.get_unclassified_articles(sector["id"])
+
+    # An interrupted attempt may have inserted articles before checkpointing. The URL
+    # dedup hides those from a new fetch, so pick them up before fetching.
+    leftovers = db.get_unclassified_articles(sector["id"])
+    stats, articles = _process_sector(sector, run_id)
+    return stats, leftovers + articles
+
+
+def _finish_sector(sector: dict, run_id: str | None, stats: dict) -> dict:
+    if not stats.get("skipped"):
+        _checkpoint(run_id, sector["id"], STAGE_CLASSIFIED, stats)
+    return stats
+
+
+def _process_sector(sector: dict, run_id: str | None) -> tuple[dict, list[dict]]:
     sector_id = sector["id"]
     sector_name = sector["name"]
 
@@ -472,17 +788,30 @@ def process_sector(sector: dict) -> dict:
     feeds = db.get_sector_feeds(sector_id)
     stats["feeds"] = len(feeds)
 
-    # Fetch all articles from all feeds
+    # Fetch all articles from all feeds, concurrently within each source's limit
     all_articles = []
-    for feed in feeds:
-        articles = fetch_feed_articles(feed, sector_id)
+    for feed, articles, error in sources.fetch_all(feeds, since=_fetch_cutoff()):
+        if error is not None:
+            logger.warning(f"Failed to fetch feed {feed['id']}: {error}")
         all_articles.extend(articles)
 
     stats["fetched"] = len(all_articles)
+    # Fetched articles aren't persisted until insert, so this stage is informational
+    _checkpoint(run_id, sector_id, STAGE_FETCHED, stats)
 
     if not all_articles:
-        return stats
+        return stats, []
+
+    articles_with_ids = _store_new_articles(all_articles, sector_name, stats)
+    if not articles_with_ids:
+        return stats, []
+
+    _checkpoint(run_id, sector_id, STAGE_INSERTED, stats)
+    return stats, articles_with_ids
+
 
+def _store_new_articles(all_articles: list[dict], sector_name: str, stats: dict) -> list[dict]:
+    """Dedup + pre-filter fetched articles and insert the rest. Returns them with DB ids; sets stats["new"]."""
     # Dedup: check which URLs already exist in DB
     all_urls = [a["url"] for a in all_articles]
     existing_urls = db.get_existing_urls(all_urls)
@@ -506,7 +835,7 @@ def process_sector(sector: dict) -> dict:
     stats["new"] = len(new_articles)
 
     if not new_articles:
-        return stats
+        return []
 
     # Insert articles into DB (get back rows with IDs)
     # Fallback: batch -> individual on failure (lesson #8)
@@ -522,7 +851,7 @@ def process_sector(sector: dict) -> dict:
             except Exception:
                 pass
     if not inserted:
-        return stats
+        return []
 
     # Build a URL -> inserted row map for getting article IDs
     inserted_by_url = {a["url"]: a for a in inserted}
@@ -534,63 +863,267 @@ def process_sector(sector: dict) -> dict:
             article["id"] = db_row["id"]
             articles_with_ids.append(article)
 
-    # Classify
-    signals = batch_classify(articles_with_ids, sector_name)
+    return articles_with_ids
+
+
+def _classify_and_store(articles: list[dict], sector_name: str, stats: dict, run_id: str | None = None) -> None:
+    """Classify and insert signals; adds to stats["signals"].
+
+    Under the run's token budget, articles are classified highest-yield feed
+    first and whatever the budget can't cover is left unclassified (counted in
+    stats["deferred"]).
+    """
+    signals, deferred = _classify_pool.submit(articles, sector_name, run_id).result()
+    _store_signals(signals, deferred, sector_name, stats)
+
+
+def _store_signals(signals: list[dict], deferred: list[dict], sector_name: str, stats: dict) -> None:
+    if deferred:
+        logger.info(f"  {sector_name}: token budget deferred {len(deferred)} articles")
     if signals:
         db.insert_signals(signals)
-    stats["signals"] = len(signals)
+    stats["signals"] = stats.get("signals", 0) + len(signals)
+    if deferred:
+        stats["deferred"] = stats.get("deferred", 0) + len(deferred)
 
+
+def process_feed(feed: dict, sector: dict) -> dict:
+    """Refresh a single feed: fetch -> dedup -> classify -> store (used by the scheduler).
+
+    Unlike process_sector, fetch failures raise (sources.FETCH_ERRORS) so the caller can back off.
+    """
+    stats = {"sector": sector["name"], "feed_id": feed["id"], "fetched": 0, "new": 0, "signals": 0}
+    articles = _fetch_feed(feed, sector["id"])
+    stats["fetched"] = len(articles)
+    if not articles:
+        return stats
+
+    articles_with_ids = _store_new_articles(articles, sector["name"], stats)
+    if articles_with_ids:
+        _classify_and_store(articles_with_ids, sector["name"], stats)
     return stats
 
 
-def run_pipeline() -> dict:
-    """Run the full pipeline. Returns summary stats."""
-    logger.info("Pipeline started")
-    start = datetime.now(timezone.utc)
+def run_pipeline(resume: bool = False) -> dict:
+    """Run the full pipeline. Returns summary stats.
+
+    Every run is recorded in pipeline_runs with per-unit stage checkpoints. With
+    resume=True, the latest run that didn't complete (failed, or still marked
+    running after an instance restart) is picked up where it stopped: no data
+    clear, finished sectors and stages are skipped. A run where any sector
+    errored is recorded as failed, so it stays resumable. If there is no such run,
+    nothing runs (and nothing is cleared): the result's status is
+    "nothing_to_resume".
+    """
+    run = None
+    completed: dict[str, dict[str, dict]] | None = None
+    if resume:
+        last = db.get_latest_pipeline_run()
+        if not last or last["status"] == "completed":
+            logger.info("No interrupted pipeline run to resume")
+            return {"status": "nothing_to_resume", "resumed": False, "last_run_id": last["id"] if last else None}
+        run = last
+        completed = db.get_checkpoints(run["id"])
+        db.update_pipeline_run(run["id"], "running")
+        logger.info(f"Resuming pipeline run {run['id']} ({len(completed)} units checkpointed)")
+
+    if run is None:
+        run = db.create_pipeline_run()
+        for sector_id, narrative in db.get_all_latest_narratives().items():
+            _checkpoint(run["id"], sector_id, STAGE_PREVIOUS_NARRATIVE, narrative)
+
+        # Clear old data so dashboard always shows fresh results
+        logger.info("Clearing old pipeline data...")
+        clear_stats = db.clear_pipeline_data()
+        logger.info(f"  Cleared {clear_stats['articles_deleted']} articles, "
+                    f"{clear_stats['signals_deleted']} signals, "
+                    f"{clear_stats['narratives_deleted']} narratives")
+        search.reset_index()
+
+    run_id = run["id"]
+    local_workers = QUEUE_LOCAL_WORKERS if PIPELINE_MODE == "queue" else 0
+    try:
+        with workqueue.local_workers(local_workers, run_id=run_id):
+            result = _run_stages(run_id, completed)
+    except Exception as e:
+        db.update_pipeline_run(run_id, "failed", error=str(e))
+        raise
+    finally:
+        usage.drop_budget(run_id)
+    if result["status"] == "failed":
+        # Leave it resumable: resume=True redoes the failed sectors only
+        failed = ", ".join(s["sector"] for s in result["sector_details"] if s.get("error"))
+        db.update_pipeline_run(run_id, "failed", result=result, error=f"Sectors failed: {failed}")
+    else:
+        db.update_pipeline_run(run_id, "completed", result=result)
+    return result
+
 
-    # Clear old data so dashboard always shows fresh results
-    logger.info("Clearing old pipeline data...")
-    clear_stats = db.clear_pipeline_data()
-    logger.info(f"  Cleared {clear_stats['articles_deleted']} articles, "
-                f"{clear_stats['signals_deleted']} signals, "
-                f"{clear_stats['narratives_deleted']} narratives")
+def _run_stages(run_id: str, completed: dict[str, dict[str, dict]] | None) -> dict:
+    logger.info(f"Pipeline started (run {run_id})")
+    start = datetime.now(timezone.utc)
+    done = completed or {}
 
     sectors = db.get_sectors()
-    sector_stats = []
 
-    # Process sectors in parallel
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(process_sector, s): s for s in sectors}
-        for future in as_completed(futures):
-            sector = futures[future]
-            try:
-                stats = future.result()
-                sector_stats.append(stats)
-                logger.info(f"  {stats['sector']}: {stats['new']} new articles, {stats['signals']} signals")
-            except Exception as e:
-                logger.error(f"  Failed to process {sector['name']}: {e}")
-                sector_stats.append({"sector": sector["name"], "error": str(e)})
+    if PIPELINE_MODE == "queue":
+        sector_stats = _process_sectors_queued(run_id, sectors)
+    else:
+        sector_stats = _process_sectors_threaded(run_id, sectors, completed)
 
     # Financials (single call for all tickers)
-    logger.info("Refreshing financials...")
-    financials_updated = refresh_sector_financials(sectors)
+    if STAGE_FETCHED in done.get(FINANCIALS_UNIT, {}):
+        financials_updated = done[FINANCIALS_UNIT][STAGE_FETCHED].get("updated", 0)
+    else:
+        logger.info("Refreshing financials...")
+        financials_updated = refresh_sector_financials(sectors)
+        _checkpoint(run_id, FINANCIALS_UNIT, STAGE_FETCHED, {"updated": financials_updated})
 
     # Narratives (parallel, one Claude call per sector)
+    narrated = {s["id"] for s in sectors if STAGE_NARRATED in done.get(s["id"], {})}
     logger.info("Generating narratives...")
-    narratives_generated = generate_all_narratives(sectors)
+    pending = [s for s in sectors if s["id"] not in narrated]
+    if PIPELINE_MODE == "queue":
+        # Workers read the pre-clear narratives from the checkpoints themselves
+        tasks = workqueue.run_units(run_id, "narrative", [s["id"] for s in pending])
+        narratives_generated = sum(
+            1 for t in tasks.values() if t["status"] == "done" and t["result"].get("generated")
+        )
+    else:
+        previous = {
+            unit: stages[STAGE_PREVIOUS_NARRATIVE]
+            for unit, stages in db.get_checkpoints(run_id).items()
+            if STAGE_PREVIOUS_NARRATIVE in stages
+        }
+        narratives_generated = generate_all_narratives(pending, run_id=run_id, previous=previous)
+    narratives_generated += len(narrated)
 
     elapsed = (datetime.now(timezone.utc) - start).total_seconds()
+    failed = [s for s in sector_stats if s.get("error")]
 
     result = {
-        "status": "completed",
+        "status": "failed" if failed else "completed",
+        "run_id": run_id,
+        "mode": PIPELINE_MODE,
+        "resumed": completed is not None,
         "elapsed_seconds": round(elapsed, 1),
         "sectors_processed": len(sector_stats),
+        "sectors_skipped": sum(1 for s in sector_stats if s.get("skipped")),
+        "sectors_failed": len(failed),
         "total_new_articles": sum(s.get("new", 0) for s in sector_stats),
         "total_signals": sum(s.get("signals", 0) for s in sector_stats),
+        "articles_deferred": sum(s.get("deferred", 0) for s in sector_stats),
         "financials_updated": financials_updated,
         "narratives_generated": narratives_generated,
+        "usage": usage.run_summary(run_id),
         "sector_details": sector_stats,
     }
 
-    logger.info(f"Pipeline completed in {elapsed:.1f}s")
+    if failed:
+        logger.warning(f"Pipeline finished in {elapsed:.1f}s with {len(failed)} failed sectors")
+    else:
+        logger.info(f"Pipeline completed in {elapsed:.1f}s")
     return result
+
+
+def _log_sector_stats(stats: dict) -> None:
+    if stats.get("skipped"):
+        logger.info(f"  {stats['sector']}: already processed, skipped")
+    else:
+        deferred = f", {stats['deferred']} deferred by token budget" if stats.get("deferred") else ""
+        logger.info(f"  {stats['sector']}: {stats['new']} new articles, {stats['signals']} signals{deferred}")
+
+
+def _process_sectors_threaded(run_id: str, sectors: list[dict], completed: dict | None) -> list[dict]:
+    """Process sectors in parallel on this process's thread pools.
+
+    Sector threads fetch, dedup and store. Each sector's new articles then go
+    to the shared classification pool, which the sector thread doesn't wait
+    on: it moves on to the next sector. Signals are inserted, and the sector
+    checkpointed, once all of its batches are back.
+    """
+    done = completed or {}
+    sector_stats = []
+    classifying: dict[Future, tuple[dict, dict]] = {}
+
+    def failed(sector: dict, e: Exception) -> None:
+        logger.error(f"  Failed to process {sector['name']}: {e}")
+        sector_stats.append({"sector": sector["name"], "error": str(e)})
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(
+                _prepare_sector, s, run_id, done.get(s["id"], {}) if completed is not None else None
+            ): s
+            for s in sectors
+        }
+        for future in as_completed(futures):
+            sector = futures[future]
+            try:
+                stats, articles = future.result()
+            except Exception as e:
+                failed(sector, e)
+                continue
+            if articles:
+                classifying[_classify_pool.submit(articles, sector["name"], run_id)] = (sector, stats)
+            else:
+                sector_stats.append(_finish_sector(sector, run_id, stats))
+                _log_sector_stats(stats)
+
+    for future in as_completed(classifying):
+        sector, stats = classifying[future]
+        try:
+            _store_signals(*future.result(), sector["name"], stats)
+            sector_stats.append(_finish_sector(sector, run_id, stats))
+            _log_sector_stats(stats)
+        except Exception as e:
+            failed(sector, e)
+    return sector_stats
+
+
+def _process_sectors_queued(run_id: str, sectors: list[dict]) -> list[dict]:
+    """Queue one task per sector for worker processes and collect their stats."""
+    tasks = workqueue.run_units(run_id, "sector", [s["id"] for s in sectors])
+    sector_stats = []
+    for sector in sectors:
+        task = tasks[sector["id"]]
+        if task["status"] == "done":
+            sector_stats.append(task["result"])
+            _log_sector_stats(task["result"])
+        else:
+            error = task.get("error") or "lease expired"
+            logger.error(f"  Failed to process {sector['name']}: {error}")
+            sector_stats.append({"sector": sector["name"], "error": error})
+    return sector_stats
+
+
+# ---------------------------------------------------------------------------
+# 7. Queue task handlers (PIPELINE_MODE=queue, see workqueue.py)
+# ---------------------------------------------------------------------------
+
+def _task_sector(task: dict) -> dict:
+    sector = db.get_sector(task["unit"])
+    if sector is None:
+        raise ValueError(f"Unknown sector {task['unit']}")
+    return sector
+
+
+@workqueue.handler("sector")
+def run_sector_task(task: dict) -> dict:
+    # Always checkpoint-aware: a retried task picks up after the stages its
+    # previous attempt finished
+    completed = db.get_checkpoints(task["run_id"]).get(task["unit"], {})
+    return process_sector(_task_sector(task), task["run_id"], completed)
+
+
+@workqueue.handler("narrative")
+def run_narrative_task(task: dict) -> dict:
+    sector = _task_sector(task)
+    financials = {sector["id"]: db.get_sector_financials(sector["id"])}
+    previous = db.get_checkpoints(task["run_id"]).get(sector["id"], {}).get(STAGE_PREVIOUS_NARRATIVE)
+    generated = _generate_narrative_for_sector(
+        sector, financials, date.today().isoformat(), previous, run_id=task["run_id"]
+    )
+    if generated:
+        _checkpoint(task["run_id"], sector["id"], STAGE_NARRATED)
+    return {"generated": generated}
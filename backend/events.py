@@ -0,0 +1,249 @@
+"""
+In-process publish/subscribe for live dashboard updates.
+
+db.insert_signals and db.insert_narrative publish every row they write: one
+`signal` event per signal, one `narrative` event per narrative. GET
+/api/stream fans the events out to subscribers as Server-Sent Events. Each
+subscriber can filter on sector, signal type and minimum relevance. Narrative
+events are filtered by sector only.
+
+- Subscribers are coroutines waiting on an asyncio.Event. An open dashboard
+  costs no thread and no query between writes, only a keepalive comment every
+  EVENTS_KEEPALIVE_SECONDS.
+- Each subscriber buffers at most EVENTS_CLIENT_BUFFER events. A client that
+  falls further behind has its buffer dropped and gets a `reset` event. It
+  should reload through /api/init and carry on from there.
+- Event ids are "<epoch>-<seq>", and the last EVENTS_HISTORY_SIZE events are
+  kept. A reconnect with Last-Event-ID replays what the client missed. If the
+  id is from before a restart, or older than the history, the client gets a
+  `reset` instead.
+
+Events only reach subscribers of the process that wrote them. That covers
+pipeline runs started through the API and the in-process feed scheduler.
+Queue workers, a standalone scheduler.py and backfill.py write from their own
+processes.
+
+Events:
+    event: signal      data: {signal row}
+    event: narrative   data: {narrative row}
+    event: reset       data: {"reason": "overflow" | "history_gap"}
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator
+
+import orjson
+
+from config import EVENTS_CLIENT_BUFFER, EVENTS_HISTORY_SIZE, EVENTS_KEEPALIVE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+EVENT_SIGNAL = "signal"
+EVENT_NARRATIVE = "narrative"
+EVENT_RESET = "reset"
+
+MEDIA_TYPE = "text/event-stream"
+HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # keep proxies from buffering
+
+_Item = tuple[int, str, dict]  # (seq, event, data)
+
+
+class _Subscriber:
+    """One open stream: its filters and a bounded buffer, touched only on its event loop."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        sector_ids: set[str],
+        signal_types: set[str],
+        min_relevance: float,
+    ):
+        self.loop = loop
+        self.sector_ids = sector_ids
+        self.signal_types = signal_types
+        self.min_relevance = min_relevance
+        self.buffer: deque[_Item] = deque()
+        self.overflowed = False
+        self.ready = asyncio.Event()
+
+    def matches(self, event: str, data: dict) -> bool:
+        if self.sector_ids and data.get("sector_id") not in self.sector_ids:
+            return False
+        if event != EVENT_SIGNAL:
+            return True
+        if self.signal_types and data.get("signal_type") not in self.signal_types:
+            return False
+        return (data.get("ir_relevance") or 0.0) >= self.min_relevance
+
+    def deliver(self, items: list[_Item]) -> None:
+        for item in items:
+            if len(self.buffer) >= EVENTS_CLIENT_BUFFER:
+                self.buffer.clear()
+                self.overflowed = True
+            self.buffer.append(item)
+        self.ready.set()
+
+
+class Broker:
+    """Event history plus the set of live subscribers. publish() is safe from any thread."""
+
+    def __init__(self) -> None:
+        # Restarts get a new epoch, so ids from before one are recognized as unreplayable
+        self.epoch = format(int(time.time() * 1000), "x")
+        self._seq = 0
+        self._history: deque[_Item] = deque(maxlen=EVENTS_HISTORY_SIZE)
+        self._subscribers: set[_Subscriber] = set()
+        self._lock = threading.Lock()
+        self._published = 0
+        self._overflows = 0
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def publish(self, event: str, rows: list[dict]) -> None:
+        """Append one event per row to the history and hand them to matching subscribers."""
+        if not rows:
+            return
+        with self._lock:
+            items = []
+            for data in rows:
+                self._seq += 1
+                items.append((self._seq, event, data))
+            self._history.extend(items)
+            self._published += len(items)
+            subscribers = list(self._subscribers)
+
+        # One callback per event loop and publish, however many subscribers it serves
+        deliveries: dict[asyncio.AbstractEventLoop, list[tuple[_Subscriber, list[_Item]]]] = defaultdict(list)
+        for sub in subscribers:
+            matched = [item for item in items if sub.matches(item[1], item[2])]
+            if matched:
+                deliveries[sub.loop].append((sub, matched))
+        for loop, targets in deliveries.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, targets)
+            except RuntimeError:
+                pass  # loop closed: its subscribers are gone
+
+    def _backlog(self, last_event_id: str | None) -> list[_Item] | None:
+        """Events after last_event_id, or None if they can't all be replayed. Caller holds the lock."""
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        last = int(seq)
+        oldest = self._history[0][0] if self._history else self._seq + 1
+        if last < oldest - 1:
+            return None
+        return [item for item in self._history if item[0] > last]
+
+    async def subscribe(
+        self,
+        last_event_id: str | None = None,
+        sector_ids: set[str] | None = None,
+        signal_types: set[str] | None = None,
+        min_relevance: float = 0.0,
+    ) -> AsyncIterator[_Item | None]:
+        """Matching events as they are published, after any backlog since last_event_id.
+
+        Yields None when EVENTS_KEEPALIVE_SECONDS pass without an event.
+        """
+        sub = _Subscriber(asyncio.get_running_loop(), sector_ids or set(), signal_types or set(), min_relevance)
+        with self._lock:
+            # Registered and backlog read under the publish lock: every event is either in the backlog or delivered live
+            self._subscribers.add(sub)
+            backlog = self._backlog(last_event_id)
+            current = self._seq
+        try:
+            if backlog is None:
+                yield (current, EVENT_RESET, {"reason": "history_gap"})
+            else:
+                for item in backlog:
+                    if sub.matches(item[1], item[2]):
+                        yield item
+
+            while True:
+                try:
+                    await asyncio.wait_for(sub.ready.wait(), EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                sub.ready.clear()
+                # Checked before every yield: the buffer can overflow while we're suspended in one
+                while sub.overflowed or sub.buffer:
+                    if sub.overflowed:
+                        sub.overflowed = False
+                        with self._lock:
+                            self._overflows += 1
+                        # The buffer restarted after the overflow: resume from just before its first event
+                        resume = sub.buffer[0][0] - 1 if sub.buffer else self._seq
+                        yield (resume, EVENT_RESET, {"reason": "overflow"})
+                        continue
+                    yield sub.buffer.popleft()
+        finally:
+            with self._lock:
+                self._subscribers.discard(sub)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self._published,
+                "history": len(self._history),
+                "overflows": self._overflows,
+                "last_event_id": self.event_id(self._seq),
+            }
+
+
+def _deliver(targets: list[tuple[_Subscriber, list[_Item]]]) -> None:
+    for sub, items in targets:
+        sub.deliver(items)
+
+
+_broker = Broker()
+
+
+def publish_signals(rows: list[dict]) -> None:
+    _publish(EVENT_SIGNAL, rows)
+
+
+def publish_narrative(row: dict) -> None:
+    if row:
+        _publish(EVENT_NARRATIVE, [row])
+
+
+def _publish(event: str, rows: list[dict]) -> None:
+    # Best-effort: a live update must never fail the write it reports
+    try:
+        _broker.publish(event, rows)
+    except Exception as e:
+        logger.warning(f"Failed to publish {event} events: {e}")
+
+
+def stats() -> dict:
+    return _broker.stats()
+
+
+async def sse_stream(
+    last_event_id: str | None = None,
+    sector_ids: list[str] | None = None,
+    signal_types: list[str] | None = None,
+    min_relevance: float = 0.0,
+) -> AsyncIterator[bytes]:
+    """SSE body for GET /api/stream."""
+    yield b": connected\n\n"
+    async for item in _broker.subscribe(last_event_id, set(sector_ids or ()), set(signal_types or ()), min_relevance):
+        if item is None:
+            yield b": keepalive\n\n"
+            continue
+        seq, event, data = item
+        yield (
+            b"id: " + _broker.event_id(seq).encode()
+            + b"\nevent: " + event.encode()
+            + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+        )
@@ -0,0 +1,145 @@
+"""
+Streaming bulk export of classified signals (NDJSON / CSV / Parquet).
+
+Each writer consumes the chunk generator from db.iter_signals and yields
+encoded bytes per chunk, so memory stays at one chunk and the first bytes
+go out as soon as the first page comes back.
+"""
+
+import csv
+import io
+
+import orjson
+
+# Flat row shape: signal fields + the joined article fields
+EXPORT_COLUMNS = [
+    "id",
+    "sector_id",
+    "article_id",
+    "signal_type",
+    "sentiment",
+    "ir_relevance",
+    "summary",
+    "created_at",
+    "title",
+    "url",
+    "source",
+    "published_at",
+]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _flatten(row: dict) -> dict:
+    article = row.get("sector_articles") or {}
+    return {
+        "id": row.get("id"),
+        "sector_id": row.get("sector_id"),
+        "article_id": row.get("article_id"),
+        "signal_type": row.get("signal_type"),
+        "sentiment": row.get("sentiment"),
+        "ir_relevance": row.get("ir_relevance"),
+        "summary": row.get("summary"),
+        "created_at": row.get("created_at"),
+        "title": article.get("title"),
+        "url": article.get("url"),
+        "source": article.get("source"),
+        "published_at": article.get("published_at"),
+    }
+
+
+def stream_ndjson(chunks):
+    for chunk in chunks:
+        yield b"".join(orjson.dumps(_flatten(row)) + b"\n" for row in chunk)
+
+
+def stream_csv(chunks):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    # Header goes out before the first database page
+    yield buf.getvalue().encode()
+
+    for chunk in chunks:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(_flatten(row) for row in chunk)
+        yield buf.getvalue().encode()
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes can be taken between row groups."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_parquet(chunks):
+    """One Parquet row group per chunk. Requires pyarrow (optional dependency)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("sector_id", pa.string()),
+        ("article_id", pa.string()),
+        ("signal_type", pa.string()),
+        ("sentiment", pa.string()),
+        ("ir_relevance", pa.float32()),
+        ("summary", pa.string()),
+        ("created_at", pa.string()),
+        ("title", pa.string()),
+        ("url", pa.string()),
+        ("source", pa.string()),
+        ("published_at", pa.string()),
+    ])
+
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+    try:
+        for chunk in chunks:
+            rows = [_flatten(row) for row in chunk]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+WRITERS = {
+    "ndjson": stream_ndjson,
+    "csv": stream_csv,
+    "parquet": stream_parquet,
+}
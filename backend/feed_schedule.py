@@ -0,0 +1,90 @@
+"""
+Per-feed refresh schedule: the feed_schedule rows scheduler.py acts on.
+
+- After each fetch, the feed's yield (new, non-duplicate, non-filtered
+  articles) updates an EWMA. The interval is scaled by target / yield, at most
+  halved or doubled per fetch, and clamped to [SCHEDULER_MIN_INTERVAL,
+  SCHEDULER_MAX_INTERVAL]. Busy feeds converge to frequent polls; quiet ones
+  drift toward once a day.
+- A failed fetch keeps the learned interval but retries after an exponential
+  backoff (SCHEDULER_MIN_INTERVAL doubling, capped at SCHEDULER_FAILURE_BACKOFF_MAX).
+- Every delay is jittered so feeds don't fall into lockstep.
+
+Kept apart from scheduler.py, which needs etl to refresh feeds, so the API's
+read-only schedule route doesn't load the pipeline.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import db
+from config import (
+    SCHEDULER_DEFAULT_INTERVAL,
+    SCHEDULER_FAILURE_BACKOFF_MAX,
+    SCHEDULER_JITTER,
+    SCHEDULER_MAX_INTERVAL,
+    SCHEDULER_MIN_INTERVAL,
+    SCHEDULER_TARGET_YIELD,
+    SCHEDULER_YIELD_ALPHA,
+)
+
+
+def next_schedule(
+    prev: dict | None,
+    feed_id: str,
+    now: datetime,
+    new_articles: int | None,
+    error: str | None = None,
+) -> dict:
+    """feed_schedule row after a refresh that yielded new_articles (or failed with error)."""
+    interval = prev["interval_seconds"] if prev else SCHEDULER_DEFAULT_INTERVAL
+    yield_ewma = prev.get("yield_ewma") if prev else None
+    failures = prev["consecutive_failures"] if prev else 0
+
+    if error is None:
+        if yield_ewma is None:
+            yield_ewma = float(new_articles)
+        else:
+            yield_ewma = SCHEDULER_YIELD_ALPHA * new_articles + (1 - SCHEDULER_YIELD_ALPHA) * yield_ewma
+        factor = min(2.0, max(0.5, SCHEDULER_TARGET_YIELD / max(yield_ewma, 0.01)))
+        interval = int(min(SCHEDULER_MAX_INTERVAL, max(SCHEDULER_MIN_INTERVAL, interval * factor)))
+        failures = 0
+        delay = interval
+    else:
+        failures += 1
+        delay = min(SCHEDULER_MIN_INTERVAL * 2 ** (failures - 1), SCHEDULER_FAILURE_BACKOFF_MAX)
+
+    delay *= random.uniform(1 - SCHEDULER_JITTER, 1 + SCHEDULER_JITTER)
+    return {
+        "feed_id": feed_id,
+        "interval_seconds": interval,
+        "next_run_at": (now + timedelta(seconds=delay)).isoformat(),
+        "yield_ewma": round(yield_ewma, 4) if yield_ewma is not None else None,
+        "consecutive_failures": failures,
+        "last_run_at": now.isoformat(),
+        "last_new": new_articles,
+        "last_error": error,
+    }
+
+
+def schedule_overview() -> list[dict]:
+    """Every active feed with its scheduler state, soonest refresh first."""
+    schedules = db.get_feed_schedules()
+    rows = []
+    for feed in db.get_all_active_feeds():
+        sched = schedules.get(feed["id"], {})
+        rows.append({
+            "feed_id": feed["id"],
+            "sector_id": feed["sector_id"],
+            "sector": (feed.get("sectors") or {}).get("name"),
+            "query": feed["query"],
+            "interval_seconds": sched.get("interval_seconds"),
+            "next_run_at": sched.get("next_run_at"),
+            "yield_ewma": sched.get("yield_ewma"),
+            "consecutive_failures": sched.get("consecutive_failures", 0),
+            "last_run_at": sched.get("last_run_at"),
+            "last_new": sched.get("last_new"),
+            "last_error": sched.get("last_error"),
+        })
+    rows.sort(key=lambda r: r["next_run_at"] or "")
+    return rows
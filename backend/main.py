@@ -1,17 +1,55 @@
+"""
+HTTP API.
+
+The read endpoints only need db, search and the response helpers. etl (and
+with it anthropic, yfinance/pandas and feedparser), scheduler and
+narrative_stream are imported inside the routes that run them, so a cold start
+doesn't pay for the pipeline's import graph. benchmarks/bench_startup.py keeps
+it that way.
+
+JSON routes declare their return type. FastAPI then validates and serializes
+the result with Pydantic straight to JSON bytes, without walking every item
+through jsonable_encoder first (benchmarks/bench_serialization.py).
+"""
+
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 import db
-import etl
-from config import SIGNAL_TYPES
+import events
+import export
+import feed_schedule
+import ranking
+import search
+import usage
+from config import SCHEDULER_ENABLED, SIGNAL_TYPES
+from responses import CompressionMiddleware
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Industry Intelligence Tracker")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Optional in-process feed scheduler (scheduler.py can also run on its own)
+    feed_scheduler = None
+    if SCHEDULER_ENABLED:
+        import scheduler
+
+        feed_scheduler = scheduler.FeedScheduler()
+        feed_scheduler.start()
+    yield
+    if feed_scheduler:
+        feed_scheduler.stop()
+
+
+app = FastAPI(title="Industry Intelligence Tracker", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +58,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 
 
 # --- Shared helper ---
@@ -55,15 +94,83 @@ def _build_sectors_with_metrics(days: int) -> list[dict]:
     return result
 
 
+def _build_trend_series(rows: list[dict], sector_ids: list[str], days: int, interval: str) -> dict[str, list[dict]]:
+    """Fold daily rollup rows into a dense per-sector series of day or week buckets.
+
+    signal_count and avg_relevance exclude neutral signals, matching the dashboard's
+    signal counts; by_type and by_sentiment cover everything.
+    """
+    today = datetime.now(timezone.utc).date()
+    start = today - timedelta(days=days - 1)
+
+    def bucket_of(d: date) -> date:
+        return d - timedelta(days=d.weekday()) if interval == "week" else d
+
+    buckets = []
+    d = bucket_of(start)
+    step = timedelta(days=7 if interval == "week" else 1)
+    while d <= today:
+        buckets.append(d)
+        d += step
+
+    series: dict[str, dict[date, dict]] = {}
+    for row in rows:
+        points = series.setdefault(row["sector_id"], {})
+        key = bucket_of(date.fromisoformat(row["day"]))
+        point = points.setdefault(key, {
+            "signal_count": 0, "total": 0, "relevance_sum": 0.0, "by_type": {}, "by_sentiment": {},
+        })
+        count = row["signal_count"]
+        point["total"] += count
+        point["by_type"][row["signal_type"]] = point["by_type"].get(row["signal_type"], 0) + count
+        point["by_sentiment"][row["sentiment"]] = point["by_sentiment"].get(row["sentiment"], 0) + count
+        if row["signal_type"] != "neutral":
+            point["signal_count"] += count
+            point["relevance_sum"] += row["relevance_sum"]
+
+    result = {}
+    for sector_id in sector_ids:
+        points = series.get(sector_id, {})
+        dense = []
+        for b in buckets:
+            p = points.get(b)
+            if p is None:
+                dense.append({"date": b.isoformat(), "signal_count": 0, "total": 0,
+                              "avg_relevance": None, "by_type": {}, "by_sentiment": {}})
+                continue
+            dense.append({
+                "date": b.isoformat(),
+                "signal_count": p["signal_count"],
+                "total": p["total"],
+                "avg_relevance": round(p["relevance_sum"] / p["signal_count"], 3) if p["signal_count"] else None,
+                "by_type": p["by_type"],
+                "by_sentiment": p["by_sentiment"],
+            })
+        result[sector_id] = dense
+    return result
+
+
 # --- Endpoints ---
 
 @app.get("/api/health")
-def health():
+def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/api/health/db")
+def health_db() -> dict:
+    """Storage backend and connection-pool stats (reuse ratio, pool wait percentiles, retries)."""
+    return db.get_storage_stats()
+
+
+@app.get("/api/health/stream")
+def health_stream() -> dict:
+    """Live event broker: open subscribers, events published, history size, buffer overflows."""
+    return events.stats()
+
+
 @app.get("/api/init")
-def init(days: int = Query(default=7, ge=1)):
+def init(days: int = Query(default=7, ge=1)) -> dict:
     """Combined dashboard load — one request, not N+1."""
     sectors = _build_sectors_with_metrics(days)
 
@@ -79,7 +186,7 @@ def init(days: int = Query(default=7, ge=1)):
 
 
 @app.get("/api/sectors")
-def get_sectors(days: int = Query(default=7, ge=1)):
+def get_sectors(days: int = Query(default=7, ge=1)) -> list[dict]:
     """All sectors with financials, signal counts, and narrative summary."""
     return _build_sectors_with_metrics(days)
 
@@ -90,7 +197,7 @@ def get_sector_detail(
     days: int = Query(default=7, ge=1),
     signal_type: Optional[str] = Query(default=None),
     sentiment: Optional[str] = Query(default=None),
-):
+) -> dict:
     """Full sector detail with signals, narrative, and financials."""
     try:
         sector = db.get_sector(sector_id)
@@ -126,6 +233,76 @@ def get_sector_detail(
     }
 
 
+@app.post("/api/sectors/{sector_id}/narrative/stream")
+def stream_sector_narrative(sector_id: str):
+    """Regenerate one sector's narrative, streaming the model's output as Server-Sent Events."""
+    import narrative_stream
+
+    try:
+        sector = db.get_sector(sector_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Sector not found")
+    if not sector:
+        raise HTTPException(status_code=404, detail="Sector not found")
+
+    return StreamingResponse(
+        narrative_stream.stream_narrative(sector),
+        media_type=narrative_stream.MEDIA_TYPE,
+        headers=narrative_stream.HEADERS,
+    )
+
+
+@app.get("/api/stream")
+def stream_events(
+    sector_id: list[str] = Query(default=[]),
+    signal_type: list[str] = Query(default=[]),
+    min_relevance: float = Query(default=0.0, ge=0.0, le=1.0),
+    last_event_id: Optional[str] = Query(default=None),
+    last_event_id_header: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    """Live signal and narrative writes as Server-Sent Events, resumable from Last-Event-ID."""
+    return StreamingResponse(
+        events.sse_stream(
+            last_event_id=last_event_id_header or last_event_id,
+            sector_ids=sector_id,
+            signal_types=signal_type,
+            min_relevance=min_relevance,
+        ),
+        media_type=events.MEDIA_TYPE,
+        headers=events.HEADERS,
+    )
+
+
+@app.get("/api/sectors/{sector_id}/trend")
+def get_sector_trend(
+    sector_id: str,
+    days: int = Query(default=30, ge=1, le=1095),
+    interval: Literal["day", "week"] = Query(default="day"),
+) -> dict:
+    """Signal volume, sentiment mix and mean relevance over time, read from the daily rollup."""
+    try:
+        sector = db.get_sector(sector_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Sector not found")
+    if not sector:
+        raise HTTPException(status_code=404, detail="Sector not found")
+
+    rows = db.get_signal_rollup(days, sector_id=sector_id)
+    series = _build_trend_series(rows, [sector_id], days, interval)
+    return {"sector_id": sector_id, "interval": interval, "series": series[sector_id]}
+
+
+@app.get("/api/trends")
+def get_trends(
+    days: int = Query(default=30, ge=1, le=1095),
+    interval: Literal["day", "week"] = Query(default="day"),
+) -> dict:
+    """Cross-sector trend series keyed by sector_id, read from the daily rollup."""
+    rows = db.get_signal_rollup(days)
+    sector_ids = [s["id"] for s in db.get_sectors()]
+    return {"interval": interval, "sectors": _build_trend_series(rows, sector_ids, days, interval)}
+
+
 @app.get("/api/signals")
 def get_signals(
     sector_id: Optional[str] = Query(default=None),
@@ -134,8 +311,20 @@ def get_signals(
     min_relevance: float = Query(default=0.5, ge=0.0, le=1.0),
     days: int = Query(default=7, ge=1),
     limit: int = Query(default=50, ge=1, le=200),
-):
-    """Cross-sector signal search with filters."""
+    sort: Literal["recent", "ranked"] = Query(default="recent"),
+    diversify: bool = Query(default=False),
+) -> list[dict]:
+    """Cross-sector signal search with filters, newest first or ranked (see ranking.py)."""
+    if sort == "ranked":
+        return ranking.top_signals(
+            limit,
+            days=days,
+            sector_id=sector_id,
+            signal_type=signal_type,
+            sentiment=sentiment,
+            min_relevance=min_relevance,
+            diversify=diversify,
+        )
     return db.get_all_signals(
         days=days,
         sector_id=sector_id,
@@ -146,21 +335,94 @@ def get_signals(
     )
 
 
+@app.get("/api/search")
+def search_signals(
+    q: str = Query(min_length=1, max_length=200),
+    sector_id: Optional[str] = Query(default=None),
+    signal_type: Optional[str] = Query(default=None),
+    sentiment: Optional[str] = Query(default=None),
+    min_relevance: float = Query(default=0.0, ge=0.0, le=1.0),
+    days: int = Query(default=30, ge=1),
+    limit: int = Query(default=50, ge=1, le=200),
+) -> list[dict]:
+    """Ranked full-text search over signal summaries and headlines, with highlighting."""
+    return search.search(
+        q,
+        days=days,
+        sector_id=sector_id,
+        signal_type=signal_type,
+        sentiment=sentiment,
+        min_relevance=min_relevance,
+        limit=limit,
+    )
+
+
+@app.get("/api/export/signals")
+def export_signals(
+    format: Literal["ndjson", "csv", "parquet"] = Query(default="ndjson"),
+    sector_id: Optional[str] = Query(default=None),
+    signal_type: Optional[str] = Query(default=None),
+    sentiment: Optional[str] = Query(default=None),
+    min_relevance: float = Query(default=0.0, ge=0.0, le=1.0),
+    days: int = Query(default=30, ge=1),
+):
+    """Stream every matching signal with article metadata, one database page at a time."""
+    if format == "parquet" and not export.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+
+    chunks = db.iter_signals(
+        days=days,
+        sector_id=sector_id,
+        signal_type=signal_type,
+        sentiment=sentiment,
+        min_relevance=min_relevance,
+    )
+    filename = f"signals-{datetime.now(timezone.utc):%Y%m%d}.{format}"
+    return StreamingResponse(
+        export.WRITERS[format](chunks),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @app.post("/api/pipeline/run")
-def pipeline_run():
-    result = etl.run_pipeline()
+def pipeline_run(resume: bool = Query(default=False)) -> dict:
+    """Run the pipeline; resume=true continues the last interrupted run from its checkpoints."""
+    import etl
+
+    result = etl.run_pipeline(resume=resume)
+    if result["status"] == "nothing_to_resume":
+        raise HTTPException(status_code=409, detail="No interrupted pipeline run to resume")
     return result
 
 
 @app.post("/api/pipeline/financials")
-def pipeline_financials():
+def pipeline_financials() -> dict:
     """Refresh ETF data only."""
+    import etl
+
     sectors = db.get_sectors()
     count = etl.refresh_sector_financials(sectors)
     return {"financials_updated": count}
 
 
+@app.get("/api/pipeline/schedule")
+def pipeline_schedule() -> list[dict]:
+    """Per-feed scheduler state: learned interval, yield, failures, next refresh."""
+    return feed_schedule.schedule_overview()
+
+
+@app.get("/api/pipeline/usage")
+def pipeline_usage(
+    run_id: Optional[str] = Query(default=None),
+    days: int = Query(default=7, ge=1, le=365),
+) -> dict:
+    """Model token usage by stage, sector and feed, for one pipeline run or the last `days` days."""
+    rows = db.get_usage(run_id=run_id) if run_id else db.get_usage(days=days)
+    return usage.summarize(rows)
+
+
 @app.get("/api/config/signal-types")
-def get_signal_types():
+def get_signal_types() -> dict:
     """Signal type metadata."""
     return SIGNAL_TYPES
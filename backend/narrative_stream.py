@@ -0,0 +1,144 @@
+"""
+On-demand narrative regeneration streamed as Server-Sent Events.
+
+POST /api/sectors/{id}/narrative/stream makes the same record_narrative
+call as etl.generate_narrative and streams it. The tool input arrives as JSON
+fragments; the SDK's running parse of them gives the summary_full text so far,
+and each new piece of it is forwarded as it arrives. The final input is then
+validated and stored like the batch path does.
+
+Concurrent requests for one sector share a single upstream stream: the first
+request starts it on a background thread and every subscriber (including ones
+that join late) replays the events so far, then follows live. Subscribers are
+coroutines woken through their event loop, like events.Broker's, so an open
+stream holds no threadpool worker. A client that disconnects doesn't cancel
+the stream, so the narrative is still stored.
+
+Events:
+    event: token   data: {"text": "..."}        next piece of summary_full
+    event: done    data: {narrative row}        stored narrative
+    event: error   data: {"detail": "..."}      nothing was stored
+"""
+
+import asyncio
+import logging
+import threading
+from collections.abc import AsyncIterator
+
+import anthropic
+import orjson
+
+import db
+import etl
+import usage
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = "text/event-stream"
+HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # keep proxies from buffering
+STREAMED_FIELD = "summary_full"  # the record_narrative field forwarded as token events
+
+_active: dict[str, "_Broadcast"] = {}
+_active_lock = threading.Lock()
+
+
+class _Broadcast:
+    """Event log of one upstream stream, readable by any number of subscribers.
+
+    publish() runs on the stream's thread and wakes each subscriber's asyncio.Event through its loop.
+    """
+
+    def __init__(self) -> None:
+        self._events: list[tuple[str, dict]] = []
+        self._finished = False
+        self._lock = threading.Lock()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def publish(self, event: str, data: dict, final: bool = False) -> None:
+        with self._lock:
+            self._events.append((event, data))
+            self._finished = self._finished or final
+            waiters = list(self._waiters)
+        for loop, ready in waiters:
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                pass  # loop closed: its subscriber is gone
+
+    async def subscribe(self) -> AsyncIterator[tuple[str, dict]]:
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            i = 0
+            while True:
+                # Cleared before reading, so a publish after the read still wakes us
+                waiter[1].clear()
+                with self._lock:
+                    events = self._events[i:]
+                    finished = self._finished
+                for item in events:
+                    yield item
+                i += len(events)
+                if finished:
+                    return
+                if not events:
+                    await waiter[1].wait()
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+def _generate(sector: dict, broadcast: _Broadcast) -> None:
+    try:
+        signals = etl.sector_top_signals(sector["id"])
+        if not signals:
+            broadcast.publish("error", {"detail": f"No relevant signals for {sector['name']}"}, final=True)
+            return
+
+        financials = db.get_sector_financials(sector["id"])
+        prompt = etl.narrative_prompt(sector, signals, financials)
+        with etl._get_anthropic().messages.stream(**etl.narrative_request(prompt)) as stream:
+            sent = 0
+            for event in stream:
+                if event.type != "input_json" or not isinstance(event.snapshot, dict):
+                    continue
+                text = event.snapshot.get(STREAMED_FIELD)
+                if isinstance(text, str) and len(text) > sent:
+                    broadcast.publish("token", {"text": text[sent:]})
+                    sent = len(text)
+            response = stream.get_final_message()
+        usage.record(response, usage.STAGE_NARRATIVE_STREAM, sector_id=sector["id"])
+
+        narrative = db.insert_narrative(etl.parse_narrative(response, sector, signals, financials))
+        broadcast.publish("done", narrative, final=True)
+    except (ValueError, anthropic.APIError) as e:
+        logger.warning(f"Streamed narrative failed for {sector['name']}: {e}")
+        broadcast.publish("error", {"detail": f"Narrative generation failed: {e}"}, final=True)
+    except Exception as e:
+        logger.error(f"Streamed narrative failed for {sector['name']}: {e}")
+        broadcast.publish("error", {"detail": "Narrative generation failed"}, final=True)
+    finally:
+        with _active_lock:
+            if _active.get(sector["id"]) is broadcast:
+                del _active[sector["id"]]
+
+
+async def stream_narrative(sector: dict) -> AsyncIterator[bytes]:
+    """SSE body for a sector's narrative, joining the sector's in-flight stream if there is one."""
+    with _active_lock:
+        broadcast = _active.get(sector["id"])
+        if broadcast is None:
+            broadcast = _active[sector["id"]] = _Broadcast()
+            threading.Thread(
+                target=_generate, args=(sector, broadcast), name=f"narrative-stream-{sector['id'][:8]}", daemon=True
+            ).start()
+        else:
+            logger.info(f"Joining in-flight narrative stream for {sector['name']}")
+
+    async for event, data in broadcast.subscribe():
+        yield _sse(event, data)
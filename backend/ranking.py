@@ -0,0 +1,137 @@
+"""
+Ranked top-k signals: IR relevance x recency decay x source weight.
+
+    score = ir_relevance * 0.5 ** (age_hours / RANKING_HALF_LIFE_HOURS) * source_weight
+
+A strong signal from a few days ago can outrank a weak one from this morning,
+and wire services outrank press-release mills (RANKING_SOURCE_WEIGHTS). The
+decay is exponential, so the relative order of two signals doesn't change as
+they age. Only new signals, or the window's edge, can reorder a ranking.
+
+Age runs from the article's published_at, so a story fetched days late doesn't
+rank as fresh. Without a publication date it runs from the signal's
+created_at, and it never starts later than created_at.
+
+The window is read newest first through db.iter_signals, an indexed range scan
+on created_at, in pages of SCAN_CHUNK. A min-heap keeps the best candidates
+seen so far. Every row further down the scan was created earlier, and a
+signal's age is at least its created_at age, so those rows score at most
+decay(created_at age of the current row) * max source weight. Once that bound
+drops below the weakest candidate in a full heap, the scan stops. The full
+window is never loaded or sorted.
+
+With diversify=True the heap keeps RANKING_DIVERSITY_POOL x k candidates.
+The result is then picked greedily from them, each pick's score discounted by
+RANKING_DIVERSITY_PENALTY for every signal already picked from the same
+sector and of the same signal type.
+"""
+
+import heapq
+from datetime import datetime, timezone
+
+import db
+from config import (
+    RANKING_DEFAULT_SOURCE_WEIGHT,
+    RANKING_DIVERSITY_PENALTY,
+    RANKING_DIVERSITY_POOL,
+    RANKING_HALF_LIFE_HOURS,
+    RANKING_SOURCE_WEIGHTS,
+)
+
+SCAN_CHUNK = 200
+
+_MAX_SOURCE_WEIGHT = max([RANKING_DEFAULT_SOURCE_WEIGHT, *RANKING_SOURCE_WEIGHTS.values()])
+
+
+def source_weight(signal: dict) -> float:
+    article = signal.get("sector_articles") or {}
+    source = (article.get("source") or "").strip().lower()
+    return RANKING_SOURCE_WEIGHTS.get(source, RANKING_DEFAULT_SOURCE_WEIGHT)
+
+
+def _parse(timestamp: str) -> datetime:
+    parsed = datetime.fromisoformat(timestamp)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _hours_since(when: datetime, now: datetime) -> float:
+    return max(0.0, (now - when).total_seconds() / 3600)
+
+
+def _age_hours(signal: dict, now: datetime) -> float:
+    """Hours since publication, or since created_at if that is earlier or there's no date."""
+    created = _parse(signal["created_at"])
+    published = (signal.get("sector_articles") or {}).get("published_at")
+    return _hours_since(min(_parse(published), created) if published else created, now)
+
+
+def _decay(age_hours: float) -> float:
+    return 0.5 ** (age_hours / RANKING_HALF_LIFE_HOURS)
+
+
+def score(signal: dict, now: datetime | None = None) -> float:
+    now = now or datetime.now(timezone.utc)
+    return (signal.get("ir_relevance") or 0.0) * _decay(_age_hours(signal, now)) * source_weight(signal)
+
+
+def top_signals(
+    limit: int,
+    days: int = 7,
+    sector_id: str | None = None,
+    signal_type: str | None = None,
+    sentiment: str | None = None,
+    min_relevance: float = 0.0,
+    diversify: bool = False,
+) -> list[dict]:
+    """The `limit` best-scoring signals of the last `days` days, best first, each with its "score".
+
+    Neutral signals are left out unless signal_type="neutral" asks for them.
+    """
+    now = datetime.now(timezone.utc)
+    capacity = limit * RANKING_DIVERSITY_POOL if diversify else limit
+    heap: list[tuple[float, int, dict]] = []  # min-heap of (score, scan order, signal)
+    seen = 0
+
+    chunks = db.iter_signals(days, sector_id, signal_type, sentiment, min_relevance, chunk_size=SCAN_CHUNK)
+    for chunk in chunks:
+        for signal in chunk:
+            bound = _decay(_hours_since(_parse(signal["created_at"]), now)) * _MAX_SOURCE_WEIGHT
+            if len(heap) >= capacity and bound <= heap[0][0]:
+                # Everything from here on was created earlier: none of it can make the cut
+                chunks.close()
+                return _finish(heap, limit, diversify)
+            if signal.get("signal_type") == "neutral" and signal_type != "neutral":
+                continue
+            s = (signal.get("ir_relevance") or 0.0) * _decay(_age_hours(signal, now)) * source_weight(signal)
+            seen += 1
+            entry = (s, -seen, {**signal, "score": round(s, 4)})
+            if len(heap) < capacity:
+                heapq.heappush(heap, entry)
+            elif s > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+    return _finish(heap, limit, diversify)
+
+
+def _finish(heap: list[tuple[float, int, dict]], limit: int, diversify: bool) -> list[dict]:
+    # Ties go to the newer signal (scanned first, so the larger -order)
+    ranked = [signal for _, _, signal in sorted(heap, reverse=True)]
+    return _diversify(ranked, limit) if diversify else ranked[:limit]
+
+
+def _diversify(candidates: list[dict], limit: int) -> list[dict]:
+    picked: list[dict] = []
+    per_sector: dict[str, int] = {}
+    per_type: dict[str, int] = {}
+    remaining = list(candidates)
+    while remaining and len(picked) < limit:
+        best_i, best = 0, -1.0
+        for i, signal in enumerate(remaining):
+            repeats = per_sector.get(signal["sector_id"], 0) + per_type.get(signal["signal_type"], 0)
+            effective = signal["score"] * RANKING_DIVERSITY_PENALTY ** repeats
+            if effective > best:
+                best_i, best = i, effective
+        signal = remaining.pop(best_i)
+        per_sector[signal["sector_id"]] = per_sector.get(signal["sector_id"], 0) + 1
+        per_type[signal["signal_type"]] = per_type.get(signal["signal_type"], 0) + 1
+        picked.append(signal)
+    return picked
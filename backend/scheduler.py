@@ -0,0 +1,162 @@
+"""
+Adaptive per-feed refresh scheduler.
+
+Instead of one pipeline run polling every feed at the same rate, each
+sector_feeds row is refreshed on its own interval (state in feed_schedule).
+feed_schedule.py learns the intervals from each feed's yield and failures;
+this module runs the refreshes, at most SCHEDULER_MAX_CONCURRENCY at once.
+
+Sectors that gained signals get their narrative regenerated, at most once per
+SCHEDULER_NARRATIVE_INTERVAL.
+
+Run standalone from backend/ with `python scheduler.py`, or inside the API
+process with SCHEDULER_ENABLED=1.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timezone
+
+import db
+import etl
+from config import SCHEDULER_MAX_CONCURRENCY, SCHEDULER_NARRATIVE_INTERVAL, SCHEDULER_TICK_SECONDS
+from feed_schedule import next_schedule
+
+logger = logging.getLogger(__name__)
+
+
+class FeedScheduler:
+    """Background loop that refreshes due feeds on a bounded thread pool."""
+
+    def __init__(self, max_concurrency: int = SCHEDULER_MAX_CONCURRENCY, tick_seconds: float = SCHEDULER_TICK_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.tick_seconds = tick_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="feed-scheduler")
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        # Sectors with new signals since their last narrative, and when that narrative was written
+        self._stale_sectors: dict[str, dict] = {}
+        self._narrated_at: dict[str, datetime] = {}
+
+    # --- Lifecycle ---
+
+    def start(self) -> None:
+        for sector_id, narrative in db.get_all_latest_narratives().items():
+            if narrative.get("created_at"):
+                self._narrated_at[sector_id] = datetime.fromisoformat(narrative["created_at"])
+        self._thread = threading.Thread(target=self._loop, name="feed-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Feed scheduler started (concurrency {self.max_concurrency}, tick {self.tick_seconds}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Feed scheduler stopped")
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Scheduler tick failed: {e}")
+            self._stop.wait(self.tick_seconds)
+
+    # --- Scheduling ---
+
+    def _submit(self, key: str, fn, *args) -> None:
+        future = self._executor.submit(fn, *args)
+        with self._lock:
+            self._in_flight[key] = future
+
+        def done(_, key=key):
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+        future.add_done_callback(done)
+
+    def tick(self) -> int:
+        """Start refreshes for due feeds (up to the free concurrency). Returns how many started."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            in_flight = set(self._in_flight)
+        free = self.max_concurrency - len(in_flight)
+        if free <= 0:
+            return 0
+
+        schedules = db.get_feed_schedules()
+        due = []
+        for feed in db.get_all_active_feeds():
+            if feed["id"] in in_flight:
+                continue
+            sched = schedules.get(feed["id"])
+            if sched is None or datetime.fromisoformat(sched["next_run_at"]) <= now:
+                due.append((feed, sched))
+        # Never-fetched feeds first, then most overdue
+        due.sort(key=lambda fs: fs[1]["next_run_at"] if fs[1] else "")
+
+        started = 0
+        for feed, sched in due[:free]:
+            self._submit(feed["id"], self._refresh_feed, feed, sched)
+            started += 1
+        free -= started
+
+        with self._lock:
+            stale = list(self._stale_sectors.items())
+        for sector_id, sector in stale:
+            if free <= 0:
+                break
+            key = f"narrative:{sector_id}"
+            last = self._narrated_at.get(sector_id)
+            if key in in_flight or (last and (now - last).total_seconds() < SCHEDULER_NARRATIVE_INTERVAL):
+                continue
+            with self._lock:
+                self._stale_sectors.pop(sector_id, None)
+            self._submit(key, self._refresh_narrative, sector)
+            free -= 1
+
+        return started
+
+    def _refresh_feed(self, feed: dict, sched: dict | None) -> None:
+        sector = {"id": feed["sector_id"], **(feed.get("sectors") or {})}
+        new_articles, error = None, None
+        try:
+            stats = etl.process_feed(feed, sector)
+            new_articles = stats["new"]
+            if stats["signals"]:
+                with self._lock:
+                    self._stale_sectors[sector["id"]] = sector
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.warning(f"Feed {feed['id']} ({sector.get('name')}) refresh failed: {error}")
+
+        schedule = next_schedule(sched, feed["id"], datetime.now(timezone.utc), new_articles, error)
+        db.upsert_feed_schedule(schedule)
+        if error is None:
+            logger.info(
+                f"  {sector.get('name')}: feed {feed['id'][:8]} +{new_articles} new,"
+                f" next in {schedule['interval_seconds'] // 60}m (yield {schedule['yield_ewma']})"
+            )
+
+    def _refresh_narrative(self, sector: dict) -> None:
+        financials = {sector["id"]: db.get_sector_financials(sector["id"])}
+        if etl._generate_narrative_for_sector(sector, financials, date.today().isoformat()):
+            self._narrated_at[sector["id"]] = datetime.now(timezone.utc)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    scheduler = FeedScheduler()
+    scheduler.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
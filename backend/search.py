@@ -0,0 +1,299 @@
+"""
+Full-text search over signal summaries and article headlines.
+
+Two interchangeable backends, selected by SEARCH_BACKEND:
+- postgres: the search_signals RPC (tsvector + GIN expression indexes, see schema.sql)
+- local: an in-process inverted index for offline use, refreshed incrementally
+
+Both return signal rows shaped like /api/signals plus `rank` and a
+`highlight` dict with the summary and title HTML-escaped and matches wrapped
+in <mark>, safe to render as HTML.
+"""
+
+import heapq
+import html
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import db
+from config import SEARCH_BACKEND, SEARCH_INDEX_DAYS, SEARCH_INDEX_REFRESH_SECONDS
+
+# Headline matches outrank summary matches, mirroring setweight A/B in schema.sql
+TITLE_WEIGHT = 1.0
+SUMMARY_WEIGHT = 0.4
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+_WORD = re.compile(r"[A-Za-z0-9]+(?:['’][A-Za-z]+)?")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in into is it its of on or "
+    "that the their this to was were will with".split()
+)
+
+
+def _stem(word: str) -> str:
+    """Light English suffix stripping — close enough to Postgres' english config for recall."""
+    word = word.lower().replace("’", "'")
+    if word.endswith("'s"):
+        word = word[:-2]
+    for suffix, repl in (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: len(word) - len(suffix)] + repl
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        _stem(w) for w in _WORD.findall(text or "")
+        if w.lower() not in _STOPWORDS
+    ]
+
+
+def _parse_query(query: str) -> tuple[list[list[str]], set[str]]:
+    """websearch_to_tsquery-style parsing: terms AND together, `or` separates groups, `-term` excludes."""
+    groups: list[list[str]] = [[]]
+    excluded: set[str] = set()
+    for raw in query.replace('"', " ").split():
+        if raw.lower() == "or":
+            if groups[-1]:
+                groups.append([])
+            continue
+        if raw.startswith("-"):
+            excluded.update(tokenize(raw[1:]))
+            continue
+        groups[-1].extend(tokenize(raw))
+    return [g for g in groups if g], excluded
+
+
+def highlight(text: str | None, stems: set[str]) -> str:
+    """HTML-escaped text with matching words wrapped in <mark>."""
+    if not text:
+        return ""
+    parts, end = [], 0
+    for m in _WORD.finditer(text):
+        word = html.escape(m.group(0))
+        parts.append(html.escape(text[end : m.start()]))
+        parts.append(f"<mark>{word}</mark>" if _stem(m.group(0)) in stems else word)
+        end = m.end()
+    parts.append(html.escape(text[end:]))
+    return "".join(parts)
+
+
+def _parse_ts(value: str | None) -> datetime:
+    if not value:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+# ---------------------------------------------------------------------------
+# Local inverted index
+# ---------------------------------------------------------------------------
+
+class SearchIndex:
+    """Inverted index of weighted term frequencies over summary + headline, scored with BM25."""
+
+    def __init__(self):
+        self._postings: dict[str, dict[str, float]] = defaultdict(dict)
+        self._doc_terms: dict[str, dict[str, float]] = {}
+        self._doc_len: dict[str, float] = {}
+        self._docs: dict[str, dict] = {}
+        self._created: dict[str, datetime] = {}
+        self._total_len = 0.0
+        self._lock = threading.RLock()
+        self.watermark: str | None = None  # newest created_at indexed
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, rows: list[dict]) -> None:
+        """Index signal rows. Re-adding an existing id replaces it."""
+        with self._lock:
+            for row in rows:
+                doc_id = row["id"]
+                self._remove(doc_id)
+
+                article = row.get("sector_articles") or {}
+                terms: dict[str, float] = defaultdict(float)
+                for term in tokenize(article.get("title")):
+                    terms[term] += TITLE_WEIGHT
+                for term in tokenize(row.get("summary")):
+                    terms[term] += SUMMARY_WEIGHT
+
+                for term, tf in terms.items():
+                    self._postings[term][doc_id] = tf
+                length = sum(terms.values())
+                self._doc_terms[doc_id] = terms
+                self._doc_len[doc_id] = length
+                self._total_len += length
+                self._docs[doc_id] = row
+                self._created[doc_id] = _parse_ts(row.get("created_at"))
+
+                created = row.get("created_at")
+                if created and (self.watermark is None or created > self.watermark):
+                    self.watermark = created
+
+    def prune(self, before: datetime) -> None:
+        """Drop documents created before the retention cutoff."""
+        with self._lock:
+            for doc_id in [d for d, ts in self._created.items() if ts < before]:
+                self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+        del self._docs[doc_id]
+        del self._created[doc_id]
+
+    def _match_group(self, terms: list[str]) -> set[str]:
+        postings = sorted((self._postings.get(t, {}) for t in terms), key=len)
+        if not postings or not postings[0]:
+            return set()
+        matched = set(postings[0])
+        for p in postings[1:]:
+            matched.intersection_update(p)
+            if not matched:
+                break
+        return matched
+
+    def search(
+        self,
+        query: str,
+        since: datetime,
+        sector_id: str | None = None,
+        signal_type: str | None = None,
+        sentiment: str | None = None,
+        min_relevance: float = 0.0,
+        limit: int = 50,
+    ) -> list[dict]:
+        groups, excluded = _parse_query(query)
+        if not groups:
+            return []
+
+        with self._lock:
+            candidates: set[str] = set()
+            for group in groups:
+                candidates |= self._match_group(group)
+            for term in excluded:
+                candidates.difference_update(self._postings.get(term, {}))
+
+            n_docs = len(self._docs) or 1
+            avg_len = (self._total_len / n_docs) or 1.0
+            query_terms = {t for g in groups for t in g}
+            idf = {}
+            for term in query_terms:
+                df = len(self._postings.get(term, {}))
+                idf[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+            def score(doc_id: str) -> float:
+                norm = _K1 * (1 - _B + _B * self._doc_len[doc_id] / avg_len)
+                total = 0.0
+                for term in query_terms:
+                    tf = self._postings.get(term, {}).get(doc_id)
+                    if tf:
+                        total += idf[term] * tf * (_K1 + 1) / (tf + norm)
+                return total
+
+            scored = []
+            for doc_id in candidates:
+                row = self._docs[doc_id]
+                if self._created[doc_id] < since:
+                    continue
+                if (row.get("ir_relevance") or 0.0) < min_relevance:
+                    continue
+                if sector_id and row.get("sector_id") != sector_id:
+                    continue
+                if signal_type and row.get("signal_type") != signal_type:
+                    continue
+                if sentiment and row.get("sentiment") != sentiment:
+                    continue
+                scored.append((score(doc_id), self._created[doc_id], doc_id))
+
+            top = heapq.nlargest(limit, scored)
+            results = []
+            for rank, _, doc_id in top:
+                row = self._docs[doc_id]
+                article = row.get("sector_articles") or {}
+                results.append({
+                    **row,
+                    "rank": round(rank, 4),
+                    "highlight": {
+                        "summary": highlight(row.get("summary"), query_terms),
+                        "title": highlight(article.get("title"), query_terms),
+                    },
+                })
+            return results
+
+
+_index: SearchIndex | None = None
+_index_lock = threading.Lock()
+_last_refresh = 0.0
+
+
+def _local_index() -> SearchIndex:
+    """Build the index on first use, then pull only signals newer than the watermark."""
+    global _index, _last_refresh
+    with _index_lock:
+        now = time.monotonic()
+        cutoff = datetime.now(timezone.utc) - timedelta(days=SEARCH_INDEX_DAYS)
+        if _index is None:
+            index = SearchIndex()
+            index.add(db.get_signals_since(cutoff.isoformat()))
+            _index, _last_refresh = index, now
+        elif now - _last_refresh >= SEARCH_INDEX_REFRESH_SECONDS:
+            _index.add(db.get_signals_since(_index.watermark or cutoff.isoformat()))
+            _index.prune(cutoff)
+            _last_refresh = now
+        return _index
+
+
+def reset_index() -> None:
+    """Drop the local index (e.g. after clear_pipeline_data); rebuilt on next search."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def search(
+    query: str,
+    days: int = 30,
+    sector_id: str | None = None,
+    signal_type: str | None = None,
+    sentiment: str | None = None,
+    min_relevance: float = 0.0,
+    limit: int = 50,
+) -> list[dict]:
+    if SEARCH_BACKEND == "local":
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        return _local_index().search(
+            query,
+            since=since,
+            sector_id=sector_id,
+            signal_type=signal_type,
+            sentiment=sentiment,
+            min_relevance=min_relevance,
+            limit=limit,
+        )
+    return db.search_signals(
+        query,
+        days=days,
+        sector_id=sector_id,
+        signal_type=signal_type,
+        sentiment=sentiment,
+        min_relevance=min_relevance,
+        limit=limit,
+    )
@@ -0,0 +1,204 @@
+"""
+News source adapters, keyed by sector_feeds.feed_type.
+
+- google_news: Google News search RSS (the MVP source)
+- einnews: EINNews industry RSS
+- federal_register: Federal Register documents API, paginated
+
+Each adapter (a SourceAdapter registered with @register) pages through its
+source and normalizes items into article dicts. Every fetch, from pipeline
+runs, the feed scheduler and backfills alike, goes through one process-wide
+FetchScheduler, which runs at most max_concurrency fetches per source at once
+and queues the rest per source, so a slow or strict source never holds up the
+others. Adapters also space their requests by min_interval.
+
+With SOURCES_OFFLINE=1 adapters talk to fixture-backed stand-ins
+(sources.offline) instead of the network.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import httpx
+
+from config import ARTICLES_PER_FEED, SOURCE_HTTP_TIMEOUT, SOURCES_OFFLINE, SOURCES_OFFLINE_LATENCY_MS
+from sources.base import SourceAdapter
+
+logger = logging.getLogger(__name__)
+
+# What a failed fetch raises: transport errors, non-2xx statuses, malformed responses
+FETCH_ERRORS = (httpx.HTTPError, ValueError)
+
+_ADAPTER_CLASSES: dict[str, type[SourceAdapter]] = {}
+_adapters: dict[str, SourceAdapter] = {}
+_adapters_lock = threading.Lock()
+_offline_transport = None
+
+
+def register(feed_type: str) -> Callable[[type[SourceAdapter]], type[SourceAdapter]]:
+    """Register a SourceAdapter subclass as the adapter for a feed_type."""
+    def decorate(cls: type[SourceAdapter]) -> type[SourceAdapter]:
+        cls.feed_type = feed_type
+        _ADAPTER_CLASSES[feed_type] = cls
+        return cls
+    return decorate
+
+
+def offline_transport():
+    """The shared FixtureTransport under SOURCES_OFFLINE, else None."""
+    global _offline_transport
+    if SOURCES_OFFLINE and _offline_transport is None:
+        from sources.offline import FixtureTransport
+        _offline_transport = FixtureTransport(latency=SOURCES_OFFLINE_LATENCY_MS / 1000)
+    return _offline_transport
+
+
+def get_adapter(feed_type: str) -> SourceAdapter:
+    """This process's adapter for a feed_type. Raises ValueError for an unknown one."""
+    with _adapters_lock:
+        adapter = _adapters.get(feed_type)
+        if adapter is None:
+            cls = _ADAPTER_CLASSES.get(feed_type)
+            if cls is None:
+                raise ValueError(f"Unknown feed_type: {feed_type!r} (expected one of {sorted(_ADAPTER_CLASSES)})")
+            client = None
+            if transport := offline_transport():
+                client = httpx.Client(transport=transport, timeout=SOURCE_HTTP_TIMEOUT, follow_redirects=True)
+            adapter = _adapters[feed_type] = cls(client)
+        return adapter
+
+
+def _source_stats() -> dict:
+    return {"fetches": 0, "errors": 0, "articles": 0, "fetch_seconds": 0.0, "queued": 0, "in_flight": 0, "peak_in_flight": 0}
+
+
+class FetchScheduler:
+    """
+    Runs feed fetches on a shared thread pool, at most max_concurrency per source.
+
+    Fetches over a source's limit wait in that source's FIFO queue and start as
+    its running fetches finish; the pool has exactly one thread per slot, so a
+    dispatched fetch never waits for a thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._queued: dict[str, deque] = defaultdict(deque)
+        self._stats: dict[str, dict] = defaultdict(_source_stats)
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            workers = sum(cls.max_concurrency for cls in _ADAPTER_CLASSES.values())
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch")
+        return self._executor
+
+    def submit(
+        self,
+        feed: dict,
+        sector_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int = ARTICLES_PER_FEED,
+    ) -> Future:
+        """Queue a fetch; the future resolves to its article list or raises one of FETCH_ERRORS."""
+        future: Future = Future()
+        try:
+            adapter = get_adapter(feed["feed_type"])
+        except ValueError as e:
+            future.set_exception(e)
+            return future
+        with self._lock:
+            self._queued[adapter.feed_type].append((future, adapter, (feed, sector_id, since, until, limit)))
+            self._stats[adapter.feed_type]["queued"] += 1
+            self._dispatch(adapter)
+        return future
+
+    def _dispatch(self, adapter: SourceAdapter) -> None:
+        # Caller holds self._lock
+        queued, stats = self._queued[adapter.feed_type], self._stats[adapter.feed_type]
+        while queued and stats["in_flight"] < adapter.max_concurrency:
+            job = queued.popleft()
+            stats["queued"] -= 1
+            stats["in_flight"] += 1
+            stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+            self._pool().submit(self._run, *job)
+
+    def _run(self, future: Future, adapter: SourceAdapter, args: tuple) -> None:
+        started = time.perf_counter()
+        articles, failed = [], False
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    articles = adapter.fetch(*args)
+                    future.set_result(articles)
+                except BaseException as e:
+                    failed = True
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                stats = self._stats[adapter.feed_type]
+                stats["in_flight"] -= 1
+                stats["fetches"] += 1
+                stats["errors"] += failed
+                stats["articles"] += len(articles)
+                stats["fetch_seconds"] += time.perf_counter() - started
+                self._dispatch(adapter)
+
+    def stats(self) -> dict[str, dict]:
+        """Per-source counters since start: fetches, errors, articles, fetch time, queue depth, concurrency."""
+        with self._lock:
+            return {
+                feed_type: {**s, "fetch_seconds": round(s["fetch_seconds"], 2), "limit": _ADAPTER_CLASSES[feed_type].max_concurrency}
+                for feed_type, s in self._stats.items()
+            }
+
+
+_scheduler = FetchScheduler()
+
+
+def fetch(
+    feed: dict,
+    sector_id: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = ARTICLES_PER_FEED,
+) -> list[dict]:
+    """Fetch one feed through the scheduler, waiting for its turn. Raises one of FETCH_ERRORS."""
+    return _scheduler.submit(feed, sector_id, since, until, limit).result()
+
+
+def fetch_all(
+    feeds: Iterable[dict],
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = ARTICLES_PER_FEED,
+) -> Iterator[tuple[dict, list[dict], Exception | None]]:
+    """Fetch feeds (each with its sector_id) concurrently. Yields (feed, articles, error) as each finishes.
+
+    A failed fetch yields its error (one of FETCH_ERRORS) and no articles; other errors propagate.
+    """
+    pending = {_scheduler.submit(feed, feed["sector_id"], since, until, limit): feed for feed in feeds}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            feed = pending.pop(future)
+            try:
+                yield feed, future.result(), None
+            except FETCH_ERRORS as e:
+                yield feed, [], e
+
+
+def stats() -> dict[str, dict]:
+    return _scheduler.stats()
+
+
+# Adapters register themselves on import
+from sources import einnews, federal_register, google_news  # noqa: E402, F401
+
+__all__ = ["FETCH_ERRORS", "FetchScheduler", "SourceAdapter", "fetch", "fetch_all", "get_adapter", "register", "stats"]
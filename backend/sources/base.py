@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+
+import httpx
+
+from config import SOURCE_HTTP_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class SourceAdapter(ABC):
+    """
+    One kind of sector_feeds row (its feed_type): how to page through what the
+    source has for a feed and turn each item into an article dict.
+
+    Article dicts are what sector_articles stores: sector_id, feed_id, title,
+    url, source, published_at (ISO-8601 or None).
+
+    Class attributes set the source's politeness limits, enforced by the fetch
+    scheduler and by get() respectively:
+    - max_concurrency: fetches of this source in flight at once, process-wide
+    - min_interval: seconds between the starts of two requests to the source
+
+    dated_by_day marks a source whose publication times are whole days
+    (midnight UTC): the [since, until) window is then applied to dates, the
+    way such a source's API filters.
+    """
+
+    feed_type: str
+    max_concurrency: int = 2
+    min_interval: float = 0.0
+    dated_by_day: bool = False
+
+    def __init__(self, client: httpx.Client | None = None):
+        self._client = client
+        self._throttle_lock = threading.Lock()
+        self._next_request = 0.0
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(timeout=SOURCE_HTTP_TIMEOUT, follow_redirects=True)
+        return self._client
+
+    def get(self, url: str, params: dict | list | None = None) -> httpx.Response:
+        """Rate-limited GET; raises httpx.HTTPError on transport errors and non-2xx statuses."""
+        with self._throttle_lock:
+            wait = self._next_request - time.monotonic()
+            self._next_request = max(self._next_request, time.monotonic()) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+        resp = self.client.get(url, params=params)
+        resp.raise_for_status()
+        return resp
+
+    @abstractmethod
+    def pages(
+        self, feed: dict, since: datetime | None, until: datetime | None, limit: int
+    ) -> Iterator[list]:
+        """Raw items, one list per page, newest first. Stops when the source runs out."""
+
+    @abstractmethod
+    def normalize(self, item, feed: dict, sector_id: str) -> dict | None:
+        """Article dict for a raw item, or None to drop it (no title or link)."""
+
+    def fetch(
+        self,
+        feed: dict,
+        sector_id: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int = 10,
+    ) -> list[dict]:
+        """Up to limit articles published in [since, until) (or undated), paging as needed.
+
+        Raises httpx.HTTPError, or ValueError on a malformed response.
+        """
+        articles: list[dict] = []
+        for page in self.pages(feed, since, until, limit):
+            for item in page:
+                article = self.normalize(item, feed, sector_id)
+                if article is None or not _in_window(article, since, until, self.dated_by_day):
+                    continue
+                articles.append(article)
+                if len(articles) >= limit:
+                    return articles
+        return articles
+
+
+def _in_window(article: dict, since: datetime | None, until: datetime | None, by_day: bool = False) -> bool:
+    if not article.get("published_at"):
+        logger.debug(f"Article has no published_at, keeping: {article['title'][:80]}")
+        return True
+    try:
+        published = datetime.fromisoformat(article["published_at"])
+    except (ValueError, TypeError):
+        return True
+    if by_day:
+        # Every day the window touches; until is exclusive
+        day = published.date()
+        return (since is None or day >= since.date()) and (
+            until is None or day <= (until - timedelta(microseconds=1)).date()
+        )
+    return (since is None or published >= since) and (until is None or published < until)
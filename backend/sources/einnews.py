@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from config import EINNEWS_RSS_URL
+from sources import register
+from sources.rss import RSSAdapter
+
+
+@register("einnews")
+class EINNewsAdapter(RSSAdapter):
+    """
+    EINNews industry RSS. feed["query"] is the feed URL
+    (https://technology.einnews.com/all_rss) or just the industry (technology).
+
+    The feed only carries the latest entries and has no date parameters, so a
+    past window gets whatever of it is still in the feed.
+    """
+
+    max_concurrency = 2
+    min_interval = 1.0
+
+    def feed_url(self, feed: dict, since: datetime | None, until: datetime | None) -> str:
+        query = feed["query"].strip()
+        if "://" in query:
+            return query
+        return EINNEWS_RSS_URL.format(industry=query)
@@ -0,0 +1,103 @@
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl
+
+from config import FEDERAL_REGISTER_API_URL, FEDERAL_REGISTER_MAX_PAGES, FEDERAL_REGISTER_PER_PAGE
+from sources import register
+from sources.base import SourceAdapter
+
+# Agency abbreviations used in feed queries -> Federal Register agency slugs
+AGENCY_SLUGS = {
+    "FDA": "food-and-drug-administration",
+    "HHS": "health-and-human-services-department",
+    "CMS": "centers-for-medicare-medicaid-services",
+    "SEC": "securities-and-exchange-commission",
+    "FDIC": "federal-deposit-insurance-corporation",
+    "OCC": "comptroller-of-the-currency",
+    "CFPB": "consumer-financial-protection-bureau",
+    "EPA": "environmental-protection-agency",
+    "DOE": "energy-department",
+    "FERC": "federal-energy-regulatory-commission",
+    "FCC": "federal-communications-commission",
+    "FTC": "federal-trade-commission",
+    "DOJ": "justice-department",
+    "DOT": "transportation-department",
+    "DOD": "defense-department",
+    "BIS": "industry-and-security-bureau",
+}
+
+DOCUMENT_TYPES = {"rule": "RULE", "proposed_rule": "PRORULE", "notice": "NOTICE", "presidential": "PRESDOCU"}
+
+_FIELDS = ("title", "html_url", "publication_date", "type", "agencies")
+
+
+@register("federal_register")
+class FederalRegisterAdapter(SourceAdapter):
+    """
+    Federal Register documents API, newest first, following next_page_url.
+
+    feed["query"] is a query string of conditions:
+        agency=FDA,HHS,CMS                  abbreviations (AGENCY_SLUGS) or agency slugs
+        agency=SEC&type=rule,proposed_rule  document types (DOCUMENT_TYPES)
+        agency=EPA&term=emissions           full-text search term
+    """
+
+    max_concurrency = 4
+    min_interval = 0.2
+    dated_by_day = True  # publication_date has no time
+
+    def params(self, feed: dict, since: datetime | None, until: datetime | None, limit: int) -> list[tuple[str, str]]:
+        params = [("order", "newest"), ("per_page", str(min(limit, FEDERAL_REGISTER_PER_PAGE)))]
+        params += [("fields[]", f) for f in _FIELDS]
+        for key, value in parse_qsl(feed["query"]):
+            values = [v.strip() for v in value.split(",") if v.strip()]
+            if key in ("agency", "agencies"):
+                params += [("conditions[agencies][]", AGENCY_SLUGS.get(v.upper(), v.lower())) for v in values]
+            elif key == "type":
+                params += [("conditions[type][]", DOCUMENT_TYPES.get(v.lower(), v.upper())) for v in values]
+            elif key == "term":
+                params.append(("conditions[term]", value))
+            else:
+                raise ValueError(f"Unknown federal_register condition {key!r} in feed {feed['id']}")
+        # Publication dates are whole days; until is exclusive
+        if since is not None:
+            params.append(("conditions[publication_date][gte]", since.date().isoformat()))
+        if until is not None:
+            params.append(("conditions[publication_date][lte]", (until - timedelta(microseconds=1)).date().isoformat()))
+        return params
+
+    def pages(self, feed: dict, since: datetime | None, until: datetime | None, limit: int) -> Iterator[list]:
+        url, params = FEDERAL_REGISTER_API_URL, self.params(feed, since, until, limit)
+        for _ in range(FEDERAL_REGISTER_MAX_PAGES):
+            body = self.get(url, params=params).json()
+            yield body.get("results") or []
+            url, params = body.get("next_page_url"), None
+            if not url:
+                return
+
+    def normalize(self, doc: dict, feed: dict, sector_id: str) -> dict | None:
+        title = (doc.get("title") or "").strip()
+        link = (doc.get("html_url") or "").strip()
+        if not title or not link:
+            return None
+
+        published_at = None
+        if doc.get("publication_date"):
+            published_at = datetime.fromisoformat(doc["publication_date"]).replace(tzinfo=timezone.utc).isoformat()
+        agencies = [a["name"] for a in doc.get("agencies") or [] if a.get("name")]
+        # The document type ("Proposed Rule: ...") tells the classifier what kind of action it is
+        if doc.get("type"):
+            title = f"{doc['type']}: {title}"
+        # The agency goes in the title, like a news headline's publisher; source stays the
+        # Federal Register so RANKING_SOURCE_WEIGHTS applies to every document
+        if agencies:
+            title = f"{title} - {agencies[0]}"
+
+        return {
+            "sector_id": sector_id,
+            "feed_id": feed["id"],
+            "title": title,
+            "url": link,
+            "source": "Federal Register",
+            "published_at": published_at,
+        }
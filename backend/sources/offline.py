@@ -0,0 +1,152 @@
+"""
+Fixture-backed local stand-ins for every source (SOURCES_OFFLINE=1).
+
+FixtureTransport answers the requests the adapters make with responses built
+from sources/fixtures/*.json, in each source's wire format: RSS for Google
+News and EINNews, the paginated JSON API for the Federal Register. Item dates
+are stored as ages and stamped relative to the requested window (or now), so
+date filters and backfill windows behave as they would live. Links carry a
+short hash of the feed's query, so different feeds return different articles
+the way different searches do.
+
+An optional per-request latency stands in for the network, which makes the
+fetch scheduler's concurrency and each source's throughput measurable offline
+(benchmarks/bench_sources.py).
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from functools import cache
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import httpx
+
+_FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+@cache
+def _fixture(name: str) -> dict:
+    return json.loads((_FIXTURES / f"{name}.json").read_text())
+
+
+def _variant(key: str) -> str:
+    return hashlib.sha1(key.encode()).hexdigest()[:8]
+
+
+def _rss(items: list[dict]) -> str:
+    entries = "".join(
+        f"<item><title>{escape(i['title'])}</title><link>{escape(i['link'])}</link>"
+        f"<pubDate>{format_datetime(i['published'])}</pubDate>"
+        + (f"<source url=\"https://www.einnews.com\">{escape(i['source'])}</source>" if i.get("source") else "")
+        + "</item>"
+        for i in items
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>fixture</title>{entries}</channel></rss>'
+
+
+class FixtureTransport(httpx.BaseTransport):
+    """httpx transport serving fixture responses, with per-host request counts and peak concurrency."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, int] = defaultdict(int)
+        self.requests: dict[str, int] = defaultdict(int)
+        self.peak_in_flight: dict[str, int] = defaultdict(int)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        with self._lock:
+            self._in_flight[host] += 1
+            self.requests[host] += 1
+            self.peak_in_flight[host] = max(self.peak_in_flight[host], self._in_flight[host])
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if host == "news.google.com":
+                return self._google_news(request)
+            if host.endswith(".einnews.com"):
+                return self._einnews(request)
+            if host == "www.federalregister.gov":
+                return self._federal_register(request)
+            return httpx.Response(404, request=request)
+        finally:
+            with self._lock:
+                self._in_flight[host] -= 1
+
+    def _google_news(self, request: httpx.Request) -> httpx.Response:
+        q = request.url.params.get("q", "")
+        before = re.search(r"before:(\d{4}-\d{2}-\d{2})", q)
+        end = (
+            datetime.combine(date.fromisoformat(before.group(1)), datetime.min.time(), tzinfo=timezone.utc)
+            if before else datetime.now(timezone.utc)
+        )
+        variant = _variant(re.sub(r"\s*(when|after|before):\S+", "", q))
+        items = [
+            {
+                "title": i["title"],
+                "link": f"{i['link']}-{variant}-{(end - timedelta(hours=i['age_hours'])):%Y%m%d}",
+                "published": end - timedelta(hours=i["age_hours"]),
+            }
+            for i in _fixture("google_news")["items"]
+        ]
+        return httpx.Response(200, text=_rss(items), request=request)
+
+    def _einnews(self, request: httpx.Request) -> httpx.Response:
+        now = datetime.now(timezone.utc)
+        variant = _variant(request.url.host)
+        items = [
+            {
+                "title": i["title"],
+                "link": f"{i['link']}-{variant}",
+                "source": i["source"],
+                "published": now - timedelta(hours=i["age_hours"]),
+            }
+            for i in _fixture("einnews")["items"]
+        ]
+        return httpx.Response(200, text=_rss(items), request=request)
+
+    def _federal_register(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        agencies = set(params.get_list("conditions[agencies][]"))
+        types = set(params.get_list("conditions[type][]"))
+        term = params.get("conditions[term]", "").lower()
+        lte = params.get("conditions[publication_date][lte]")
+        gte = params.get("conditions[publication_date][gte]")
+        end = date.fromisoformat(lte) if lte else datetime.now(timezone.utc).date()
+        start = date.fromisoformat(gte) if gte else None
+
+        docs = []
+        for doc in _fixture("federal_register")["results"]:
+            published = end - timedelta(days=doc["age_days"])
+            if agencies and not agencies & {a["slug"] for a in doc["agencies"]}:
+                continue
+            if (types and doc["type_code"] not in types) or (term and term not in doc["title"].lower()):
+                continue
+            if start and published < start:
+                continue
+            docs.append({
+                "title": doc["title"],
+                "type": doc["type"],
+                "html_url": f"{doc['html_url']}-{published:%Y%m%d}",
+                "publication_date": published.isoformat(),
+                "agencies": [{"name": a["name"]} for a in doc["agencies"]],
+            })
+
+        per_page = int(params.get("per_page", "20"))
+        page = int(params.get("page", "1"))
+        body = {
+            "count": len(docs),
+            "total_pages": -(-len(docs) // per_page),
+            "results": docs[(page - 1) * per_page : page * per_page],
+        }
+        if page * per_page < len(docs):
+            body["next_page_url"] = str(request.url.copy_set_param("page", str(page + 1)))
+        return httpx.Response(200, json=body, request=request)
@@ -0,0 +1,45 @@
+from abc import abstractmethod
+from collections.abc import Iterator
+from datetime import datetime, timezone
+
+import feedparser
+
+from sources.base import SourceAdapter
+
+
+class RSSAdapter(SourceAdapter):
+    """An RSS source with no pagination: one request returns the feed's latest entries."""
+
+    @abstractmethod
+    def feed_url(self, feed: dict, since: datetime | None, until: datetime | None) -> str:
+        """The feed's URL for the [since, until) window."""
+
+    def pages(self, feed: dict, since: datetime | None, until: datetime | None, limit: int) -> Iterator[list]:
+        resp = self.get(self.feed_url(feed, since, until))
+        yield feedparser.parse(resp.text).entries
+
+    def source_name(self, entry, title: str) -> str | None:
+        source = entry.get("source")
+        return source.get("title") if source else None
+
+    def normalize(self, entry, feed: dict, sector_id: str) -> dict | None:
+        title = entry.get("title", "").strip()
+        link = entry.get("link", "").strip()
+        if not title or not link:
+            return None
+
+        published_at = None
+        if entry.get("published_parsed"):
+            try:
+                published_at = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc).isoformat()
+            except (ValueError, TypeError):
+                pass
+
+        return {
+            "sector_id": sector_id,
+            "feed_id": feed["id"],
+            "title": title,
+            "url": link,
+            "source": self.source_name(entry, title),
+            "published_at": published_at,
+        }
@@ -0,0 +1,25 @@
+"""
+Storage backends behind the db module.
+
+- supabase: hosted Postgres via PostgREST (default)
+- sqlite: embedded single-file database with the schema.sql tables, indexes,
+  rollup trigger and an FTS5 search index
+
+Backends are imported lazily so the SQLite path never loads the Supabase client.
+"""
+
+from storage.base import StorageBackend
+
+
+def create_backend(name: str) -> StorageBackend:
+    if name == "supabase":
+        from storage.supabase_backend import SupabaseBackend
+        return SupabaseBackend()
+    if name == "sqlite":
+        from config import SQLITE_PATH
+        from storage.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(SQLITE_PATH)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {name!r} (expected 'supabase' or 'sqlite')")
+
+
+__all__ = ["StorageBackend", "create_backend"]
@@ -0,0 +1,205 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+
+
+class StorageBackend(ABC):
+    """
+    Everything the API and pipeline read or write, independent of where it lives.
+
+    Rows are plain dicts shaped like the PostgREST responses the app was built
+    against: signals embed their article under "sector_articles", active feeds
+    embed their sector under "sectors", timestamps are ISO-8601 strings.
+    """
+
+    name: str
+
+    def stats(self) -> dict:
+        """Backend-specific runtime stats (connection pool, etc.)."""
+        return {}
+
+    # --- Sectors ---
+
+    @abstractmethod
+    def get_sectors(self) -> list[dict]: ...
+
+    @abstractmethod
+    def get_sector(self, sector_id: str) -> dict | None: ...
+
+    # --- Sector Feeds ---
+
+    @abstractmethod
+    def get_sector_feeds(self, sector_id: str) -> list[dict]: ...
+
+    @abstractmethod
+    def get_all_active_feeds(self) -> list[dict]: ...
+
+    # --- Feed Schedule ---
+
+    @abstractmethod
+    def get_feed_schedules(self) -> list[dict]: ...
+
+    @abstractmethod
+    def upsert_feed_schedule(self, schedule: dict) -> None:
+        """Insert or replace the feed_schedule row for schedule["feed_id"]."""
+
+    # --- Sector Articles ---
+
+    @abstractmethod
+    def get_existing_urls(self, urls: list[str]) -> set[str]: ...
+
+    @abstractmethod
+    def insert_articles(self, articles: list[dict]) -> list[dict]:
+        """Insert articles, skipping duplicate URLs. Returns only the rows actually inserted."""
+
+    @abstractmethod
+    def get_sector_articles(self, sector_id: str, since: str) -> list[dict]: ...
+
+    @abstractmethod
+    def get_unclassified_articles(self, sector_id: str) -> list[dict]:
+        """Articles for a sector that have no signal yet (interrupted classification)."""
+
+    # --- Sector Signals ---
+
+    @abstractmethod
+    def insert_signals(self, signals: list[dict]) -> list[dict]: ...
+
+    @abstractmethod
+    def get_sector_signals(
+        self,
+        sector_id: str,
+        since: str,
+        signal_type: str | None,
+        sentiment: str | None,
+        min_relevance: float,
+    ) -> list[dict]: ...
+
+    @abstractmethod
+    def get_all_signals(
+        self,
+        since: str,
+        sector_id: str | None,
+        signal_type: str | None,
+        sentiment: str | None,
+        min_relevance: float,
+        limit: int,
+    ) -> list[dict]: ...
+
+    @abstractmethod
+    def iter_signals(
+        self,
+        since: str,
+        sector_id: str | None,
+        signal_type: str | None,
+        sentiment: str | None,
+        min_relevance: float,
+        chunk_size: int,
+    ) -> Iterator[list[dict]]:
+        """Yield matching signals newest first, keyset-paginated in chunks."""
+
+    @abstractmethod
+    def search_signals(
+        self,
+        query: str,
+        since: str,
+        sector_id: str | None,
+        signal_type: str | None,
+        sentiment: str | None,
+        min_relevance: float,
+        limit: int,
+    ) -> list[dict]: ...
+
+    @abstractmethod
+    def get_signals_since(self, since: str) -> list[dict]: ...
+
+    # --- Signal Rollups ---
+
+    @abstractmethod
+    def get_signal_rollup(self, since_day: str, sector_id: str | None) -> list[dict]: ...
+
+    # --- Sector Financials ---
+
+    @abstractmethod
+    def upsert_sector_financials(self, sector_id: str, financials: dict) -> dict: ...
+
+    @abstractmethod
+    def get_all_financials(self) -> list[dict]: ...
+
+    @abstractmethod
+    def get_sector_financials(self, sector_id: str) -> dict | None: ...
+
+    # --- Sector Narratives ---
+
+    @abstractmethod
+    def insert_narrative(self, narrative: dict) -> dict: ...
+
+    @abstractmethod
+    def get_latest_narrative(self, sector_id: str) -> dict | None: ...
+
+    @abstractmethod
+    def get_all_latest_narratives(self) -> dict[str, dict]: ...
+
+    @abstractmethod
+    def clear_pipeline_data(self) -> dict: ...
+
+    # --- Pipeline Runs ---
+
+    @abstractmethod
+    def create_pipeline_run(self) -> dict: ...
+
+    @abstractmethod
+    def update_pipeline_run(
+        self, run_id: str, status: str, result: dict | None, error: str | None
+    ) -> dict: ...
+
+    @abstractmethod
+    def get_latest_pipeline_run(self) -> dict | None: ...
+
+    @abstractmethod
+    def save_checkpoint(self, run_id: str, unit: str, stage: str, stats: dict) -> None:
+        """Record that `unit` finished `stage` in this run. Idempotent."""
+
+    @abstractmethod
+    def get_checkpoints(self, run_id: str) -> list[dict]: ...
+
+    # --- Work Queue ---
+
+    @abstractmethod
+    def enqueue_tasks(self, run_id: str, kind: str, units: list[str], max_attempts: int) -> None:
+        """Queue one task per unit. Idempotent: existing tasks are kept, failed ones go back to pending."""
+
+    @abstractmethod
+    def claim_task(self, worker_id: str, lease_seconds: int, run_id: str | None) -> dict | None:
+        """Lease the oldest pending (or lease-expired) task. None when there is nothing to do."""
+
+    @abstractmethod
+    def renew_task_lease(self, task_id: str, worker_id: str, lease_seconds: int) -> bool:
+        """Extend a lease this worker holds. False if the lease was lost to another worker."""
+
+    @abstractmethod
+    def complete_task(self, task_id: str, worker_id: str, result: dict) -> bool: ...
+
+    @abstractmethod
+    def fail_task(self, task_id: str, worker_id: str, error: str, retry: bool) -> None: ...
+
+    @abstractmethod
+    def get_tasks(self, run_id: str, kind: str) -> list[dict]: ...
+
+    # --- Backfill ---
+
+    @abstractmethod
+    def get_backfill_windows(self) -> list[dict]: ...
+
+    @abstractmethod
+    def save_backfill_window(
+        self, window_start: str, window_end: str, status: str, stats: dict | None
+    ) -> None:
+        """Insert or update a window's row; finished_at is stamped unless status is running."""
+
+    # --- Usage Ledger ---
+
+    @abstractmethod
+    def insert_usage(self, rows: list[dict]) -> None: ...
+
+    @abstractmethod
+    def get_usage(self, run_id: str | None, since: str | None) -> list[dict]:
+        """Ledger rows for one run and/or created since a timestamp, oldest first."""
@@ -0,0 +1,877 @@
+"""
+Embedded SQLite backend.
+
+Mirrors schema.sql: the same tables, columns, uniqueness rules and indexes, the
+sector_signal_daily rollup trigger, and an FTS5 table standing in for the
+tsvector/GIN search. seed.sql runs unchanged on first open. UUIDs and
+timestamps are TEXT (ISO-8601 UTC) and array columns are JSON, so rows come
+back shaped exactly like the Supabase backend's.
+
+Each thread gets its own connection. WAL mode lets API reads proceed while the
+pipeline writes.
+"""
+
+import html
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from storage.base import StorageBackend
+
+_SEED_PATH = Path(__file__).resolve().parents[2] / "seed.sql"
+
+_UUID_SQL = (
+    "(lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' || substr(hex(randomblob(2)), 2)"
+    " || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) || substr(hex(randomblob(2)), 2)"
+    " || '-' || hex(randomblob(6))))"
+)
+_NOW_SQL = "(strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sectors (
+    id TEXT PRIMARY KEY DEFAULT {UUID},
+    name TEXT UNIQUE NOT NULL,
+    gics_code TEXT UNIQUE NOT NULL,
+    etf_ticker TEXT NOT NULL,
+    description TEXT,
+    created_at TEXT DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS sector_feeds (
+    id TEXT PRIMARY KEY DEFAULT {UUID},
+    sector_id TEXT REFERENCES sectors(id) ON DELETE CASCADE,
+    feed_type TEXT NOT NULL,
+    query TEXT NOT NULL,
+    active BOOLEAN DEFAULT TRUE,
+    created_at TEXT DEFAULT {NOW}
+);
+
+CREATE INDEX IF NOT EXISTS idx_sector_feeds_sector ON sector_feeds(sector_id, active);
+
+CREATE TABLE IF NOT EXISTS feed_schedule (
+    feed_id TEXT PRIMARY KEY REFERENCES sector_feeds(id) ON DELETE CASCADE,
+    interval_seconds INTEGER NOT NULL,
+    next_run_at TEXT NOT NULL,
+    yield_ewma REAL,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    last_run_at TEXT,
+    last_new INTEGER,
+    last_error TEXT,
+    updated_at TEXT DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS sector_articles (
+    id TEXT PRIMARY KEY DEFAULT {UUID},
+    sector_id TEXT REFERENCES sectors(id) ON DELETE CASCADE,
+    feed_id TEXT REFERENCES sector_feeds(id) ON DELETE SET NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    source TEXT,
+    published_at TEXT,
+    fetched_at TEXT DEFAULT {NOW}
+);
+
+CREATE INDEX IF NOT EXISTS idx_sector_articles_sector ON sector_articles(sector_id, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_sector_articles_published ON sector_articles(published_at DESC);
+
+CREATE TABLE IF NOT EXISTS sector_signals (
+    id TEXT PRIMARY KEY DEFAULT {UUID},
+    article_id TEXT REFERENCES sector_articles(id) ON DELETE CASCADE,
+    sector_id TEXT REFERENCES sectors(id) ON DELETE CASCADE,
+    summary TEXT,
+    signal_type TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    ir_relevance REAL DEFAULT 0.5,
+    created_at TEXT DEFAULT {NOW}
+);
+
+CREATE INDEX IF NOT EXISTS idx_sector_signals_sector ON sector_signals(sector_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_sector_signals_type ON sector_signals(signal_type);
+CREATE INDEX IF NOT EXISTS idx_sector_signals_created ON sector_signals(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sector_signals_relevance ON sector_signals(ir_relevance);
+CREATE INDEX IF NOT EXISTS idx_sector_signals_article ON sector_signals(article_id);
+
+CREATE TABLE IF NOT EXISTS sector_signal_daily (
+    sector_id TEXT REFERENCES sectors(id) ON DELETE CASCADE,
+    day TEXT NOT NULL,
+    signal_type TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    signal_count INTEGER NOT NULL DEFAULT 0,
+    relevance_sum REAL NOT NULL DEFAULT 0,
+    avg_relevance REAL GENERATED ALWAYS AS (relevance_sum / NULLIF(signal_count, 0)) STORED,
+    PRIMARY KEY (sector_id, day, signal_type, sentiment)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sector_signal_daily_day ON sector_signal_daily(day DESC);
+
+CREATE TABLE IF NOT EXISTS sector_signal_rollup_keys (
+    sector_id TEXT REFERENCES sectors(id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    PRIMARY KEY (sector_id, url)
+);
+
+CREATE TABLE IF NOT EXISTS sector_financials (
+    sector_id TEXT PRIMARY KEY REFERENCES sectors(id) ON DELETE CASCADE,
+    etf_price REAL,
+    price_change_7d REAL,
+    price_change_30d REAL,
+    price_change_ytd REAL,
+    vs_spy_7d REAL,
+    vs_spy_30d REAL,
+    volume_avg_30d INTEGER,
+    updated_at TEXT DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS sector_narratives (
+    id TEXT PRIMARY KEY DEFAULT {UUID},
+    sector_id TEXT REFERENCES sectors(id) ON DELETE CASCADE,
+    summary_short TEXT,
+    summary_full TEXT,
+    key_themes TEXT,
+    ir_talking_points TEXT,
+    sentiment TEXT,
+    signal_count INTEGER,
+    input_fingerprint TEXT,
+    input_financials TEXT,
+    created_at TEXT DEFAULT {NOW}
+);
+
+CREATE INDEX IF NOT EXISTS idx_sector_narratives_sector ON sector_narratives(sector_id, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    id TEXT PRIMARY KEY DEFAULT {UUID},
+    status TEXT NOT NULL DEFAULT 'running',
+    error TEXT,
+    result TEXT,
+    started_at TEXT DEFAULT {NOW},
+    finished_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_started ON pipeline_runs(started_at DESC);
+
+CREATE TABLE IF NOT EXISTS pipeline_checkpoints (
+    run_id TEXT REFERENCES pipeline_runs(id) ON DELETE CASCADE,
+    unit TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    stats TEXT,
+    created_at TEXT DEFAULT {NOW},
+    PRIMARY KEY (run_id, unit, stage)
+);
+
+CREATE TABLE IF NOT EXISTS pipeline_tasks (
+    id TEXT PRIMARY KEY DEFAULT {UUID},
+    run_id TEXT REFERENCES pipeline_runs(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    lease_owner TEXT,
+    lease_expires_at TEXT,
+    result TEXT,
+    error TEXT,
+    created_at TEXT DEFAULT {NOW},
+    updated_at TEXT DEFAULT {NOW},
+    UNIQUE (run_id, kind, unit)
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_tasks_claimable ON pipeline_tasks(status, created_at)
+    WHERE status IN ('pending', 'leased');
+
+CREATE TABLE IF NOT EXISTS llm_usage (
+    id TEXT PRIMARY KEY DEFAULT {UUID},
+    run_id TEXT REFERENCES pipeline_runs(id) ON DELETE SET NULL,
+    stage TEXT NOT NULL,
+    sector_id TEXT REFERENCES sectors(id) ON DELETE CASCADE,
+    feed_id TEXT REFERENCES sector_feeds(id) ON DELETE SET NULL,
+    model TEXT,
+    calls INTEGER NOT NULL DEFAULT 1,
+    cached INTEGER NOT NULL DEFAULT 0,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_write_tokens INTEGER NOT NULL DEFAULT 0,
+    articles INTEGER NOT NULL DEFAULT 0,
+    signals INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT DEFAULT {NOW}
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_usage_run ON llm_usage(run_id);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_created ON llm_usage(created_at DESC);
+
+CREATE TABLE IF NOT EXISTS backfill_windows (
+    window_start TEXT NOT NULL,
+    window_end TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    stats TEXT,
+    started_at TEXT DEFAULT {NOW},
+    finished_at TEXT,
+    PRIMARY KEY (window_start, window_end)
+);
+
+-- Row-level version of schema.sql's rollup trigger. changes() tells us whether
+-- the URL was new to the rollup (INSERT OR IGNORE inserted a key row).
+CREATE TRIGGER IF NOT EXISTS trg_sector_signals_rollup
+AFTER INSERT ON sector_signals
+WHEN NEW.sector_id IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO sector_signal_rollup_keys (sector_id, url)
+    SELECT NEW.sector_id, a.url FROM sector_articles a WHERE a.id = NEW.article_id;
+
+    INSERT INTO sector_signal_daily (sector_id, day, signal_type, sentiment, signal_count, relevance_sum)
+    SELECT NEW.sector_id, substr(COALESCE(a.published_at, NEW.created_at), 1, 10),
+           NEW.signal_type, NEW.sentiment, 1, COALESCE(NEW.ir_relevance, 0)
+    FROM sector_articles a
+    WHERE a.id = NEW.article_id AND changes() = 1
+    ON CONFLICT (sector_id, day, signal_type, sentiment) DO UPDATE
+    SET signal_count = signal_count + excluded.signal_count,
+        relevance_sum = relevance_sum + excluded.relevance_sum;
+END;
+
+-- Full-text index over summary + headline, keyed by sector_signals.rowid
+-- (stable: the app never VACUUMs).
+CREATE VIRTUAL TABLE IF NOT EXISTS signal_fts USING fts5(summary, title, tokenize = 'porter unicode61');
+
+CREATE TRIGGER IF NOT EXISTS trg_sector_signals_fts_insert
+AFTER INSERT ON sector_signals
+BEGIN
+    INSERT INTO signal_fts (rowid, summary, title)
+    VALUES (
+        NEW.rowid,
+        COALESCE(NEW.summary, ''),
+        COALESCE((SELECT title FROM sector_articles WHERE id = NEW.article_id), '')
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sector_signals_fts_delete
+AFTER DELETE ON sector_signals
+BEGIN
+    DELETE FROM signal_fts WHERE rowid = OLD.rowid;
+END;
+""".replace("{UUID}", _UUID_SQL).replace("{NOW}", _NOW_SQL)
+
+# Columns added to existing tables after their first release: (table, column, declaration)
+_ADDED_COLUMNS = [
+    ("sector_narratives", "input_fingerprint", "TEXT"),
+    ("sector_narratives", "input_financials", "TEXT"),
+]
+
+_ARTICLE_COLUMNS = ["id", "sector_id", "feed_id", "title", "url", "source", "published_at", "fetched_at"]
+_SIGNAL_COLUMNS = ["id", "article_id", "sector_id", "summary", "signal_type", "sentiment", "ir_relevance", "created_at"]
+_FINANCIAL_COLUMNS = {
+    "etf_price", "price_change_7d", "price_change_30d", "price_change_ytd",
+    "vs_spy_7d", "vs_spy_30d", "volume_avg_30d",
+}
+_NARRATIVE_COLUMNS = [
+    "id", "sector_id", "summary_short", "summary_full", "key_themes",
+    "ir_talking_points", "sentiment", "signal_count", "input_fingerprint",
+    "input_financials", "created_at",
+]
+_NARRATIVE_JSON_COLUMNS = {"key_themes", "ir_talking_points", "input_financials"}
+_USAGE_COLUMNS = [
+    "run_id", "stage", "sector_id", "feed_id", "model", "calls", "cached", "input_tokens", "output_tokens",
+    "cache_read_tokens", "cache_write_tokens", "articles", "signals",
+]
+_FEED_SCHEDULE_COLUMNS = {
+    "feed_id", "interval_seconds", "next_run_at", "yield_ewma",
+    "consecutive_failures", "last_run_at", "last_new", "last_error",
+}
+
+_SIGNAL_SELECT = """
+    SELECT s.id, s.article_id, s.sector_id, s.summary, s.signal_type, s.sentiment,
+           s.ir_relevance, s.created_at,
+           a.title AS a_title, a.url AS a_url, a.source AS a_source, a.published_at AS a_published_at
+    FROM sector_signals s
+    LEFT JOIN sector_articles a ON a.id = s.article_id
+"""
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 32766; stay well under it
+_IN_CHUNK = 500
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _signal_row(row: sqlite3.Row) -> dict:
+    """Flat join row -> PostgREST-style signal with embedded sector_articles."""
+    data = dict(row)
+    article = {
+        "title": data.pop("a_title"),
+        "url": data.pop("a_url"),
+        "source": data.pop("a_source"),
+        "published_at": data.pop("a_published_at"),
+    }
+    data["sector_articles"] = article if article["url"] is not None else None
+    return data
+
+
+def _narrative_row(row: sqlite3.Row) -> dict:
+    data = dict(row)
+    for col in _NARRATIVE_JSON_COLUMNS:
+        if data.get(col) is not None:
+            data[col] = json.loads(data[col])
+    return data
+
+
+def _result_row(row: sqlite3.Row) -> dict:
+    """pipeline_runs / pipeline_tasks row with its JSON result decoded."""
+    data = dict(row)
+    if data.get("result") is not None:
+        data["result"] = json.loads(data["result"])
+    return data
+
+
+def _lease_expiry(lease_seconds: int) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)).isoformat(timespec="microseconds")
+
+
+def _feed_row(row: sqlite3.Row) -> dict:
+    data = dict(row)
+    data["active"] = bool(data["active"])
+    return data
+
+
+def _signal_filters(sector_id, signal_type, sentiment) -> tuple[str, list]:
+    clauses, params = [], []
+    if sector_id:
+        clauses.append("s.sector_id = ?")
+        params.append(sector_id)
+    if signal_type:
+        clauses.append("s.signal_type = ?")
+        params.append(signal_type)
+    if sentiment:
+        clauses.append("s.sentiment = ?")
+        params.append(sentiment)
+    return "".join(f" AND {c}" for c in clauses), params
+
+
+def _html_highlight(text: str | None) -> str:
+    """FTS5 highlight() output (matches between chr(2)/chr(3)) as escaped HTML with <mark> tags."""
+    return html.escape(text or "").replace("\x02", "<mark>").replace("\x03", "</mark>")
+
+
+def _fts_query(query: str) -> str | None:
+    """websearch-style query -> FTS5 MATCH expression (terms AND, `or` alternates, `-term` excludes)."""
+    groups: list[list[str]] = [[]]
+    excluded: list[str] = []
+
+    def quote(term: str) -> str:
+        return '"' + term.replace('"', '""') + '"'
+
+    for raw in query.replace('"', " ").split():
+        if raw.lower() == "or":
+            if groups[-1]:
+                groups.append([])
+        elif raw.startswith("-") and len(raw) > 1:
+            excluded.append(quote(raw[1:]))
+        else:
+            groups[-1].append(quote(raw))
+
+    groups = [g for g in groups if g]
+    if not groups:
+        return None
+    expr = " OR ".join(f"({' AND '.join(g)})" for g in groups)
+    if excluded:
+        expr = f"({expr}) NOT ({' OR '.join(excluded)})"
+    return expr
+
+
+class SQLiteBackend(StorageBackend):
+    """Single-file embedded database for running the pipeline and API on one box."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        self._add_missing_columns(conn)
+        if conn.execute("SELECT COUNT(*) FROM sectors").fetchone()[0] == 0 and _SEED_PATH.exists():
+            # seed.sql is portable SQL: defaults fill ids/timestamps, subselects resolve sector ids
+            conn.executescript(_SEED_PATH.read_text())
+
+    @staticmethod
+    def _add_missing_columns(conn: sqlite3.Connection) -> None:
+        """Bring a database file created by an older _SCHEMA up to date (CREATE IF NOT EXISTS won't)."""
+        for table, column, decl in _ADDED_COLUMNS:
+            existing = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute("PRAGMA cache_size = -65536")  # 64 MB page cache per connection
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _tx(self):
+        """Write transaction. IMMEDIATE takes the write lock up front, so concurrent writers wait, not deadlock."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _query(self, sql: str, params=()) -> list[sqlite3.Row]:
+        return self._conn().execute(sql, params).fetchall()
+
+    # --- Sectors ---
+
+    def get_sectors(self) -> list[dict]:
+        return [dict(r) for r in self._query("SELECT * FROM sectors")]
+
+    def get_sector(self, sector_id: str) -> dict | None:
+        rows = self._query("SELECT * FROM sectors WHERE id = ?", (sector_id,))
+        return dict(rows[0]) if rows else None
+
+    # --- Sector Feeds ---
+
+    def get_sector_feeds(self, sector_id: str) -> list[dict]:
+        rows = self._query("SELECT * FROM sector_feeds WHERE sector_id = ? AND active", (sector_id,))
+        return [_feed_row(r) for r in rows]
+
+    def get_all_active_feeds(self) -> list[dict]:
+        rows = self._query(
+            """
+            SELECT f.*, s.name AS sector_name, s.etf_ticker AS sector_etf_ticker
+            FROM sector_feeds f
+            LEFT JOIN sectors s ON s.id = f.sector_id
+            WHERE f.active
+            """
+        )
+        feeds = []
+        for r in rows:
+            data = _feed_row(r)
+            data["sectors"] = {"name": data.pop("sector_name"), "etf_ticker": data.pop("sector_etf_ticker")}
+            feeds.append(data)
+        return feeds
+
+    # --- Feed Schedule ---
+
+    def get_feed_schedules(self) -> list[dict]:
+        return [dict(r) for r in self._query("SELECT * FROM feed_schedule")]
+
+    def upsert_feed_schedule(self, schedule: dict) -> None:
+        unknown = set(schedule) - _FEED_SCHEDULE_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown feed_schedule columns: {sorted(unknown)}")
+        data = {**schedule, "updated_at": _now()}
+        columns = ", ".join(data)
+        values = ", ".join(f":{c}" for c in data)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in data if c != "feed_id")
+        with self._tx() as conn:
+            conn.execute(
+                f"INSERT INTO feed_schedule ({columns}) VALUES ({values})"
+                f" ON CONFLICT (feed_id) DO UPDATE SET {updates}",
+                data,
+            )
+
+    # --- Sector Articles ---
+
+    def get_existing_urls(self, urls: list[str]) -> set[str]:
+        existing: set[str] = set()
+        for i in range(0, len(urls), _IN_CHUNK):
+            chunk = urls[i : i + _IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._query(f"SELECT url FROM sector_articles WHERE url IN ({placeholders})", chunk)
+            existing.update(r["url"] for r in rows)
+        return existing
+
+    def insert_articles(self, articles: list[dict]) -> list[dict]:
+        now = _now()
+        rows = [
+            {
+                **{c: a.get(c) for c in _ARTICLE_COLUMNS},
+                "id": a.get("id") or str(uuid.uuid4()),
+                "fetched_at": a.get("fetched_at") or now,
+            }
+            for a in articles
+        ]
+        columns = ", ".join(_ARTICLE_COLUMNS)
+        values = ", ".join(f":{c}" for c in _ARTICLE_COLUMNS)
+        with self._tx() as conn:
+            conn.executemany(f"INSERT OR IGNORE INTO sector_articles ({columns}) VALUES ({values})", rows)
+            # Rows skipped as duplicates kept their old id, so only our new ids come back
+            inserted = []
+            ids = [r["id"] for r in rows]
+            for i in range(0, len(ids), _IN_CHUNK):
+                chunk = ids[i : i + _IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                inserted.extend(
+                    dict(r) for r in conn.execute(f"SELECT * FROM sector_articles WHERE id IN ({placeholders})", chunk)
+                )
+        return inserted
+
+    def get_sector_articles(self, sector_id: str, since: str) -> list[dict]:
+        rows = self._query(
+            "SELECT * FROM sector_articles WHERE sector_id = ? AND fetched_at >= ? ORDER BY published_at DESC",
+            (sector_id, since),
+        )
+        return [dict(r) for r in rows]
+
+    def get_unclassified_articles(self, sector_id: str) -> list[dict]:
+        rows = self._query(
+            """
+            SELECT a.* FROM sector_articles a
+            WHERE a.sector_id = ?
+              AND NOT EXISTS (SELECT 1 FROM sector_signals s WHERE s.article_id = a.id)
+            ORDER BY a.fetched_at, a.id
+            """,
+            (sector_id,),
+        )
+        return [dict(r) for r in rows]
+
+    # --- Sector Signals ---
+
+    def insert_signals(self, signals: list[dict]) -> list[dict]:
+        now = _now()
+        rows = [
+            {
+                **{c: s.get(c) for c in _SIGNAL_COLUMNS},
+                "id": s.get("id") or str(uuid.uuid4()),
+                "created_at": s.get("created_at") or now,
+            }
+            for s in signals
+        ]
+        columns = ", ".join(_SIGNAL_COLUMNS)
+        values = ", ".join(f":{c}" for c in _SIGNAL_COLUMNS)
+        with self._tx() as conn:
+            conn.executemany(f"INSERT INTO sector_signals ({columns}) VALUES ({values})", rows)
+        return rows
+
+    def get_sector_signals(self, sector_id, since, signal_type, sentiment, min_relevance):
+        where, params = _signal_filters(None, signal_type, sentiment)
+        rows = self._query(
+            f"{_SIGNAL_SELECT} WHERE s.sector_id = ? AND s.created_at >= ? AND s.ir_relevance >= ?{where}"
+            " ORDER BY s.created_at DESC",
+            [sector_id, since, min_relevance, *params],
+        )
+        return [_signal_row(r) for r in rows]
+
+    def get_all_signals(self, since, sector_id, signal_type, sentiment, min_relevance, limit):
+        where, params = _signal_filters(sector_id, signal_type, sentiment)
+        rows = self._query(
+            f"{_SIGNAL_SELECT} WHERE s.created_at >= ? AND s.ir_relevance >= ?{where}"
+            " ORDER BY s.created_at DESC LIMIT ?",
+            [since, min_relevance, *params, limit],
+        )
+        return [_signal_row(r) for r in rows]
+
+    def iter_signals(self, since, sector_id, signal_type, sentiment, min_relevance, chunk_size):
+        where, params = _signal_filters(sector_id, signal_type, sentiment)
+        cursor: tuple[str, str] | None = None
+        while True:
+            keyset, keyset_params = "", []
+            if cursor:
+                # The bare `<=` bounds the index range scan; the OR alone would make SQLite scan from the top
+                keyset = " AND s.created_at <= ? AND (s.created_at < ? OR s.id < ?)"
+                keyset_params = [cursor[0], cursor[0], cursor[1]]
+            rows = self._query(
+                f"{_SIGNAL_SELECT} WHERE s.created_at >= ? AND s.ir_relevance >= ?{where}{keyset}"
+                " ORDER BY s.created_at DESC, s.id DESC LIMIT ?",
+                [since, min_relevance, *params, *keyset_params, chunk_size],
+            )
+            chunk = [_signal_row(r) for r in rows]
+            if chunk:
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+            cursor = (chunk[-1]["created_at"], chunk[-1]["id"])
+
+    def search_signals(self, query, since, sector_id, signal_type, sentiment, min_relevance, limit):
+        match = _fts_query(query)
+        if match is None:
+            return []
+        where, params = _signal_filters(sector_id, signal_type, sentiment)
+        # bm25() is lower-is-better; weights rank headline hits above summary hits
+        rows = self._query(
+            f"""
+            SELECT s.id, s.article_id, s.sector_id, s.summary, s.signal_type, s.sentiment,
+                   s.ir_relevance, s.created_at,
+                   a.title AS a_title, a.url AS a_url, a.source AS a_source, a.published_at AS a_published_at,
+                   -bm25(signal_fts, 0.4, 1.0) AS rank,
+                   highlight(signal_fts, 0, char(2), char(3)) AS hl_summary,
+                   highlight(signal_fts, 1, char(2), char(3)) AS hl_title
+            FROM signal_fts
+            JOIN sector_signals s ON s.rowid = signal_fts.rowid
+            LEFT JOIN sector_articles a ON a.id = s.article_id
+            WHERE signal_fts MATCH ? AND s.created_at >= ? AND s.ir_relevance >= ?{where}
+            ORDER BY bm25(signal_fts, 0.4, 1.0), s.created_at DESC
+            LIMIT ?
+            """,
+            [match, since, min_relevance, *params, limit],
+        )
+        results = []
+        for r in rows:
+            data = dict(r)
+            highlight = {"summary": _html_highlight(data.pop("hl_summary")), "title": _html_highlight(data.pop("hl_title"))}
+            rank = data.pop("rank")
+            results.append({**_signal_row(data), "rank": round(rank, 4), "highlight": highlight})
+        return results
+
+    def get_signals_since(self, since: str) -> list[dict]:
+        rows = self._query(
+            f"{_SIGNAL_SELECT} WHERE s.created_at >= ? ORDER BY s.created_at, s.id",
+            (since,),
+        )
+        return [_signal_row(r) for r in rows]
+
+    # --- Signal Rollups ---
+
+    def get_signal_rollup(self, since_day: str, sector_id: str | None) -> list[dict]:
+        sql = (
+            "SELECT sector_id, day, signal_type, sentiment, signal_count, relevance_sum"
+            " FROM sector_signal_daily WHERE day >= ?"
+        )
+        params: list = [since_day]
+        if sector_id:
+            sql += " AND sector_id = ?"
+            params.append(sector_id)
+        sql += " ORDER BY day, sector_id, signal_type, sentiment"
+        return [dict(r) for r in self._query(sql, params)]
+
+    # --- Sector Financials ---
+
+    def upsert_sector_financials(self, sector_id: str, financials: dict) -> dict:
+        unknown = set(financials) - _FINANCIAL_COLUMNS
+        if unknown:
+            raise ValueError(f"Unknown sector_financials columns: {sorted(unknown)}")
+        data = {"sector_id": sector_id, "updated_at": _now(), **financials}
+        columns = ", ".join(data)
+        values = ", ".join(f":{c}" for c in data)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in data if c != "sector_id")
+        with self._tx() as conn:
+            row = conn.execute(
+                f"INSERT INTO sector_financials ({columns}) VALUES ({values})"
+                f" ON CONFLICT (sector_id) DO UPDATE SET {updates} RETURNING *",
+                data,
+            ).fetchone()
+        return dict(row) if row else {}
+
+    def get_all_financials(self) -> list[dict]:
+        return [dict(r) for r in self._query("SELECT * FROM sector_financials")]
+
+    def get_sector_financials(self, sector_id: str) -> dict | None:
+        rows = self._query("SELECT * FROM sector_financials WHERE sector_id = ?", (sector_id,))
+        return dict(rows[0]) if rows else None
+
+    # --- Sector Narratives ---
+
+    def insert_narrative(self, narrative: dict) -> dict:
+        data = {c: narrative[c] for c in _NARRATIVE_COLUMNS if c in narrative}
+        data.setdefault("id", str(uuid.uuid4()))
+        data.setdefault("created_at", _now())
+        for col in _NARRATIVE_JSON_COLUMNS & data.keys():
+            data[col] = json.dumps(data[col])
+        columns = ", ".join(data)
+        values = ", ".join(f":{c}" for c in data)
+        with self._tx() as conn:
+            row = conn.execute(
+                f"INSERT INTO sector_narratives ({columns}) VALUES ({values}) RETURNING *", data
+            ).fetchone()
+        return _narrative_row(row) if row else {}
+
+    def get_latest_narrative(self, sector_id: str) -> dict | None:
+        rows = self._query(
+            "SELECT * FROM sector_narratives WHERE sector_id = ? ORDER BY created_at DESC LIMIT 1",
+            (sector_id,),
+        )
+        return _narrative_row(rows[0]) if rows else None
+
+    def get_all_latest_narratives(self) -> dict[str, dict]:
+        rows = self._query(
+            """
+            SELECT * FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY sector_id ORDER BY created_at DESC) AS rn
+                FROM sector_narratives
+            ) WHERE rn = 1
+            """
+        )
+        latest: dict[str, dict] = {}
+        for r in rows:
+            data = _narrative_row(r)
+            data.pop("rn")
+            latest[data["sector_id"]] = data
+        return latest
+
+    def clear_pipeline_data(self) -> dict:
+        with self._tx() as conn:
+            sig = conn.execute("DELETE FROM sector_signals").rowcount
+            art = conn.execute("DELETE FROM sector_articles").rowcount
+            nar = conn.execute("DELETE FROM sector_narratives").rowcount
+        return {
+            "signals_deleted": sig,
+            "articles_deleted": art,
+            "narratives_deleted": nar,
+        }
+
+    # --- Pipeline Runs ---
+
+    def create_pipeline_run(self) -> dict:
+        with self._tx() as conn:
+            row = conn.execute(
+                "INSERT INTO pipeline_runs (id, status, started_at) VALUES (?, 'running', ?) RETURNING *",
+                (str(uuid.uuid4()), _now()),
+            ).fetchone()
+        return _result_row(row)
+
+    def update_pipeline_run(self, run_id, status, result, error):
+        finished_at = None if status == "running" else _now()
+        with self._tx() as conn:
+            row = conn.execute(
+                "UPDATE pipeline_runs SET status = ?, result = ?, error = ?, finished_at = ?"
+                " WHERE id = ? RETURNING *",
+                (status, json.dumps(result) if result is not None else None, error, finished_at, run_id),
+            ).fetchone()
+        return _result_row(row) if row else {}
+
+    def get_latest_pipeline_run(self) -> dict | None:
+        rows = self._query("SELECT * FROM pipeline_runs ORDER BY started_at DESC LIMIT 1")
+        return _result_row(rows[0]) if rows else None
+
+    def save_checkpoint(self, run_id: str, unit: str, stage: str, stats: dict) -> None:
+        with self._tx() as conn:
+            conn.execute(
+                "INSERT INTO pipeline_checkpoints (run_id, unit, stage, stats, created_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (run_id, unit, stage) DO UPDATE SET stats = excluded.stats",
+                (run_id, unit, stage, json.dumps(stats), _now()),
+            )
+
+    def get_checkpoints(self, run_id: str) -> list[dict]:
+        rows = self._query("SELECT * FROM pipeline_checkpoints WHERE run_id = ?", (run_id,))
+        return [{**dict(r), "stats": json.loads(r["stats"]) if r["stats"] else None} for r in rows]
+
+    # --- Work Queue ---
+
+    def enqueue_tasks(self, run_id, kind, units, max_attempts):
+        now = _now()
+        with self._tx() as conn:
+            conn.executemany(
+                "INSERT INTO pipeline_tasks (id, run_id, kind, unit, max_attempts, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (run_id, kind, unit) DO UPDATE"
+                " SET status = 'pending', attempts = 0, error = NULL, lease_owner = NULL"
+                " WHERE status = 'failed'",
+                [(str(uuid.uuid4()), run_id, kind, u, max_attempts, now, now) for u in units],
+            )
+
+    def claim_task(self, worker_id, lease_seconds, run_id):
+        # Same two steps as schema.sql's claim_pipeline_task(); BEGIN IMMEDIATE
+        # serializes claimers, which is what SKIP LOCKED buys in Postgres
+        now = _now()
+        run_filter, run_params = (" AND run_id = ?", [run_id]) if run_id else ("", [])
+        with self._tx() as conn:
+            conn.execute(
+                "UPDATE pipeline_tasks SET status = 'failed', error = 'lease expired', updated_at = ?"
+                " WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= max_attempts"
+                f"{run_filter}",
+                [now, now, *run_params],
+            )
+            row = conn.execute(
+                "UPDATE pipeline_tasks"
+                " SET status = 'leased', attempts = attempts + 1, lease_owner = ?, lease_expires_at = ?,"
+                "     updated_at = ?"
+                " WHERE id = ("
+                "     SELECT id FROM pipeline_tasks"
+                "     WHERE (status = 'pending' OR (status = 'leased' AND lease_expires_at < ?))"
+                f"      AND attempts < max_attempts{run_filter}"
+                "     ORDER BY created_at LIMIT 1"
+                " ) RETURNING *",
+                [worker_id, _lease_expiry(lease_seconds), now, now, *run_params],
+            ).fetchone()
+        return _result_row(row) if row else None
+
+    def _update_leased_task(self, task_id: str, worker_id: str, assignments: str, params: list) -> bool:
+        with self._tx() as conn:
+            cur = conn.execute(
+                f"UPDATE pipeline_tasks SET {assignments}, updated_at = ?"
+                " WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                [*params, _now(), task_id, worker_id],
+            )
+        return cur.rowcount > 0
+
+    def renew_task_lease(self, task_id, worker_id, lease_seconds):
+        return self._update_leased_task(task_id, worker_id, "lease_expires_at = ?", [_lease_expiry(lease_seconds)])
+
+    def complete_task(self, task_id, worker_id, result):
+        return self._update_leased_task(
+            task_id, worker_id, "status = 'done', result = ?, lease_expires_at = NULL", [json.dumps(result)]
+        )
+
+    def fail_task(self, task_id, worker_id, error, retry):
+        self._update_leased_task(
+            task_id,
+            worker_id,
+            "status = ?, error = ?, lease_expires_at = NULL",
+            ["pending" if retry else "failed", error],
+        )
+
+    def get_tasks(self, run_id, kind):
+        rows = self._query(
+            "SELECT * FROM pipeline_tasks WHERE run_id = ? AND kind = ? ORDER BY created_at, id", (run_id, kind)
+        )
+        return [_result_row(r) for r in rows]
+
+    # --- Backfill ---
+
+    def get_backfill_windows(self) -> list[dict]:
+        rows = self._query("SELECT * FROM backfill_windows ORDER BY window_start")
+        return [{**dict(r), "stats": json.loads(r["stats"]) if r["stats"] else None} for r in rows]
+
+    def save_backfill_window(self, window_start, window_end, status, stats):
+        now = _now()
+        with self._tx() as conn:
+            conn.execute(
+                "INSERT INTO backfill_windows (window_start, window_end, status, stats, started_at, finished_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (window_start, window_end) DO UPDATE"
+                " SET status = excluded.status, stats = excluded.stats, finished_at = excluded.finished_at",
+                (
+                    window_start, window_end, status, json.dumps(stats) if stats is not None else None,
+                    now, None if status == "running" else now,
+                ),
+            )
+
+    # --- Usage Ledger ---
+
+    def insert_usage(self, rows: list[dict]) -> None:
+        now = _now()
+        columns = ", ".join(_USAGE_COLUMNS)
+        values = ", ".join("?" for _ in _USAGE_COLUMNS)
+        with self._tx() as conn:
+            conn.executemany(
+                f"INSERT INTO llm_usage (id, created_at, {columns}) VALUES (?, ?, {values})",
+                [(str(uuid.uuid4()), now, *(int(r[c]) if c == "cached" else r[c] for c in _USAGE_COLUMNS)) for r in rows],
+            )
+
+    def get_usage(self, run_id, since):
+        where, params = [], []
+        if run_id:
+            where.append("run_id = ?")
+            params.append(run_id)
+        if since:
+            where.append("created_at >= ?")
+            params.append(since)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        rows = self._query(f"SELECT * FROM llm_usage{clause} ORDER BY created_at, id", params)
+        return [{**dict(r), "cached": bool(r["cached"])} for r in rows]
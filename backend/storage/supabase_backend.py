@@ -0,0 +1,507 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from supabase import create_client, Client, ClientOptions
+
+from config import (
+    SUPABASE_CONNECT_TIMEOUT,
+    SUPABASE_HTTP2,
+    SUPABASE_KEEPALIVE_SECONDS,
+    SUPABASE_KEY,
+    SUPABASE_MAX_CONNECTIONS,
+    SUPABASE_POOL_TIMEOUT,
+    SUPABASE_READ_RETRIES,
+    SUPABASE_READ_TIMEOUT,
+    SUPABASE_RETRY_BACKOFF_SECONDS,
+    SUPABASE_URL,
+)
+from storage.base import StorageBackend
+from storage.transport import TransportStats, build_http_client
+
+_SIGNAL_WITH_ARTICLE = "*, sector_articles(title, url, source, published_at)"
+
+# --- Singleton Supabase Client ---
+_supabase: Client | None = None
+_supabase_lock = threading.Lock()
+_transport_stats = TransportStats()
+
+
+def get_client() -> Client:
+    """Shared client, created once under a lock (double-checked) on a tuned, pooled transport."""
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                http_client = build_http_client(
+                    max_connections=SUPABASE_MAX_CONNECTIONS,
+                    keepalive_expiry=SUPABASE_KEEPALIVE_SECONDS,
+                    http2=SUPABASE_HTTP2,
+                    retries=SUPABASE_READ_RETRIES,
+                    backoff_seconds=SUPABASE_RETRY_BACKOFF_SECONDS,
+                    timeout=httpx.Timeout(
+                        SUPABASE_READ_TIMEOUT,
+                        connect=SUPABASE_CONNECT_TIMEOUT,
+                        pool=SUPABASE_POOL_TIMEOUT,
+                    ),
+                    stats=_transport_stats,
+                )
+                client = create_client(
+                    SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(httpx_client=http_client)
+                )
+                # The PostgREST sub-client is itself created lazily; build it here, under the lock
+                client.postgrest
+                _supabase = client
+    return _supabase
+
+
+def _select_all(build_query, page_size: int = 1000) -> list[dict]:
+    """Page through a query past PostgREST's max-rows cap. build_query must return a fresh, ordered query."""
+    rows: list[dict] = []
+    offset = 0
+    while True:
+        res = build_query().range(offset, offset + page_size - 1).execute()
+        rows.extend(res.data)
+        if len(res.data) < page_size:
+            return rows
+        offset += page_size
+
+
+class SupabaseBackend(StorageBackend):
+    """Hosted Postgres through PostgREST (the original db layer)."""
+
+    name = "supabase"
+
+    def stats(self) -> dict:
+        return {"transport": _transport_stats.snapshot()}
+
+    # --- Sectors ---
+
+    def get_sectors(self) -> list[dict]:
+        res = get_client().table("sectors").select("*").execute()
+        return res.data
+
+    def get_sector(self, sector_id: str) -> dict | None:
+        res = get_client().table("sectors").select("*").eq("id", sector_id).execute()
+        return res.data[0] if res.data else None
+
+    # --- Sector Feeds ---
+
+    def get_sector_feeds(self, sector_id: str) -> list[dict]:
+        res = (
+            get_client()
+            .table("sector_feeds")
+            .select("*")
+            .eq("sector_id", sector_id)
+            .eq("active", True)
+            .execute()
+        )
+        return res.data
+
+    def get_all_active_feeds(self) -> list[dict]:
+        res = (
+            get_client()
+            .table("sector_feeds")
+            .select("*, sectors(name, etf_ticker)")
+            .eq("active", True)
+            .execute()
+        )
+        return res.data
+
+    # --- Feed Schedule ---
+
+    def get_feed_schedules(self) -> list[dict]:
+        res = get_client().table("feed_schedule").select("*").execute()
+        return res.data
+
+    def upsert_feed_schedule(self, schedule: dict) -> None:
+        data = {**schedule, "updated_at": datetime.now(timezone.utc).isoformat()}
+        get_client().table("feed_schedule").upsert(data, on_conflict="feed_id").execute()
+
+    # --- Sector Articles ---
+
+    def get_existing_urls(self, urls: list[str]) -> set[str]:
+        res = (
+            get_client()
+            .table("sector_articles")
+            .select("url")
+            .in_("url", urls)
+            .execute()
+        )
+        return {row["url"] for row in res.data}
+
+    def insert_articles(self, articles: list[dict]) -> list[dict]:
+        res = (
+            get_client()
+            .table("sector_articles")
+            .upsert(articles, on_conflict="url", ignore_duplicates=True)
+            .execute()
+        )
+        return res.data
+
+    def get_sector_articles(self, sector_id: str, since: str) -> list[dict]:
+        res = (
+            get_client()
+            .table("sector_articles")
+            .select("*")
+            .eq("sector_id", sector_id)
+            .gte("fetched_at", since)
+            .order("published_at", desc=True)
+            .execute()
+        )
+        return res.data
+
+    def get_unclassified_articles(self, sector_id: str) -> list[dict]:
+        rows = _select_all(
+            lambda: (
+                get_client()
+                .table("sector_articles")
+                .select("*, sector_signals(id)")
+                .eq("sector_id", sector_id)
+                .order("fetched_at")
+                .order("id")
+            )
+        )
+        return [
+            {k: v for k, v in row.items() if k != "sector_signals"}
+            for row in rows
+            if not row.get("sector_signals")
+        ]
+
+    # --- Sector Signals ---
+
+    def insert_signals(self, signals: list[dict]) -> list[dict]:
+        res = get_client().table("sector_signals").insert(signals).execute()
+        return res.data
+
+    def get_sector_signals(self, sector_id, since, signal_type, sentiment, min_relevance):
+        query = (
+            get_client()
+            .table("sector_signals")
+            .select(_SIGNAL_WITH_ARTICLE)
+            .eq("sector_id", sector_id)
+            .gte("created_at", since)
+            .gte("ir_relevance", min_relevance)
+            .order("created_at", desc=True)
+        )
+        if signal_type:
+            query = query.eq("signal_type", signal_type)
+        if sentiment:
+            query = query.eq("sentiment", sentiment)
+        return query.execute().data
+
+    def get_all_signals(self, since, sector_id, signal_type, sentiment, min_relevance, limit):
+        query = (
+            get_client()
+            .table("sector_signals")
+            .select(_SIGNAL_WITH_ARTICLE)
+            .gte("created_at", since)
+            .gte("ir_relevance", min_relevance)
+            .order("created_at", desc=True)
+            .limit(limit)
+        )
+        if sector_id:
+            query = query.eq("sector_id", sector_id)
+        if signal_type:
+            query = query.eq("signal_type", signal_type)
+        if sentiment:
+            query = query.eq("sentiment", sentiment)
+        return query.execute().data
+
+    def iter_signals(self, since, sector_id, signal_type, sentiment, min_relevance, chunk_size):
+        cursor: tuple[str, str] | None = None
+        while True:
+            query = (
+                get_client()
+                .table("sector_signals")
+                .select(_SIGNAL_WITH_ARTICLE)
+                .gte("created_at", since)
+                .gte("ir_relevance", min_relevance)
+                .order("created_at", desc=True)
+                .order("id", desc=True)
+                .limit(chunk_size)
+            )
+            if sector_id:
+                query = query.eq("sector_id", sector_id)
+            if signal_type:
+                query = query.eq("signal_type", signal_type)
+            if sentiment:
+                query = query.eq("sentiment", sentiment)
+            if cursor:
+                created_at, last_id = cursor
+                # The bare lte bounds the index range scan on (created_at, id)
+                query = query.lte("created_at", created_at).or_(
+                    f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{last_id})'
+                )
+            rows = query.execute().data
+            if rows:
+                yield rows
+            if len(rows) < chunk_size:
+                return
+            cursor = (rows[-1]["created_at"], rows[-1]["id"])
+
+    def search_signals(self, query, since, sector_id, signal_type, sentiment, min_relevance, limit):
+        res = get_client().rpc(
+            "search_signals",
+            {
+                "q": query,
+                "since": since,
+                "p_sector_id": sector_id,
+                "p_signal_type": signal_type,
+                "p_sentiment": sentiment,
+                "p_min_relevance": min_relevance,
+                "p_limit": limit,
+            },
+        ).execute()
+        return res.data
+
+    def get_signals_since(self, since: str) -> list[dict]:
+        return _select_all(
+            lambda: (
+                get_client()
+                .table("sector_signals")
+                .select(_SIGNAL_WITH_ARTICLE)
+                .gte("created_at", since)
+                .order("created_at")
+                .order("id")
+            )
+        )
+
+    # --- Signal Rollups ---
+
+    def get_signal_rollup(self, since_day: str, sector_id: str | None) -> list[dict]:
+        def build_query():
+            query = (
+                get_client()
+                .table("sector_signal_daily")
+                .select("sector_id, day, signal_type, sentiment, signal_count, relevance_sum")
+                .gte("day", since_day)
+                .order("day")
+                .order("sector_id")
+                .order("signal_type")
+                .order("sentiment")
+            )
+            if sector_id:
+                query = query.eq("sector_id", sector_id)
+            return query
+
+        return _select_all(build_query)
+
+    # --- Sector Financials ---
+
+    def upsert_sector_financials(self, sector_id: str, financials: dict) -> dict:
+        data = {"sector_id": sector_id, "updated_at": datetime.now(timezone.utc).isoformat(), **financials}
+        res = (
+            get_client()
+            .table("sector_financials")
+            .upsert(data, on_conflict="sector_id")
+            .execute()
+        )
+        return res.data[0] if res.data else {}
+
+    def get_all_financials(self) -> list[dict]:
+        res = get_client().table("sector_financials").select("*").execute()
+        return res.data
+
+    def get_sector_financials(self, sector_id: str) -> dict | None:
+        res = (
+            get_client()
+            .table("sector_financials")
+            .select("*")
+            .eq("sector_id", sector_id)
+            .execute()
+        )
+        return res.data[0] if res.data else None
+
+    # --- Sector Narratives ---
+
+    def insert_narrative(self, narrative: dict) -> dict:
+        res = get_client().table("sector_narratives").insert(narrative).execute()
+        return res.data[0] if res.data else {}
+
+    def get_latest_narrative(self, sector_id: str) -> dict | None:
+        res = (
+            get_client()
+            .table("sector_narratives")
+            .select("*")
+            .eq("sector_id", sector_id)
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        return res.data[0] if res.data else None
+
+    def get_all_latest_narratives(self) -> dict[str, dict]:
+        res = (
+            get_client()
+            .table("sector_narratives")
+            .select("*")
+            .order("created_at", desc=True)
+            .execute()
+        )
+        # Python-side: keep only the latest per sector
+        latest: dict[str, dict] = {}
+        for row in res.data:
+            sid = row["sector_id"]
+            if sid not in latest:
+                latest[sid] = row
+        return latest
+
+    def clear_pipeline_data(self) -> dict:
+        client = get_client()
+        # Use gte with nil UUID to match all rows (PostgREST requires a filter for DELETE)
+        nil_uuid = "00000000-0000-0000-0000-000000000000"
+        sig = client.table("sector_signals").delete().gte("id", nil_uuid).execute()
+        art = client.table("sector_articles").delete().gte("id", nil_uuid).execute()
+        nar = client.table("sector_narratives").delete().gte("id", nil_uuid).execute()
+        return {
+            "signals_deleted": len(sig.data),
+            "articles_deleted": len(art.data),
+            "narratives_deleted": len(nar.data),
+        }
+
+    # --- Pipeline Runs ---
+
+    def create_pipeline_run(self) -> dict:
+        res = get_client().table("pipeline_runs").insert({"status": "running"}).execute()
+        return res.data[0]
+
+    def update_pipeline_run(self, run_id, status, result, error):
+        data = {
+            "status": status,
+            "result": result,
+            "error": error,
+            "finished_at": None if status == "running" else datetime.now(timezone.utc).isoformat(),
+        }
+        res = get_client().table("pipeline_runs").update(data).eq("id", run_id).execute()
+        return res.data[0] if res.data else {}
+
+    def get_latest_pipeline_run(self) -> dict | None:
+        res = (
+            get_client()
+            .table("pipeline_runs")
+            .select("*")
+            .order("started_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        return res.data[0] if res.data else None
+
+    def save_checkpoint(self, run_id: str, unit: str, stage: str, stats: dict) -> None:
+        (
+            get_client()
+            .table("pipeline_checkpoints")
+            .upsert(
+                {"run_id": run_id, "unit": unit, "stage": stage, "stats": stats},
+                on_conflict="run_id,unit,stage",
+            )
+            .execute()
+        )
+
+    def get_checkpoints(self, run_id: str) -> list[dict]:
+        res = (
+            get_client()
+            .table("pipeline_checkpoints")
+            .select("*")
+            .eq("run_id", run_id)
+            .execute()
+        )
+        return res.data
+
+    # --- Work Queue ---
+
+    def enqueue_tasks(self, run_id, kind, units, max_attempts):
+        client = get_client()
+        rows = [{"run_id": run_id, "kind": kind, "unit": u, "max_attempts": max_attempts} for u in units]
+        client.table("pipeline_tasks").upsert(
+            rows, on_conflict="run_id,kind,unit", ignore_duplicates=True
+        ).execute()
+        (
+            client.table("pipeline_tasks")
+            .update({"status": "pending", "attempts": 0, "error": None, "lease_owner": None})
+            .eq("run_id", run_id)
+            .eq("kind", kind)
+            .eq("status", "failed")
+            .execute()
+        )
+
+    def claim_task(self, worker_id, lease_seconds, run_id):
+        res = get_client().rpc(
+            "claim_pipeline_task",
+            {"p_worker": worker_id, "p_lease_seconds": lease_seconds, "p_run_id": run_id},
+        ).execute()
+        return res.data[0] if res.data else None
+
+    def _update_leased_task(self, task_id: str, worker_id: str, data: dict) -> list[dict]:
+        res = (
+            get_client()
+            .table("pipeline_tasks")
+            .update({**data, "updated_at": datetime.now(timezone.utc).isoformat()})
+            .eq("id", task_id)
+            .eq("lease_owner", worker_id)
+            .eq("status", "leased")
+            .execute()
+        )
+        return res.data
+
+    def renew_task_lease(self, task_id, worker_id, lease_seconds):
+        expires = datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+        return bool(self._update_leased_task(task_id, worker_id, {"lease_expires_at": expires.isoformat()}))
+
+    def complete_task(self, task_id, worker_id, result):
+        return bool(self._update_leased_task(
+            task_id, worker_id, {"status": "done", "result": result, "lease_expires_at": None}
+        ))
+
+    def fail_task(self, task_id, worker_id, error, retry):
+        self._update_leased_task(
+            task_id,
+            worker_id,
+            {"status": "pending" if retry else "failed", "error": error, "lease_expires_at": None},
+        )
+
+    def get_tasks(self, run_id, kind):
+        return _select_all(
+            lambda: (
+                get_client()
+                .table("pipeline_tasks")
+                .select("*")
+                .eq("run_id", run_id)
+                .eq("kind", kind)
+                .order("created_at")
+                .order("id")
+            )
+        )
+
+    # --- Backfill ---
+
+    def get_backfill_windows(self) -> list[dict]:
+        return _select_all(
+            lambda: get_client().table("backfill_windows").select("*").order("window_start").order("window_end")
+        )
+
+    def save_backfill_window(self, window_start, window_end, status, stats):
+        data = {
+            "window_start": window_start,
+            "window_end": window_end,
+            "status": status,
+            "stats": stats,
+            "finished_at": None if status == "running" else datetime.now(timezone.utc).isoformat(),
+        }
+        get_client().table("backfill_windows").upsert(data, on_conflict="window_start,window_end").execute()
+
+    # --- Usage Ledger ---
+
+    def insert_usage(self, rows: list[dict]) -> None:
+        get_client().table("llm_usage").insert(rows).execute()
+
+    def get_usage(self, run_id, since):
+        def build_query():
+            query = get_client().table("llm_usage").select("*").order("created_at").order("id")
+            if run_id:
+                query = query.eq("run_id", run_id)
+            if since:
+                query = query.gte("created_at", since)
+            return query
+
+        return _select_all(build_query)
@@ -0,0 +1,187 @@
+"""
+HTTP transport for the shared Supabase client.
+
+One pooled httpx transport (HTTP/2 when h2 is installed) shared by every
+thread: pipeline workers and the API's threadpool. Idempotent reads are
+retried with jittered exponential backoff on connection errors and transient
+gateway statuses. Each request carries an httpcore trace hook, so we can
+count connection reuse and measure how long requests wait for a pooled
+connection.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+_RETRY_STATUSES = {429, 502, 503, 504, 520}
+_RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class TransportStats:
+    """Thread-safe counters plus a window of recent pool-wait samples."""
+
+    def __init__(self, window: int = 2048):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.connect_ms_total = 0.0
+        self._pool_wait_ms: deque[float] = deque(maxlen=window)
+
+    def record(self, reused: bool, pool_wait_ms: float, connect_ms: float) -> None:
+        with self._lock:
+            self.requests += 1
+            if reused:
+                self.connections_reused += 1
+            else:
+                self.connections_opened += 1
+                self.connect_ms_total += connect_ms
+            self._pool_wait_ms.append(pool_wait_ms)
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = list(self._pool_wait_ms)
+            total = self.connections_opened + self.connections_reused
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "errors": self.errors,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "reuse_ratio": round(self.connections_reused / total, 3) if total else None,
+                "avg_connect_ms": round(self.connect_ms_total / self.connections_opened, 2)
+                if self.connections_opened else None,
+                "pool_wait_ms_p50": round(_percentile(waits, 0.50), 2),
+                "pool_wait_ms_p99": round(_percentile(waits, 0.99), 2),
+                "pool_wait_ms_max": round(max(waits), 2) if waits else 0.0,
+            }
+
+
+class _Trace:
+    """httpcore trace callback: timestamps the first connect and first header write."""
+
+    def __init__(self):
+        self.connect_started: float | None = None
+        self.connect_done: float | None = None
+        self.send_started: float | None = None
+
+    def __call__(self, event: str, info: dict) -> None:
+        now = time.perf_counter()
+        if event == "connection.connect_tcp.started" and self.connect_started is None:
+            self.connect_started = now
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.connect_done = now
+        elif event.endswith("send_request_headers.started") and self.send_started is None:
+            self.send_started = now
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    def __init__(
+        self,
+        http2: bool,
+        limits: httpx.Limits,
+        retries: int,
+        backoff_seconds: float,
+        stats: TransportStats,
+    ):
+        self._inner = httpx.HTTPTransport(http2=http2, limits=limits)
+        self._retries = retries
+        self._backoff = backoff_seconds
+        self.stats = stats
+
+    def _sleep(self, attempt: int) -> None:
+        # Full jitter: uniform(0, base * 2^attempt)
+        time.sleep(random.uniform(0, self._backoff * (2 ** attempt)))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        retryable = request.method in _IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            trace = _Trace()
+            request.extensions = {**request.extensions, "trace": trace}
+            started = time.perf_counter()
+            try:
+                response = self._inner.handle_request(request)
+            except _RETRY_ERRORS as e:
+                if retryable and attempt < self._retries:
+                    logger.debug(f"Retrying {request.method} {request.url.path} after {type(e).__name__}")
+                    self.stats.record_retry()
+                    self._sleep(attempt)
+                    attempt += 1
+                    continue
+                self.stats.record_error()
+                raise
+
+            reused = trace.connect_started is None
+            first_io = trace.connect_started if not reused else trace.send_started
+            pool_wait_ms = ((first_io or started) - started) * 1000
+            connect_ms = 0.0
+            if not reused and trace.connect_done:
+                connect_ms = (trace.connect_done - trace.connect_started) * 1000
+            self.stats.record(reused, pool_wait_ms, connect_ms)
+
+            if retryable and response.status_code in _RETRY_STATUSES and attempt < self._retries:
+                response.close()
+                self.stats.record_retry()
+                self._sleep(attempt)
+                attempt += 1
+                continue
+            return response
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+def build_http_client(
+    max_connections: int,
+    keepalive_expiry: float,
+    http2: bool,
+    retries: int,
+    backoff_seconds: float,
+    timeout: httpx.Timeout,
+    stats: TransportStats,
+) -> httpx.Client:
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("h2 not installed; Supabase client falling back to HTTP/1.1")
+            http2 = False
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    transport = InstrumentedTransport(
+        http2=http2,
+        limits=limits,
+        retries=retries,
+        backoff_seconds=backoff_seconds,
+        stats=stats,
+    )
+    return httpx.Client(transport=transport, timeout=timeout, follow_redirects=True)
@@ -0,0 +1,326 @@
+"""
+Model token ledger and per-run token budget.
+
+Every Claude call writes an llm_usage row with input/output tokens, prompt-cache
+reads/writes and its labels (run, stage, sector, feed). A classification batch
+is split across the feeds its articles came from, pro rata by article count,
+together with the non-neutral signals each feed produced. When a batch call
+fails, its articles are retried one per call. Those fallback calls are logged
+under their own stage with zero articles, so the articles in the ledger are
+counted once and fallback_calls_per_1k_articles tracks how often batches fail.
+A narrative reused without a call is logged as a cached row with zero tokens.
+
+With PIPELINE_TOKEN_BUDGET set, a run spends in order of feed yield:
+
+- When a process first touches the run, active feeds are ranked by their
+  historical signals per article and funded, best first, with their expected
+  classification cost until the budget (less a reserve for the sector
+  narratives) runs out. Articles from unfunded feeds are deferred: stored but
+  left unclassified.
+- Each classification batch and narrative call reserves its estimated cost
+  beforehand and is deferred if the reservation doesn't fit, so the run
+  finishes with what it could afford instead of failing partway.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+
+import db
+from config import (
+    ARTICLES_PER_FEED,
+    HAIKU_MODEL,
+    PIPELINE_TOKEN_BUDGET,
+    USAGE_BUDGET_SYNC_SECONDS,
+    USAGE_DEFAULT_TOKENS_PER_ARTICLE,
+    USAGE_DEFAULT_TOKENS_PER_NARRATIVE,
+    USAGE_HISTORY_DAYS,
+)
+
+logger = logging.getLogger(__name__)
+
+STAGE_CLASSIFY = "classify"
+STAGE_CLASSIFY_FALLBACK = "classify_fallback"
+STAGE_NARRATIVE = "narrative"
+STAGE_NARRATIVE_STREAM = "narrative_stream"
+CLASSIFY_STAGES = (STAGE_CLASSIFY, STAGE_CLASSIFY_FALLBACK)
+
+TOKEN_FIELDS = ("input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens")
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+def _response_tokens(response) -> dict[str, int]:
+    u = getattr(response, "usage", None)
+    return {
+        "input_tokens": getattr(u, "input_tokens", 0) or 0,
+        "output_tokens": getattr(u, "output_tokens", 0) or 0,
+        "cache_read_tokens": getattr(u, "cache_read_input_tokens", 0) or 0,
+        "cache_write_tokens": getattr(u, "cache_creation_input_tokens", 0) or 0,
+    }
+
+
+def _row_total(row: dict) -> int:
+    return sum(row.get(f) or 0 for f in TOKEN_FIELDS)
+
+
+def _write(rows: list[dict]) -> None:
+    """Best-effort: a lost ledger row only makes the usage report undercount."""
+    try:
+        db.insert_usage(rows)
+    except Exception as e:
+        logger.warning(f"Failed to record token usage: {e}")
+
+
+def record(
+    response,
+    stage: str,
+    run_id: str | None = None,
+    sector_id: str | None = None,
+    feeds: dict[str | None, tuple[int, int]] | None = None,
+) -> int:
+    """Log one model call (response=None if it failed without a reply). Returns its total tokens.
+
+    `feeds` maps feed_id -> (articles, signals) for a classification batch; the
+    tokens are split between them by article count.
+    """
+    tokens = _response_tokens(response)
+    groups = list((feeds or {None: (0, 0)}).items())
+    total_articles = sum(articles for _, (articles, _) in groups)
+    remaining = dict(tokens)
+    rows = []
+    for i, (feed_id, (articles, signals)) in enumerate(groups):
+        if i == len(groups) - 1:
+            share = remaining
+        else:
+            fraction = articles / total_articles if total_articles else 1 / len(groups)
+            share = {f: round(tokens[f] * fraction) for f in TOKEN_FIELDS}
+            remaining = {f: remaining[f] - share[f] for f in TOKEN_FIELDS}
+        rows.append({
+            "run_id": run_id,
+            "stage": stage,
+            "sector_id": sector_id,
+            "feed_id": feed_id,
+            "model": getattr(response, "model", None) or HAIKU_MODEL,
+            "calls": 1 if i == 0 else 0,
+            "cached": False,
+            **share,
+            "articles": articles,
+            "signals": signals,
+        })
+    _write(rows)
+
+    total = sum(tokens.values())
+    budget = _budgets.get(run_id) if run_id else None
+    if budget is not None:
+        budget.add_spent(total)
+    return total
+
+
+def record_cached(stage: str, run_id: str | None = None, sector_id: str | None = None) -> None:
+    """Log a result served without a model call (e.g. a reused narrative)."""
+    _write([{
+        "run_id": run_id,
+        "stage": stage,
+        "sector_id": sector_id,
+        "feed_id": None,
+        "model": None,
+        "calls": 0,
+        "cached": True,
+        **{f: 0 for f in TOKEN_FIELDS},
+        "articles": 0,
+        "signals": 0,
+    }])
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def _empty_bucket() -> dict:
+    return {
+        "calls": 0, "cached": 0, **{f: 0 for f in TOKEN_FIELDS}, "total_tokens": 0, "articles": 0, "signals": 0,
+        "fallback_calls": 0,
+    }
+
+
+def _fallback_rate(bucket: dict) -> float | None:
+    """Single-article fallback calls per 1,000 articles sent for classification."""
+    return round(bucket["fallback_calls"] * 1000 / bucket["articles"], 1) if bucket["articles"] else None
+
+
+def summarize(rows: list[dict]) -> dict:
+    """Roll ledger rows up into totals and per-stage / per-sector / per-feed buckets."""
+    totals = _empty_bucket()
+    by_stage: dict[str, dict] = defaultdict(_empty_bucket)
+    by_sector: dict[str, dict] = defaultdict(_empty_bucket)
+    by_feed: dict[str, dict] = defaultdict(_empty_bucket)
+
+    for row in rows:
+        buckets = [totals, by_stage[row["stage"]]]
+        if row.get("sector_id"):
+            buckets.append(by_sector[row["sector_id"]])
+        if row.get("feed_id"):
+            buckets.append(by_feed[row["feed_id"]])
+        for b in buckets:
+            b["calls"] += row.get("calls") or 0
+            b["cached"] += 1 if row.get("cached") else 0
+            for f in TOKEN_FIELDS:
+                b[f] += row.get(f) or 0
+            b["total_tokens"] += _row_total(row)
+            b["articles"] += row.get("articles") or 0
+            b["signals"] += row.get("signals") or 0
+            if row["stage"] == STAGE_CLASSIFY_FALLBACK:
+                b["fallback_calls"] += row.get("calls") or 0
+
+    for b in [totals, *by_sector.values(), *by_feed.values()]:
+        b["fallback_calls_per_1k_articles"] = _fallback_rate(b)
+    return {
+        "totals": totals,
+        "by_stage": dict(by_stage),
+        "by_sector": dict(by_sector),
+        "by_feed": dict(by_feed),
+    }
+
+
+def run_summary(run_id: str) -> dict:
+    """A run's usage rollup plus its budget, for the pipeline result."""
+    summary = summarize(db.get_usage(run_id=run_id))
+    summary["budget"] = PIPELINE_TOKEN_BUDGET or None
+    return summary
+
+
+# ---------------------------------------------------------------------------
+# Budget
+# ---------------------------------------------------------------------------
+
+def _feed_yields(history: list[dict]) -> tuple[dict[str, float], float]:
+    """Signals per classified article for each feed, smoothed toward the overall rate.
+
+    Returns ({feed_id: yield}, prior): the prior is what a feed with no history gets.
+    """
+    per_feed: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    for row in history:
+        if row["stage"] in CLASSIFY_STAGES and row.get("feed_id"):
+            per_feed[row["feed_id"]][0] += row["signals"]
+            per_feed[row["feed_id"]][1] += row["articles"]
+    # Articles and their signals can land in different rows (a batch and its fallback calls),
+    # and a window edge can cut one of them off: never more than one signal per article
+    capped = {fid: (min(s, a), a) for fid, (s, a) in per_feed.items()}
+    signals = sum(s for s, _ in capped.values())
+    articles = sum(a for _, a in capped.values())
+    prior = signals / articles if articles else 0.5
+    # Worth one fetch of articles: a feed needs a few runs of history to move far from the prior
+    k = ARTICLES_PER_FEED
+    return {fid: (s + prior * k) / (a + k) for fid, (s, a) in capped.items()}, prior
+
+
+def _average_cost(history: list[dict], stages: tuple[str, ...], per: str | None, default: int) -> int:
+    rows = [r for r in history if r["stage"] in stages and not r.get("cached")]
+    units = sum(r.get(per) or 0 for r in rows) if per else sum(r.get("calls") or 0 for r in rows)
+    return round(sum(_row_total(r) for r in rows) / units) if units else default
+
+
+class RunBudget:
+    """Token allowance of one pipeline run, shared by every thread of this process."""
+
+    def __init__(self, run_id: str, limit: int):
+        self.run_id = run_id
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._reserved = 0
+        self._spent = 0
+        self._synced_at = float("-inf")
+        self._sync()
+
+        history = [r for r in db.get_usage(days=USAGE_HISTORY_DAYS) if r.get("run_id") != run_id]
+        self.feed_yield, self._prior_yield = _feed_yields(history)
+        self.tokens_per_article = _average_cost(history, CLASSIFY_STAGES, "articles", USAGE_DEFAULT_TOKENS_PER_ARTICLE)
+        self.tokens_per_narrative = _average_cost(history, (STAGE_NARRATIVE,), None, USAGE_DEFAULT_TOKENS_PER_NARRATIVE)
+        self.funded_feeds = self._plan(history)
+
+    def _plan(self, history: list[dict]) -> set[str]:
+        """Feeds whose expected classification cost fits the budget, best yield first."""
+        feeds = db.get_all_active_feeds()
+        articles_per_run: dict[str, list[int]] = defaultdict(list)
+        per_run: dict[tuple[str, str], int] = defaultdict(int)
+        for row in history:
+            if row["stage"] == STAGE_CLASSIFY and row.get("feed_id") and row.get("run_id"):
+                per_run[(row["run_id"], row["feed_id"])] += row.get("articles") or 0
+        for (_, feed_id), articles in per_run.items():
+            articles_per_run[feed_id].append(articles)
+
+        sectors = {f["sector_id"] for f in feeds}
+        available = self.limit - self._spent - len(sectors) * self.tokens_per_narrative
+        funded: set[str] = set()
+        for feed in sorted(feeds, key=lambda f: self.yield_of(f["id"]), reverse=True):
+            counts = articles_per_run.get(feed["id"])
+            expected = sum(counts) / len(counts) if counts else ARTICLES_PER_FEED
+            cost = expected * self.tokens_per_article
+            if cost > available:
+                break
+            funded.add(feed["id"])
+            available -= cost
+
+        logger.info(
+            f"Token budget {self.limit:,} (spent {self._spent:,}): funding {len(funded)}/{len(feeds)} feeds, "
+            f"~{self.tokens_per_article} tokens/article, ~{self.tokens_per_narrative} tokens/narrative"
+        )
+        return funded
+
+    def yield_of(self, feed_id: str | None) -> float:
+        return self.feed_yield.get(feed_id, self._prior_yield) if feed_id else self._prior_yield
+
+    def prioritize(self, articles: list[dict]) -> tuple[list[dict], list[dict]]:
+        """Split articles into (funded, highest-yield feed first) and deferred."""
+        ranked = sorted(articles, key=lambda a: self.yield_of(a.get("feed_id")), reverse=True)
+        funded = [a for a in ranked if a.get("feed_id") in self.funded_feeds]
+        deferred = [a for a in ranked if a.get("feed_id") not in self.funded_feeds]
+        return funded, deferred
+
+    def _sync(self) -> None:
+        # The ledger has every process's spend for the run, including ours
+        if time.monotonic() - self._synced_at >= USAGE_BUDGET_SYNC_SECONDS:
+            self._spent = sum(_row_total(r) for r in db.get_usage(run_id=self.run_id))
+            self._synced_at = time.monotonic()
+
+    def try_reserve(self, tokens: int) -> bool:
+        """Set aside an estimated cost. False (nothing reserved) if it would exceed the budget."""
+        with self._lock:
+            self._sync()
+            if self._spent + self._reserved + tokens > self.limit:
+                return False
+            self._reserved += tokens
+            return True
+
+    def release(self, tokens: int) -> None:
+        with self._lock:
+            self._reserved -= tokens
+
+    def add_spent(self, tokens: int) -> None:
+        with self._lock:
+            self._spent += tokens
+
+
+_budgets: dict[str, RunBudget] = {}
+_budgets_lock = threading.Lock()
+
+
+def get_budget(run_id: str | None) -> RunBudget | None:
+    """This process's budget for a run; None without a run or with PIPELINE_TOKEN_BUDGET unset."""
+    if run_id is None or PIPELINE_TOKEN_BUDGET <= 0:
+        return None
+    with _budgets_lock:
+        budget = _budgets.get(run_id)
+        if budget is None:
+            budget = _budgets[run_id] = RunBudget(run_id, PIPELINE_TOKEN_BUDGET)
+        return budget
+
+
+def drop_budget(run_id: str) -> None:
+    """Forget a finished run's budget; a later get_budget (e.g. on resume) starts from the ledger."""
+    with _budgets_lock:
+        _budgets.pop(run_id, None)
@@ -0,0 +1,55 @@
+"""
+Pipeline queue worker (PIPELINE_MODE=queue).
+
+Leases sector and narrative tasks from the pipeline_tasks queue and runs them.
+Start as many as you like, on as many hosts as you like, as long as they point
+at the same database as the API (STORAGE_BACKEND / SUPABASE_* in .env). With
+STORAGE_BACKEND=sqlite the queue is the local database file, so workers must
+run on the same host.
+
+Run from backend/:
+    python worker.py                    # one worker, runs until interrupted
+    python worker.py --processes 4      # four worker processes
+    python worker.py --exit-when-idle   # drain the queue, then exit
+"""
+
+import argparse
+import logging
+import multiprocessing
+
+import etl  # noqa: F401  (registers the sector/narrative handlers)
+import workqueue
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--run-id", default=None, help="only take tasks from this pipeline run")
+    parser.add_argument("--exit-when-idle", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.processes <= 1:
+        workqueue.run_worker(run_id=args.run_id, exit_when_idle=args.exit_when_idle)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(
+            target=workqueue.worker_process_main,
+            kwargs={"run_id": args.run_id, "exit_when_idle": args.exit_when_idle},
+        )
+        for _ in range(args.processes)
+    ]
+    for proc in procs:
+        proc.start()
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        for proc in procs:
+            proc.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Work queue for PIPELINE_MODE=queue.
+
+run_pipeline() turns each sector (then each narrative) into a pipeline_tasks
+row and waits; worker processes lease tasks, run the registered handler and
+store its stats on the task, which run_pipeline aggregates as before.
+
+- Leases are renewed while a task runs. A worker that dies loses its task back
+  to the queue once QUEUE_LEASE_SECONDS pass without a renewal.
+- A task whose handler raises is retried, up to QUEUE_MAX_ATTEMPTS in total.
+- The queue lives in the storage backend: Postgres (claim_pipeline_task() uses
+  FOR UPDATE SKIP LOCKED) for workers on any host, or the SQLite file as a
+  single-host stand-in.
+"""
+
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import db
+from config import QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS, QUEUE_POLL_SECONDS, QUEUE_RUN_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_HANDLERS: dict[str, Callable[[dict], dict]] = {}
+
+
+def handler(kind: str):
+    """Register fn(task) -> result dict as the handler for a task kind."""
+    def register(fn: Callable[[dict], dict]) -> Callable[[dict], dict]:
+        _HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+# ---------------------------------------------------------------------------
+# Coordinator side
+# ---------------------------------------------------------------------------
+
+def _is_finished(task: dict, now: datetime) -> bool:
+    if task["status"] in ("done", "failed"):
+        return True
+    # Out of attempts with a dead lease: nobody will claim it again
+    expires = task.get("lease_expires_at")
+    return (
+        task["status"] == "leased"
+        and task["attempts"] >= task["max_attempts"]
+        and expires is not None
+        and datetime.fromisoformat(expires) < now
+    )
+
+
+def run_units(run_id: str, kind: str, units: list[str], timeout: float = QUEUE_RUN_TIMEOUT_SECONDS) -> dict[str, dict]:
+    """Queue one task per unit and block until every one is finished. Returns {unit: task}."""
+    db.enqueue_tasks(run_id, kind, units, QUEUE_MAX_ATTEMPTS)
+    wanted = set(units)
+    deadline = time.monotonic() + timeout
+    next_log = 0.0
+
+    while True:
+        tasks = {t["unit"]: t for t in db.get_tasks(run_id, kind) if t["unit"] in wanted}
+        now = datetime.now(timezone.utc)
+        finished = sum(1 for t in tasks.values() if _is_finished(t, now))
+        if finished == len(wanted):
+            return tasks
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{len(wanted) - finished} {kind} tasks unfinished after {timeout:.0f}s")
+        if time.monotonic() >= next_log:
+            leased = sum(1 for t in tasks.values() if t["status"] == "leased")
+            logger.info(f"  {kind} tasks: {finished}/{len(wanted)} finished, {leased} in progress")
+            next_log = time.monotonic() + 30
+        time.sleep(QUEUE_POLL_SECONDS)
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def make_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+@contextmanager
+def _lease_renewal(task: dict, worker_id: str) -> Iterator[None]:
+    """Renew the task's lease in the background while the handler runs."""
+    stop = threading.Event()
+
+    def renew():
+        while not stop.wait(QUEUE_LEASE_SECONDS / 3):
+            try:
+                if not db.renew_task_lease(task["id"], worker_id, QUEUE_LEASE_SECONDS):
+                    logger.warning(f"Lost lease on {task['kind']} task {task['unit']}")
+                    return
+            except Exception as e:
+                logger.warning(f"Lease renewal failed for {task['kind']} task {task['unit']}: {e}")
+
+    thread = threading.Thread(target=renew, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _execute(task: dict, worker_id: str) -> None:
+    fn = _HANDLERS.get(task["kind"])
+    if fn is None:
+        db.fail_task(task["id"], worker_id, f"No handler for task kind {task['kind']!r}", retry=False)
+        return
+
+    with _lease_renewal(task, worker_id):
+        try:
+            result = fn(task)
+        except Exception as e:
+            retry = task["attempts"] < task["max_attempts"]
+            logger.warning(
+                f"{task['kind']} task {task['unit']} failed (attempt {task['attempts']}"
+                f"/{task['max_attempts']}{', will retry' if retry else ''}): {e}"
+            )
+            db.fail_task(task["id"], worker_id, f"{type(e).__name__}: {e}", retry)
+            return
+
+    if not db.complete_task(task["id"], worker_id, result):
+        logger.warning(f"Lease on {task['kind']} task {task['unit']} expired before completion; result dropped")
+
+
+def run_worker(run_id: str | None = None, stop=None, exit_when_idle: bool = False) -> int:
+    """Lease and run tasks until `stop` is set (or the queue is empty, with exit_when_idle).
+
+    Returns the number of tasks run.
+    """
+    worker_id = make_worker_id()
+    ran = 0
+    logger.info(f"Worker {worker_id} started")
+
+    while stop is None or not stop.is_set():
+        try:
+            task = db.claim_task(worker_id, QUEUE_LEASE_SECONDS, run_id)
+        except Exception as e:
+            logger.warning(f"Worker {worker_id} failed to claim a task: {e}")
+            task = None
+        if task is None:
+            if exit_when_idle:
+                break
+            if stop is not None:
+                stop.wait(QUEUE_POLL_SECONDS)
+            else:
+                time.sleep(QUEUE_POLL_SECONDS)
+            continue
+        _execute(task, worker_id)
+        ran += 1
+
+    logger.info(f"Worker {worker_id} stopped after {ran} tasks")
+    return ran
+
+
+def worker_process_main(run_id: str | None = None, stop=None, exit_when_idle: bool = False) -> None:
+    """Entry point for a spawned worker process."""
+    logging.basicConfig(level=logging.INFO)
+    import etl  # noqa: F401  (registers the sector/narrative handlers)
+
+    run_worker(run_id=run_id, stop=stop, exit_when_idle=exit_when_idle)
+
+
+@contextmanager
+def local_workers(count: int, run_id: str | None = None) -> Iterator[None]:
+    """Run `count` worker processes on this host for the duration of the block."""
+    if count <= 0:
+        yield
+        return
+
+    # spawn, not fork: children must not inherit open DB connections or held locks
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    procs = [ctx.Process(target=worker_process_main, args=(run_id, stop), daemon=True) for _ in range(count)]
+    for proc in procs:
+        proc.start()
+    logger.info(f"Started {count} local queue workers")
+    try:
+        yield
+    finally:
+        stop.set()
+        for proc in procs:
+            proc.join(timeout=30)
+            if proc.is_alive():
+                proc.terminate()
@@ -21,6 +21,19 @@ CREATE TABLE sector_feeds (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Refresh state per feed for the adaptive scheduler (scheduler.py)
+CREATE TABLE feed_schedule (
+    feed_id UUID PRIMARY KEY REFERENCES sector_feeds(id) ON DELETE CASCADE,
+    interval_seconds INT NOT NULL,
+    next_run_at TIMESTAMPTZ NOT NULL,
+    yield_ewma REAL,                           -- new articles per fetch, smoothed
+    consecutive_failures INT NOT NULL DEFAULT 0,
+    last_run_at TIMESTAMPTZ,
+    last_new INT,
+    last_error TEXT,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
 -- Fetched news articles, deduplicated by URL
 CREATE TABLE sector_articles (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -36,6 +49,8 @@ CREATE TABLE sector_articles (
 CREATE INDEX idx_sector_articles_sector ON sector_articles(sector_id);
 CREATE INDEX idx_sector_articles_url ON sector_articles(url);
 CREATE INDEX idx_sector_articles_published ON sector_articles(published_at DESC);
+-- Expression index (not a stored column) so select("*") payloads stay unchanged
+CREATE INDEX idx_sector_articles_title_fts ON sector_articles USING GIN (to_tsvector('english', title));
 
 -- AI-classified signals from articles (one signal per article)
 CREATE TABLE sector_signals (
@@ -53,6 +68,33 @@ CREATE INDEX idx_sector_signals_sector ON sector_signals(sector_id);
 CREATE INDEX idx_sector_signals_type ON sector_signals(signal_type);
 CREATE INDEX idx_sector_signals_created ON sector_signals(created_at DESC);
 CREATE INDEX idx_sector_signals_relevance ON sector_signals(ir_relevance);
+CREATE INDEX idx_sector_signals_summary_fts ON sector_signals USING GIN (to_tsvector('english', coalesce(summary, '')));
+
+-- Daily signal rollup (sector x day x signal_type x sentiment) for trend queries.
+-- Maintained by trigger on sector_signals insert and never cleared by the
+-- pipeline, so history accumulates across runs. day is the article's
+-- publication date (falling back to classification time).
+CREATE TABLE sector_signal_daily (
+    sector_id UUID REFERENCES sectors(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    signal_type TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    signal_count INT NOT NULL DEFAULT 0,
+    relevance_sum REAL NOT NULL DEFAULT 0,
+    avg_relevance REAL GENERATED ALWAYS AS (relevance_sum / NULLIF(signal_count, 0)) STORED,
+    PRIMARY KEY (sector_id, day, signal_type, sentiment)
+);
+
+CREATE INDEX idx_sector_signal_daily_day ON sector_signal_daily(day DESC);
+
+-- Article URLs already counted in the rollup. Each pipeline run clears and
+-- re-classifies the trailing week, so without this the same article would be
+-- counted once per run.
+CREATE TABLE sector_signal_rollup_keys (
+    sector_id UUID REFERENCES sectors(id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    PRIMARY KEY (sector_id, url)
+);
 
 -- ETF performance data, one row per sector, refreshed daily
 CREATE TABLE sector_financials (
@@ -77,8 +119,255 @@ CREATE TABLE sector_narratives (
     ir_talking_points TEXT[],
     sentiment TEXT,
     signal_count INT,
+    input_fingerprint TEXT,      -- hash of the top signals + prompt/model version it was written from
+    input_financials JSONB,      -- ETF figures quoted in the prompt, for the drift check
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
 CREATE INDEX idx_sector_narratives_sector ON sector_narratives(sector_id);
 CREATE INDEX idx_sector_narratives_created ON sector_narratives(created_at DESC);
+
+-- One row per run_pipeline() call. A run left 'running' (instance restart) or
+-- 'failed' can be resumed from its checkpoints instead of starting over.
+CREATE TABLE pipeline_runs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    status TEXT NOT NULL DEFAULT 'running',    -- running | completed | failed
+    error TEXT,
+    result JSONB,
+    started_at TIMESTAMPTZ DEFAULT NOW(),
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX idx_pipeline_runs_started ON pipeline_runs(started_at DESC);
+
+-- Completed stages per unit of work: unit is a sector id, or 'financials'.
+-- stage is fetched | inserted | classified | narrated.
+CREATE TABLE pipeline_checkpoints (
+    run_id UUID REFERENCES pipeline_runs(id) ON DELETE CASCADE,
+    unit TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    stats JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (run_id, unit, stage)
+);
+
+-- Work queue for PIPELINE_MODE=queue: one task per (run, kind, unit), leased by
+-- worker processes. kind is 'sector' or 'narrative', unit is a sector id.
+CREATE TABLE pipeline_tasks (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    run_id UUID REFERENCES pipeline_runs(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',    -- pending | leased | done | failed
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    lease_owner TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (run_id, kind, unit)
+);
+
+CREATE INDEX idx_pipeline_tasks_claimable ON pipeline_tasks(status, created_at)
+    WHERE status IN ('pending', 'leased');
+
+-- Token usage per model call, labeled by run, stage, sector and feed. Never
+-- cleared by the pipeline: per-feed history drives budget prioritization.
+CREATE TABLE llm_usage (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    run_id UUID REFERENCES pipeline_runs(id) ON DELETE SET NULL,
+    stage TEXT NOT NULL,                       -- classify | narrative | narrative_stream
+    sector_id UUID REFERENCES sectors(id) ON DELETE CASCADE,
+    feed_id UUID REFERENCES sector_feeds(id) ON DELETE SET NULL,
+    model TEXT,
+    calls INT NOT NULL DEFAULT 1,              -- 0 on the extra rows of a call split across feeds
+    cached BOOLEAN NOT NULL DEFAULT FALSE,     -- result reused, no model call
+    input_tokens INT NOT NULL DEFAULT 0,
+    output_tokens INT NOT NULL DEFAULT 0,
+    cache_read_tokens INT NOT NULL DEFAULT 0,
+    cache_write_tokens INT NOT NULL DEFAULT 0,
+    articles INT NOT NULL DEFAULT 0,           -- articles classified by the call
+    signals INT NOT NULL DEFAULT 0,            -- non-neutral signals they produced
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX idx_llm_usage_run ON llm_usage(run_id);
+CREATE INDEX idx_llm_usage_created ON llm_usage(created_at DESC);
+
+-- Progress of backfill.py, one row per date window; reruns skip 'done' windows
+CREATE TABLE backfill_windows (
+    window_start DATE NOT NULL,
+    window_end DATE NOT NULL,                  -- exclusive
+    status TEXT NOT NULL DEFAULT 'running',    -- running | done | partial (some feeds failed)
+    stats JSONB,
+    started_at TIMESTAMPTZ DEFAULT NOW(),
+    finished_at TIMESTAMPTZ,
+    PRIMARY KEY (window_start, window_end)
+);
+
+-- Statement-level trigger: one grouped upsert per insert_signals() batch
+CREATE OR REPLACE FUNCTION rollup_sector_signals() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    WITH joined AS (
+        SELECT
+            n.sector_id,
+            a.url,
+            (COALESCE(a.published_at, n.created_at) AT TIME ZONE 'UTC')::date AS day,
+            n.signal_type,
+            n.sentiment,
+            COALESCE(n.ir_relevance, 0) AS ir_relevance
+        FROM new_signals n
+        JOIN sector_articles a ON a.id = n.article_id
+        WHERE n.sector_id IS NOT NULL
+    ),
+    fresh AS (
+        INSERT INTO sector_signal_rollup_keys (sector_id, url)
+        SELECT DISTINCT sector_id, url FROM joined
+        ON CONFLICT DO NOTHING
+        RETURNING sector_id, url
+    )
+    INSERT INTO sector_signal_daily AS d (sector_id, day, signal_type, sentiment, signal_count, relevance_sum)
+    SELECT j.sector_id, j.day, j.signal_type, j.sentiment, COUNT(*), SUM(j.ir_relevance)
+    FROM joined j
+    JOIN fresh f ON f.sector_id = j.sector_id AND f.url = j.url
+    GROUP BY j.sector_id, j.day, j.signal_type, j.sentiment
+    ON CONFLICT (sector_id, day, signal_type, sentiment) DO UPDATE
+    SET signal_count = d.signal_count + EXCLUDED.signal_count,
+        relevance_sum = d.relevance_sum + EXCLUDED.relevance_sum;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_sector_signals_rollup
+    AFTER INSERT ON sector_signals
+    REFERENCING NEW TABLE AS new_signals
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_sector_signals();
+
+-- ts_headline output made safe to render as HTML: the text is escaped and only
+-- the chr(2)/chr(3) match markers search_signals asks for become <mark> tags.
+CREATE OR REPLACE FUNCTION html_highlight(t TEXT)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT replace(replace(
+        replace(replace(replace(replace(replace(t, '&', '&amp;'), '<', '&lt;'), '>', '&gt;'), '"', '&quot;'), '''', '&#x27;'),
+        chr(2), '<mark>'), chr(3), '</mark>');
+$$;
+
+-- Full-text search over signal summaries and article headlines (GET /api/search).
+-- Each side is matched through its own GIN index, the union is filtered and
+-- ranked (headline hits weighted above summary hits), and ts_headline only
+-- runs on the final page of results.
+CREATE OR REPLACE FUNCTION search_signals(
+    q TEXT,
+    since TIMESTAMPTZ,
+    p_sector_id UUID DEFAULT NULL,
+    p_signal_type TEXT DEFAULT NULL,
+    p_sentiment TEXT DEFAULT NULL,
+    p_min_relevance REAL DEFAULT 0.0,
+    p_limit INT DEFAULT 50
+)
+RETURNS TABLE (
+    id UUID,
+    article_id UUID,
+    sector_id UUID,
+    summary TEXT,
+    signal_type TEXT,
+    sentiment TEXT,
+    ir_relevance REAL,
+    created_at TIMESTAMPTZ,
+    sector_articles JSONB,
+    rank REAL,
+    highlight JSONB
+)
+LANGUAGE sql STABLE AS $$
+    WITH query AS (
+        SELECT
+            websearch_to_tsquery('english', q) AS tsq,
+            'StartSel="' || chr(2) || '", StopSel="' || chr(3) || '", HighlightAll=true' AS opts
+    ),
+    matches AS (
+        SELECT s.id FROM sector_signals s, query
+        WHERE to_tsvector('english', coalesce(s.summary, '')) @@ query.tsq
+        UNION
+        SELECT s.id
+        FROM sector_articles a
+        JOIN sector_signals s ON s.article_id = a.id, query
+        WHERE to_tsvector('english', a.title) @@ query.tsq
+    ),
+    ranked AS (
+        SELECT
+            s.*,
+            a.title, a.url, a.source, a.published_at,
+            ts_rank(
+                setweight(to_tsvector('english', a.title), 'A')
+                || setweight(to_tsvector('english', coalesce(s.summary, '')), 'B'),
+                query.tsq
+            ) AS rank
+        FROM matches m
+        JOIN sector_signals s ON s.id = m.id
+        JOIN sector_articles a ON a.id = s.article_id, query
+        WHERE s.created_at >= since
+          AND s.ir_relevance >= p_min_relevance
+          AND (p_sector_id IS NULL OR s.sector_id = p_sector_id)
+          AND (p_signal_type IS NULL OR s.signal_type = p_signal_type)
+          AND (p_sentiment IS NULL OR s.sentiment = p_sentiment)
+        ORDER BY rank DESC, s.created_at DESC
+        LIMIT p_limit
+    )
+    SELECT
+        r.id, r.article_id, r.sector_id, r.summary, r.signal_type, r.sentiment,
+        r.ir_relevance, r.created_at,
+        jsonb_build_object('title', r.title, 'url', r.url, 'source', r.source, 'published_at', r.published_at),
+        r.rank,
+        jsonb_build_object(
+            'summary', html_highlight(ts_headline(
+                'english', translate(coalesce(r.summary, ''), chr(2) || chr(3), ''), query.tsq, query.opts
+            )),
+            'title', html_highlight(ts_headline(
+                'english', translate(r.title, chr(2) || chr(3), ''), query.tsq, query.opts
+            ))
+        )
+    FROM ranked r, query
+    ORDER BY r.rank DESC, r.created_at DESC;
+$$;
+
+-- Lease the oldest claimable task (pending, or leased with an expired lease).
+-- SKIP LOCKED lets any number of workers claim concurrently without blocking
+-- each other. Expired tasks that are out of attempts are failed first.
+CREATE OR REPLACE FUNCTION claim_pipeline_task(
+    p_worker TEXT,
+    p_lease_seconds INT,
+    p_run_id UUID DEFAULT NULL
+)
+RETURNS SETOF pipeline_tasks
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE pipeline_tasks
+    SET status = 'failed', error = 'lease expired', updated_at = NOW()
+    WHERE status = 'leased'
+      AND lease_expires_at < NOW()
+      AND attempts >= max_attempts
+      AND (p_run_id IS NULL OR run_id = p_run_id);
+
+    RETURN QUERY
+    UPDATE pipeline_tasks t
+    SET status = 'leased',
+        attempts = t.attempts + 1,
+        lease_owner = p_worker,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        updated_at = NOW()
+    WHERE t.id = (
+        SELECT c.id FROM pipeline_tasks c
+        WHERE (c.status = 'pending' OR (c.status = 'leased' AND c.lease_expires_at < NOW()))
+          AND c.attempts < c.max_attempts
+          AND (p_run_id IS NULL OR c.run_id = p_run_id)
+        ORDER BY c.created_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING t.*;
+END;
+$$;
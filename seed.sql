@@ -40,6 +40,15 @@ INSERT INTO sector_feeds (sector_id, feed_type, query) VALUES
     ((SELECT id FROM sectors WHERE gics_code = '55'), 'google_news', '"utilities sector" OR "power industry"'),
     ((SELECT id FROM sectors WHERE gics_code = '55'), 'google_news', '"renewable energy" utility OR "grid infrastructure"');
 
+-- V2 sources (sources/ adapters), off until enabled per feed
+INSERT INTO sector_feeds (sector_id, feed_type, query, active) VALUES
+    ((SELECT id FROM sectors WHERE gics_code = '45'), 'einnews', 'https://technology.einnews.com/all_rss', FALSE),
+    ((SELECT id FROM sectors WHERE gics_code = '35'), 'einnews', 'https://healthcare.einnews.com/all_rss', FALSE),
+    ((SELECT id FROM sectors WHERE gics_code = '35'), 'federal_register', 'agency=FDA,HHS,CMS', FALSE),
+    ((SELECT id FROM sectors WHERE gics_code = '40'), 'federal_register', 'agency=SEC,FDIC,OCC,CFPB', FALSE),
+    ((SELECT id FROM sectors WHERE gics_code = '10'), 'federal_register', 'agency=EPA,DOE,FERC&type=rule,proposed_rule', FALSE),
+    ((SELECT id FROM sectors WHERE gics_code = '50'), 'federal_register', 'agency=FCC', FALSE);
+
 -- Initialize empty financials rows for each sector (will be populated by pipeline)
 INSERT INTO sector_financials (sector_id)
 SELECT id FROM sectors;